@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Benchmarks für die Hot Paths von Planer und Dispatcher (nur Standardbibliothek).
+
+    python benchmarks/run_benchmarks.py --quick               # Sekunden, kleine Grids
+    python benchmarks/run_benchmarks.py                       # Standard-Grids
+    python benchmarks/run_benchmarks.py --full                # bis 1M Items / 10k Teilnehmende / 365 Tage
+    python benchmarks/run_benchmarks.py --only send,due_scan  # Auswahl
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<alt>.json
+
+Ergebnisse landen als JSON in benchmarks/results/<zeit>_<commit>.json; --compare stellt
+Mediane zweier Läufe gegenüber (Regression ab --threshold, Default 1.2x).
+Versand-Benchmarks laufen gegen einen lokalen ntfy-Stub (ntfy_reminder/stub_server.py).
+`startup` misst die CLI-Startzeit als eigener Prozess (+ `-X importtime`) gegen STARTUP_BUDGET_MS;
+liegt ein Median über Budget, endet der Lauf mit Exit-Code 1.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ntfy_reminder.schedule import (  # noqa: E402
+    GapSampler,
+    TimeWindow,
+    generate_schedule,
+    generate_schedule_batch,
+    load_schedule,
+    max_min_gap,
+    open_schedule_view,
+    pick_times_for_day,
+    save_schedule,
+    windows_to_minute_slots,
+    windows_to_segments,
+)
+from ntfy_reminder.send import Publisher, SendContext, send_many  # noqa: E402
+from ntfy_reminder.stub_server import StubServer  # noqa: E402
+from tools.dispatch_due import parse_item  # noqa: E402
+
+Result = Dict[str, Any]
+
+# Grids je Stufe: quick / default / full
+GRIDS: Dict[str, Dict[str, List[int]]] = {
+    "quick": {
+        "windows": [1, 4], "per_day": [1, 5, 12], "days": [7, 30],
+        "participants": [100], "items": [1_000, 10_000], "concurrency": [1, 4], "messages": [300],
+    },
+    "default": {
+        "windows": [1, 4, 12], "per_day": [1, 5, 12, 24, 48], "days": [7, 30, 90, 365],
+        "participants": [100, 1_000], "items": [1_000, 10_000, 100_000], "concurrency": [1, 4, 16],
+        "messages": [2_000],
+    },
+    "full": {
+        "windows": [1, 4, 12, 48], "per_day": [1, 5, 12, 24, 48], "days": [7, 30, 90, 365],
+        "participants": [100, 1_000, 10_000], "items": [1_000, 10_000, 100_000, 1_000_000],
+        "concurrency": [1, 4, 16, 64], "messages": [10_000],
+    },
+}
+
+BENCHMARKS: Dict[str, Callable[["Runner"], Iterator[Result]]] = {}
+
+
+def bench(name: str) -> Callable[[Callable[["Runner"], Iterator[Result]]], Callable[["Runner"], Iterator[Result]]]:
+    def register(fn: Callable[["Runner"], Iterator[Result]]) -> Callable[["Runner"], Iterator[Result]]:
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank Perzentil (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def timing_stats(samples: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples),
+        "best_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "p99_s": percentile(samples, 99),
+    }
+
+
+class Runner:
+    def __init__(self, level: str, repeat: int, stub_url: Optional[str], workdir: Path):
+        self.level = level
+        self.grid = GRIDS[level]
+        self.repeat = repeat
+        self.stub_url = stub_url
+        self.workdir = workdir
+
+    def measure(self, fn: Callable[[], Any], repeat: Optional[int] = None) -> Dict[str, float]:
+        """fn `repeat`-mal ausführen (nach einem Aufwärmlauf), Sekunden pro Lauf."""
+        fn()
+        samples = []
+        for _ in range(repeat or self.repeat):
+            t0 = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t0)
+        return timing_stats(samples)
+
+
+def make_windows(count: int) -> List[TimeWindow]:
+    """`count` gleich lange Fenster zwischen 08:00 und 20:00, mit kleinen Lücken."""
+    span = 12 * 60 // count
+    out = []
+    for i in range(count):
+        start = 8 * 60 + i * span
+        end = start + max(1, span - (5 if span > 10 else 0))
+        out.append(TimeWindow(dt.time(start // 60, start % 60), dt.time(end // 60, end % 60)))
+    return out
+
+
+def synthetic_schedule(n: int, start: dt.datetime) -> Dict[str, Any]:
+    """n Items, im Abstand von einer Minute ab `start` (Struktur wie generate_schedule)."""
+    items = []
+    for i in range(n):
+        t = start + dt.timedelta(minutes=i)
+        items.append({
+            "id": i + 1, "day": t.date().isoformat(), "k": 1, "per_day": 1,
+            "when": t.isoformat(timespec="minutes"), "time": t.strftime("%H:%M"),
+        })
+    return {"generated_at": start.isoformat(timespec="seconds"), "per_day": 1, "min_gap_minutes": 0,
+            "mode": "interval", "items": items}
+
+
+@bench("windows_to_minute_slots")
+def bench_minute_slots(r: Runner) -> Iterator[Result]:
+    for count in r.grid["windows"]:
+        windows = make_windows(count)
+        yield {"params": {"windows": count}, "stats": r.measure(lambda: windows_to_minute_slots(windows))}
+
+
+@bench("pick_times_for_day")
+def bench_pick_times(r: Runner) -> Iterator[Result]:
+    day = dt.date(2026, 1, 20)
+    for count in r.grid["windows"]:
+        windows = make_windows(count)
+        allowed = windows_to_minute_slots(windows)
+        segments = windows_to_segments(windows)
+        for per_day in r.grid["per_day"]:
+            limit = max_min_gap(segments, per_day)
+            if limit < 0:
+                continue  # per_day passt gar nicht in die Fenster
+            for min_gap in sorted({0, limit // 2, limit}):
+                rng = random.Random(1)
+                sampler = GapSampler(allowed, per_day, min_gap)
+                params = {"windows": count, "per_day": per_day, "min_gap": min_gap, "min_gap_limit": limit}
+                yield {
+                    "params": {**params, "sampler": "vorberechnet"},
+                    "stats": r.measure(lambda: pick_times_for_day(day, allowed, per_day, min_gap, rng, sampler=sampler)),
+                }
+                yield {
+                    "params": {**params, "sampler": "kalt"},
+                    "stats": r.measure(lambda: pick_times_for_day(day, allowed, per_day, min_gap, rng), repeat=3),
+                }
+
+
+@bench("generate_schedule")
+def bench_generate(r: Runner) -> Iterator[Result]:
+    start = dt.date(2026, 1, 1)
+    for days in r.grid["days"]:
+        for per_day in r.grid["per_day"]:
+            kwargs = {
+                "start_date": start, "end_date": start + dt.timedelta(days=days - 1), "per_day": per_day,
+                "min_gap_minutes": max(0, 600 // per_day - 5), "mode": "interval",
+                "interval": (dt.time(8, 0), dt.time(20, 0)), "seed": 1,
+            }
+            stats = r.measure(lambda: generate_schedule(**kwargs), repeat=max(3, r.repeat // 2))
+            yield {"params": {"days": days, "per_day": per_day, "min_gap": kwargs["min_gap_minutes"]},
+                   "stats": stats, "extra": {"items": days * per_day}}
+
+
+@bench("generate_parallel")
+def bench_generate_parallel(r: Runner) -> Iterator[Result]:
+    """Längster Zeitraum mit workers=1 vs. Prozess-Pool (Ergebnis identisch, siehe day_rng)."""
+    start, days, per_day = dt.date(2026, 1, 1), max(r.grid["days"]), max(r.grid["per_day"])
+    kwargs = {
+        "start_date": start, "end_date": start + dt.timedelta(days=days - 1), "per_day": per_day,
+        "min_gap_minutes": max(0, 600 // per_day - 5), "mode": "interval",
+        "interval": (dt.time(8, 0), dt.time(20, 0)), "seed": 1,
+    }
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        stats = r.measure(lambda: generate_schedule(workers=workers, **kwargs), repeat=max(3, r.repeat // 2))
+        yield {"params": {"days": days, "per_day": per_day, "workers": workers},
+               "stats": stats, "extra": {"items": days * per_day, "cpus": os.cpu_count()}}
+
+
+@bench("plan_batch")
+def bench_plan_batch(r: Runner) -> Iterator[Result]:
+    start = dt.date(2026, 1, 1)
+    kwargs = {
+        "start_date": start, "end_date": start + dt.timedelta(days=29), "per_day": 5, "min_gap_minutes": 60,
+        "mode": "interval", "interval": (dt.time(8, 0), dt.time(20, 0)),
+    }
+    for n in r.grid["participants"]:
+        seeds = {f"p{i:05d}": i for i in range(n)}
+
+        def run() -> None:
+            for _ in generate_schedule_batch(seeds, **kwargs):
+                pass
+
+        stats = r.measure(run, repeat=1 if n >= 1000 else 3)
+        yield {"params": {"participants": n, "days": 30, "per_day": 5}, "stats": stats,
+               "extra": {"participants_per_s": n / stats["median_s"]}}
+
+
+def _schedule_files(r: Runner, n: int) -> Tuple[Path, Path]:
+    json_path = r.workdir / f"sched_{n}.json"
+    bin_path = r.workdir / f"sched_{n}.bin"
+    if not json_path.exists():
+        schedule = synthetic_schedule(n, dt.datetime(2026, 1, 1, 8, 0))
+        save_schedule(schedule, json_path)
+        save_schedule(schedule, bin_path)
+    return json_path, bin_path
+
+
+@bench("load_schedule")
+def bench_load(r: Runner) -> Iterator[Result]:
+    for n in r.grid["items"]:
+        json_path, bin_path = _schedule_files(r, n)
+        repeat = 1 if n >= 1_000_000 else 3 if n >= 100_000 else r.repeat
+        for fmt, path in (("json", json_path), ("bin", bin_path)):
+            yield {"params": {"items": n, "format": fmt}, "stats": r.measure(lambda: load_schedule(path), repeat),
+                   "extra": {"bytes": path.stat().st_size}}
+
+
+@bench("due_scan")
+def bench_due_scan(r: Runner) -> Iterator[Result]:
+    """Fällige Items eines 3-Minuten-Fensters in der Mitte: Vollscan (wie ohne Index) vs. Index/bin."""
+    for n in r.grid["items"]:
+        json_path, bin_path = _schedule_files(r, n)
+        latest = dt.datetime(2026, 1, 1, 8, 0) + dt.timedelta(minutes=n // 2)
+        earliest = latest - dt.timedelta(minutes=2)
+        sent_ids: set = set()
+        repeat = 1 if n >= 1_000_000 else 3 if n >= 100_000 else r.repeat
+
+        def full_scan() -> int:
+            schedule = json.loads(json_path.read_text(encoding="utf-8"))
+            due = []
+            for it in schedule.get("items", []):
+                parsed = parse_item(it)
+                if parsed is not None and parsed[1] not in sent_ids and earliest <= parsed[0] <= latest:
+                    due.append(parsed)
+            return len(due)
+
+        def view_scan(path: Path) -> Callable[[], int]:
+            def run() -> int:
+                view = open_schedule_view(path)
+                with view:
+                    due = [(w, rid) for w, rid in view.due(earliest, latest) if rid not in sent_ids]
+                    return len(view.items([rid for _, rid in due]))
+            return run
+
+        yield {"params": {"items": n, "method": "vollscan"}, "stats": r.measure(full_scan, repeat)}
+        yield {"params": {"items": n, "method": "index"}, "stats": r.measure(view_scan(json_path))}
+        yield {"params": {"items": n, "method": "bin"}, "stats": r.measure(view_scan(bin_path))}
+
+
+class TimedPublisher(Publisher):
+    """Publisher, der die Dauer jedes Requests (bzw. jeder Pipeline) mitschreibt."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.latencies: List[float] = []
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> bytes:
+        t0 = time.perf_counter()
+        try:
+            return super().post(url, body, headers)
+        finally:
+            self.latencies.append(time.perf_counter() - t0)
+
+    def post_pipelined(self, requests: List[Tuple[str, bytes, Dict[str, str]]]) -> List[Optional[Exception]]:
+        t0 = time.perf_counter()
+        try:
+            return super().post_pipelined(requests)
+        finally:
+            self.latencies.append(time.perf_counter() - t0)
+
+
+@bench("send")
+def bench_send(r: Runner) -> Iterator[Result]:
+    """Durchsatz + Latenz gegen den lokalen Stub (eigener Prozess-Thread oder --stub-url)."""
+    stub = None if r.stub_url else StubServer().start()
+    url = r.stub_url or stub.url
+    schedule = synthetic_schedule(max(r.grid["messages"]), dt.datetime(2026, 1, 1, 8, 0))
+    env = {"NTFY_TOPIC": "bench", "NTFY_TITLE": "Reminder {k}/{per_day}", "NTFY_MESSAGE": "Bitte: {url}",
+           "SURVEY_URL_TEMPLATE": "https://example.org/s/?r={id}"}
+    try:
+        for mode in ("header", "json"):
+            ctx = SendContext.from_env({**env, "NTFY_PUBLISH_MODE": mode}, url)
+            for n in r.grid["messages"]:
+                jobs = [(ctx, schedule, it) for it in schedule["items"][:n]]
+                for concurrency in r.grid["concurrency"]:
+                    with TimedPublisher(max_idle_per_host=concurrency) as publisher:
+                        t0 = time.perf_counter()
+                        errors = sum(err is not None for _, err in send_many(jobs, publisher, concurrency=concurrency))
+                        elapsed = time.perf_counter() - t0
+                        lat = publisher.latencies
+                    yield {
+                        "params": {"mode": mode, "messages": n, "concurrency": concurrency},
+                        "stats": timing_stats([elapsed]),
+                        "extra": {
+                            "msgs_per_s": n / elapsed,
+                            "errors": errors,
+                            # json: Latenz je Pipeline (bis zu PIPELINE_DEPTH Nachrichten)
+                            "latency_unit": "pipeline" if mode == "json" else "request",
+                            "latency_p50_ms": percentile(lat, 50) * 1000,
+                            "latency_p99_ms": percentile(lat, 99) * 1000,
+                        },
+                    }
+    finally:
+        if stub is not None:
+            stub.stop()
+
+
+# Startzeit-Budget je Kommando (Median Wall-Clock in ms, inkl. Interpreter-Start);
+# Überschreitung -> Exit-Code 1, damit teure Top-Level-Imports im CI auffallen.
+STARTUP_BUDGET_MS: Dict[str, float] = {
+    "python -c pass": 60,
+    "send_one --dry-run": 120,
+    "run.py --help": 150,
+    "run.py send --dry-run": 250,
+}
+
+
+def _import_total_ms(cmd: List[str], cwd: Path) -> float:
+    """Summe der Self-Zeiten aus `python -X importtime` (ms)."""
+    out = subprocess.run([sys.executable, "-X", "importtime", *cmd], cwd=cwd, capture_output=True, text=True)
+    total_us = 0
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[0].split(":")[1].strip().isdigit():
+            total_us += int(parts[0].split(":")[1])
+    return total_us / 1000
+
+
+@bench("startup")
+def bench_startup(r: Runner) -> Iterator[Result]:
+    """Startzeit der CLI-Einstiege als eigener Prozess (ein Reminder = ein Prozess, z.B. per Cron)."""
+    work = r.workdir / "startup"
+    (work / "config").mkdir(parents=True, exist_ok=True)
+    (work / "config" / "ntfy.env").write_text(
+        "NTFY_TOPIC=bench\nNTFY_TITLE=Reminder {k}/{per_day}\nNTFY_MESSAGE=Bitte: {url}\n"
+        "SURVEY_URL_TEMPLATE=https://example.org/s/?r={id}\n", encoding="utf-8")
+    save_schedule(synthetic_schedule(1_000, dt.datetime(2026, 1, 1, 8, 0)), work / "out" / "schedule.json")
+    commands = {
+        "python -c pass": ["-c", "pass"],
+        "send_one --dry-run": ["-m", "ntfy_reminder.send_one", "3", "--dry-run"],
+        "run.py --help": [str(ROOT / "run.py"), "--help"],
+        "run.py send --dry-run": [str(ROOT / "run.py"), "send", "3", "--dry-run"],
+    }
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    for name, cmd in commands.items():
+        def run() -> None:
+            subprocess.run([sys.executable, *cmd], cwd=work, env=env, stdout=subprocess.DEVNULL, check=True)
+
+        stats = r.measure(run)
+        budget = STARTUP_BUDGET_MS[name]
+        yield {
+            "params": {"command": name},
+            "stats": stats,
+            "extra": {
+                "import_ms": _import_total_ms(cmd, work),
+                "budget_ms": budget,
+                "over_budget": stats["median_s"] * 1000 > budget,
+            },
+        }
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def result_key(res: Result) -> str:
+    return f"{res['bench']} {json.dumps(res['params'], sort_keys=True)}"
+
+
+def compare(old_path: Path, results: List[Result], threshold: float) -> int:
+    """Mediane gegenüberstellen; gibt die Anzahl Regressionen zurück."""
+    old = {result_key(r): r for r in json.loads(old_path.read_text(encoding="utf-8"))["results"]}
+    regressions = 0
+    print(f"\nVergleich mit {old_path} (Regression ab {threshold:.2f}x):")
+    for res in results:
+        before = old.get(result_key(res))
+        if before is None:
+            continue
+        ratio = res["stats"]["median_s"] / max(before["stats"]["median_s"], 1e-12)
+        flag = ""
+        if ratio > threshold:
+            flag = "  <-- langsamer"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            flag = "  schneller"
+        print(f"  {result_key(res):90s} {before['stats']['median_s'] * 1e3:10.3f}ms -> "
+              f"{res['stats']['median_s'] * 1e3:10.3f}ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks für Planer und Dispatcher (JSON-Ausgabe).")
+    level = ap.add_mutually_exclusive_group()
+    level.add_argument("--quick", action="store_true", help="kleine Grids (Sekunden)")
+    level.add_argument("--full", action="store_true", help="große Grids (bis 1M Items, 10k Teilnehmende)")
+    ap.add_argument("--only", default=None, help=f"Komma-Liste aus: {', '.join(BENCHMARKS)}")
+    ap.add_argument("--repeat", type=int, default=5, help="Messläufe pro Parameter-Kombination")
+    ap.add_argument("--stub-url", default=None, help="externen Stub nutzen (python -m ntfy_reminder.stub_server)")
+    ap.add_argument("--out", default=None, help="Ergebnis-JSON (Default benchmarks/results/<zeit>_<commit>.json)")
+    ap.add_argument("--compare", default=None, help="früheres Ergebnis-JSON zum Vergleich")
+    ap.add_argument("--threshold", type=float, default=1.2, help="Faktor, ab dem ein Median als Regression gilt")
+    args = ap.parse_args()
+
+    level_name = "quick" if args.quick else "full" if args.full else "default"
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"Unbekannte Benchmarks: {', '.join(unknown)} (verfügbar: {', '.join(BENCHMARKS)})")
+
+    commit = git_commit()
+    results: List[Result] = []
+    with tempfile.TemporaryDirectory(prefix="ntfy-bench-") as tmp:
+        runner = Runner(level_name, args.repeat, args.stub_url, Path(tmp))
+        for name in names:
+            print(f"[bench] {name} ...", flush=True)
+            for res in BENCHMARKS[name](runner):
+                res = {"bench": name, **res}
+                results.append(res)
+                extra = res.get("extra", {})
+                note = f"  {extra['msgs_per_s']:.0f} msg/s p99={extra['latency_p99_ms']:.2f}ms" if "msgs_per_s" in extra else ""
+                if "budget_ms" in extra:
+                    note = f"  imports={extra['import_ms']:.1f}ms budget={extra['budget_ms']:.0f}ms" + (
+                        "  <-- über Budget" if extra["over_budget"] else "")
+                print(f"  {json.dumps(res['params'], ensure_ascii=False):80s} "
+                      f"median={res['stats']['median_s'] * 1e3:10.3f}ms{note}", flush=True)
+
+    out_path = Path(args.out) if args.out else (
+        ROOT / "benchmarks" / "results" / f"{dt.datetime.now():%Y%m%d-%H%M%S}_{commit}.json"
+    )
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {
+        "commit": commit,
+        "level": level_name,
+        "repeat": args.repeat,
+        "created_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    out_path.write_text(json.dumps({"meta": meta, "results": results}, indent=2, ensure_ascii=False) + "\n",
+                        encoding="utf-8")
+    print(f"\nErgebnisse: {out_path}")
+
+    over = [r for r in results if r.get("extra", {}).get("over_budget")]
+    for res in over:
+        print(f"Startzeit über Budget: {res['params']['command']} "
+              f"({res['stats']['median_s'] * 1e3:.0f}ms > {res['extra']['budget_ms']:.0f}ms)")
+    if args.compare:
+        return 1 if compare(Path(args.compare), results, args.threshold) or over else 0
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
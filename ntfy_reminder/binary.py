@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import json
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ntfy_reminder.index import from_epoch_minute, to_epoch_minute
+
+# Kompaktes Binärformat für Schedules (*.bin), spaltenweise:
+#
+#   Kopf:   magic "NTSB", version, flags, count, Länge des Header-JSON
+#   Header-JSON (Schedule-Felder ohne "items"), aufgefüllt auf 8 Byte
+#   Spalten (je auf 8 Byte aufgefüllt), Zeilen sortiert nach (when, id):
+#     id       int32[count]
+#     when     int32[count]  Minuten seit 1970-01-01 (naive Ortszeit)
+#     k        int16[count]
+#     per_day  int16[count]
+#     by_id    int32[count]  Zeilennummern sortiert nach id (nur ohne FLAG_ID_SORTED)
+# day/time/when-Strings werden beim Lesen aus `when` abgeleitet; Round-Trip zu JSON ist verlustfrei.
+
+MAGIC = b"NTSB"
+VERSION = 1
+FLAG_ID_SORTED = 1  # Zeilen sind zugleich nach id sortiert -> keine by_id-Spalte
+_HEAD = struct.Struct("<4sHHqI")
+ITEM_KEYS = ("id", "day", "k", "per_day", "when", "time")
+
+
+def is_binary_schedule(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == MAGIC
+    except OSError:
+        return False
+
+
+def _pad(n: int) -> bytes:
+    return b"\0" * (-n % 8)
+
+
+def _item_row(item: Dict[str, Any]) -> Tuple[int, int, int, int]:
+    """(when_min, id, k, per_day); prüft, dass das Item verlustfrei darstellbar ist."""
+    if tuple(item.keys()) != ITEM_KEYS:
+        raise ValueError(f"Item {item.get('id')} hat Felder {list(item)}; bin speichert nur {list(ITEM_KEYS)}.")
+    when = dt.datetime.fromisoformat(item["when"])
+    if (
+        when.second or when.microsecond
+        or item["when"] != when.isoformat(timespec="minutes")
+        or item["day"] != when.date().isoformat()
+        or item["time"] != when.strftime("%H:%M")
+    ):
+        raise ValueError(f"Item {item['id']}: day/time/when passen nicht zusammen, bin wäre nicht verlustfrei.")
+    return to_epoch_minute(when), int(item["id"]), int(item["k"]), int(item["per_day"])
+
+
+def save_binary_schedule(schedule: Dict[str, Any], path: Path) -> None:
+    """Schreibt den Schedule im Binärformat (atomar via tmp + replace)."""
+    header = {k: v for k, v in schedule.items() if k != "items"}
+    rows = sorted(_item_row(it) for it in schedule.get("items", []))
+    n = len(rows)
+
+    ids = array("i", (r[1] for r in rows))
+    whens = array("i", (r[0] for r in rows))
+    ks = array("h", (r[2] for r in rows))
+    per_days = array("h", (r[3] for r in rows))
+    id_sorted = all(ids[i] < ids[i + 1] for i in range(n - 1))
+    columns = [ids, whens, ks, per_days]
+    if not id_sorted:
+        columns.append(array("i", sorted(range(n), key=ids.__getitem__)))
+
+    for col in columns:
+        if col.itemsize != {"i": 4, "h": 2}[col.typecode]:
+            raise RuntimeError("Plattform mit unerwarteten array-Größen (int32/int16).")
+
+    head_json = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEAD.pack(MAGIC, VERSION, FLAG_ID_SORTED if id_sorted else 0, n, len(head_json)))
+        f.write(head_json + _pad(_HEAD.size + len(head_json)))
+        for col in columns:
+            data = col.tobytes()  # little endian auf allen üblichen Plattformen
+            f.write(data + _pad(len(data)))
+    os.replace(tmp, path)
+
+
+class BinaryItems(Sequence[Dict[str, Any]]):
+    """Lazy Sicht auf die Items: Dicts werden erst beim Zugriff erzeugt."""
+
+    def __init__(self, sched: "BinarySchedule"):
+        self._s = sched
+
+    def __len__(self) -> int:
+        return self._s.count
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [self._s.row(j) for j in range(*i.indices(self._s.count))]
+        if i < 0:
+            i += self._s.count
+        if not 0 <= i < self._s.count:
+            raise IndexError(i)
+        return self._s.row(i)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._s.count):
+            yield self._s.row(i)
+
+    def close(self) -> None:
+        """Mapping freigeben (danach kein Zugriff mehr); bereits erzeugte Item-Dicts bleiben gültig."""
+        self._s.close()
+
+
+class BinarySchedule:
+    """
+    Liest eine *.bin per mmap ohne Kopie: Spalten sind memoryviews auf die Datei.
+    Gleiche Lese-Schnittstelle wie ScheduleIndex (header, item, items, due).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, count, head_len = _HEAD.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} ist kein Schedule im Binärformat (Version {VERSION}).")
+        self.count = count
+        self.header: Dict[str, Any] = json.loads(bytes(self._mm[_HEAD.size:_HEAD.size + head_len]).decode("utf-8"))
+
+        off = _HEAD.size + head_len
+        off += -off % 8
+        view = memoryview(self._mm)
+        cols = []
+        specs = [("i", 4), ("i", 4), ("h", 2), ("h", 2)]
+        if not flags & FLAG_ID_SORTED:
+            specs.append(("i", 4))
+        for code, size in specs:
+            nbytes = count * size
+            cols.append(view[off:off + nbytes].cast(code))
+            off += nbytes + (-nbytes % 8)
+        view.release()
+        self._ids, self._whens, self._ks, self._per_days = cols[:4]
+        self._by_id = cols[4] if len(cols) > 4 else None
+
+    def close(self) -> None:
+        for col in (self._ids, self._whens, self._ks, self._per_days, self._by_id):
+            if col is not None:
+                col.release()
+        self._mm.close()
+
+    def __enter__(self) -> "BinarySchedule":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def row(self, i: int) -> Dict[str, Any]:
+        when = from_epoch_minute(self._whens[i])
+        return {
+            "id": self._ids[i],
+            "day": when.date().isoformat(),
+            "k": self._ks[i],
+            "per_day": self._per_days[i],
+            "when": when.isoformat(timespec="minutes"),
+            "time": when.strftime("%H:%M"),
+        }
+
+    def _row_of(self, rid: int) -> Optional[int]:
+        if self._by_id is None:
+            i = bisect.bisect_left(self._ids, rid)
+            return i if i < self.count and self._ids[i] == rid else None
+        j = bisect.bisect_left(self._by_id, rid, key=self._ids.__getitem__)
+        if j < self.count and self._ids[self._by_id[j]] == rid:
+            return self._by_id[j]
+        return None
+
+    def item(self, rid: int) -> Optional[Dict[str, Any]]:
+        i = self._row_of(int(rid))
+        return None if i is None else self.row(i)
+
+    def items(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        out = {}
+        for rid in ids:
+            i = self._row_of(int(rid))
+            if i is not None:
+                out[int(rid)] = self.row(i)
+        return out
+
+    def due(self, earliest: dt.datetime, latest: dt.datetime) -> List[Tuple[dt.datetime, int]]:
+        lo = bisect.bisect_left(self._whens, to_epoch_minute(earliest))
+        hi = bisect.bisect_right(self._whens, to_epoch_minute(latest))
+        return [(from_epoch_minute(self._whens[i]), self._ids[i]) for i in range(lo, hi)]
+
+
+def load_binary_schedule(path: Path) -> Dict[str, Any]:
+    """
+    Schedule-Dict wie load_schedule; "items" ist eine lazy Sequenz über die gemappte Datei.
+    Langlaufende Prozesse geben das Mapping mit schedule.close_schedule wieder frei.
+    """
+    sched = BinarySchedule(path)
+    schedule = dict(sched.header)
+    schedule["items"] = BinaryItems(sched)
+    return schedule
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Nachholen nach Ausfall (Reboot, Server down): Reminder, deren Zeitpunkt vor dem
+# grace-Fenster liegt, aber höchstens `lookback` zurück, und die nie gesendet wurden.
+#   skip                         bisheriges Verhalten: verpasste Reminder verfallen
+#   send-latest-per-participant  pro Projekt/Teilnehmer nur den jüngsten verpassten senden
+#   drain                        alle verpassten der Reihe nach senden, gedrosselt (--catch-up-rate)
+POLICIES = ("skip", "send-latest-per-participant", "drain")
+DEFAULT_LOOKBACK_HOURS = 24.0
+DEFAULT_RATE = 1.0  # Nachrichten/Sekunde beim Nachholen
+
+Due = Tuple[dt.datetime, int]
+
+
+@dataclass
+class CatchUpReport:
+    """Zählt pro Durchlauf, was nachgeholt bzw. verworfen wurde."""
+    missed: int = 0
+    queued: int = 0
+    dropped: int = 0
+    sent: int = 0
+    failed: int = 0
+
+    def add(self, other: "CatchUpReport") -> None:
+        self.missed += other.missed
+        self.queued += other.queued
+        self.dropped += other.dropped
+        self.sent += other.sent
+        self.failed += other.failed
+
+    def summary(self, policy: str) -> str:
+        return (
+            f"catch-up ({policy}): verpasst={self.missed} nachgeholt={self.sent} "
+            f"fehlgeschlagen={self.failed} verworfen={self.dropped}"
+        )
+
+
+def select_catch_up(policy: str, missed: List[Due], latest_sent: Optional[dt.datetime] = None) -> Tuple[List[Due], int]:
+    """
+    Wählt aus den verpassten (when, id) die nachzuholenden aus; gibt (Auswahl, Anzahl verworfen) zurück.
+
+    latest_sent: jüngster bereits gesendete Zeitpunkt im Nachhol-Zeitraum. Bei
+    send-latest-per-participant gelten ältere Reminder als erledigt (beim letzten
+    Nachholen schon verworfen) und werden nicht erneut gezählt.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unbekannte catch-up Policy '{policy}' (erlaubt: {', '.join(POLICIES)}).")
+    missed = sorted(missed)
+    if policy == "skip":
+        return [], len(missed)
+    if policy == "drain":
+        return missed, 0
+
+    if latest_sent is not None:
+        missed = [m for m in missed if m[0] > latest_sent]
+    if not missed:
+        return [], 0
+    return [missed[-1]], len(missed) - 1
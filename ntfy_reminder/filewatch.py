@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Änderungserkennung für Dateien, die ein langlaufender Prozess im Speicher hält (Daemon: Schedules, env):
+# Schlüssel (Gerät, Inode, mtime_ns, Größe) je Pfad. Unter Linux meldet inotify (per ctypes, keine
+# Abhängigkeit), welche Pfade neu geprüft werden müssen; sonst werden alle Pfade höchstens alle
+# poll_interval Sekunden per stat() verglichen. Gelesen/geparst wird nur, was sich wirklich geändert hat.
+
+# (st_dev, st_ino, st_mtime_ns, st_size); ein atomar ersetzter Schedule (tmp + replace) hat einen neuen Inode
+FileKey = Tuple[int, int, int, int]
+
+DEFAULT_POLL_INTERVAL = 5.0
+
+# inotify(7)
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (danach len Bytes Name)
+
+
+def file_key(path: Path) -> Optional[FileKey]:
+    """Identität + Stand einer Datei; None, wenn sie (gerade) nicht existiert."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _libc() -> Optional[Any]:
+    if not sys.platform.startswith("linux"):
+        return None
+    # ctypes erst hier: dispatch_due importiert filewatch, Oneshot-Läufe und das Polling brauchen ctypes nicht
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):  # sehr alte libc
+        return None
+    return libc
+
+
+class FileWatcher:
+    """
+    Beobachtet eine feste Menge von Dateien; changed() liefert die Pfade, deren FileKey
+    sich seit dem letzten Aufruf (bzw. seit dem Anlegen) geändert hat.
+
+    Überwacht werden bei inotify die Verzeichnisse, nicht die Dateien selbst: so fallen auch
+    atomare Ersetzungen (neuer Inode) und neu angelegte Dateien auf.
+    fileno() ist bei inotify lesbar, sobald ein Ereignis vorliegt (zum Aufwecken per select), sonst None.
+    use_inotify=False erzwingt stat()-Polling.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.keys: Dict[Path, Optional[FileKey]] = {Path(p): file_key(Path(p)) for p in paths}
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._last_poll = clock()
+        self._fd: Optional[int] = None
+        # Watch-Deskriptor -> (Verzeichnis, {Dateiname: Pfad})
+        self._watches: Dict[int, Tuple[Path, Dict[str, Path]]] = {}
+        if use_inotify and self.keys:
+            self._start_inotify()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._fd is not None else "poll"
+
+    def fileno(self) -> Optional[int]:
+        return self._fd
+
+    def _start_inotify(self) -> None:
+        libc = _libc()
+        if libc is None:
+            return
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return  # z.B. max_user_instances erreicht: Polling
+        by_dir: Dict[Path, Dict[str, Path]] = {}
+        for path in self.keys:
+            by_dir.setdefault(path.parent.resolve(), {})[path.name] = path
+        for directory, names in by_dir.items():
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                os.close(fd)  # Verzeichnis fehlt / max_user_watches: lieber alles per Polling
+                self._watches.clear()
+                return
+            self._watches[wd] = (directory, names)
+        self._fd = fd
+
+    def _pending(self) -> Set[Path]:
+        """Pfade mit inotify-Ereignissen seit dem letzten Aufruf (nicht blockierend)."""
+        assert self._fd is not None
+        paths: Set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return paths
+            if not data:
+                return paths
+            pos = 0
+            while pos + _EVENT.size <= len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, pos)
+                name = data[pos + _EVENT.size: pos + _EVENT.size + length].rstrip(b"\0")
+                pos += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    paths.update(self.keys)  # Ereignisse verloren: alles neu prüfen
+                    continue
+                watch = self._watches.get(wd)
+                if watch is not None:
+                    path = watch[1].get(os.fsdecode(name))
+                    if path is not None:
+                        paths.add(path)
+
+    def changed(self) -> List[Path]:
+        """Geänderte, neu angelegte oder gelöschte Pfade (nach FileKey, ohne den Inhalt zu lesen)."""
+        if self._fd is not None:
+            candidates: Iterable[Path] = self._pending()
+        else:
+            now = self.clock()
+            if now - self._last_poll < self.poll_interval:
+                return []
+            self._last_poll = now
+            candidates = self.keys
+        out = []
+        for path in candidates:
+            key = file_key(path)
+            if key != self.keys[path]:
+                self.keys[path] = key
+                out.append(path)
+        return out
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileWatcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
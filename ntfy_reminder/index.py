@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import json
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sidecar-Index zu einer schedule.json: <schedule>.idx
+#
+# Layout (little endian):
+#   Kopf:   magic "NTIX", version, reserviert, count, Größe + mtime_ns der schedule.json,
+#           Länge des Header-JSON (Schedule-Felder ohne "items")
+#   Header-JSON, aufgefüllt auf 8 Byte
+#   Sektion A: count Records (when_s, id, offset, length), sortiert nach (when, id)
+#   Sektion B: dieselben Records, sortiert nach id
+# when_s = Sekunden seit 1970-01-01 (naive Ortszeit wie im Schedule; --resolution < 60 plant sekundengenau),
+# offset/length = Bytebereich des Items in der schedule.json. Passt Größe/mtime nicht mehr oder ist der
+# Index älter (Version 1: Minuten), gilt er als veraltet.
+
+MAGIC = b"NTIX"
+VERSION = 2
+_HEAD = struct.Struct("<4sHHqqqI")
+_REC = struct.Struct("<qqqq")
+_EPOCH = dt.datetime(1970, 1, 1)
+
+# (when_s, id, offset, length)
+Record = Tuple[int, int, int, int]
+
+
+def index_path(schedule_path: Path) -> Path:
+    return schedule_path.with_name(schedule_path.name + ".idx")
+
+
+def to_epoch_minute(t: dt.datetime) -> int:
+    return int((t.replace(second=0, microsecond=0) - _EPOCH).total_seconds()) // 60
+
+
+def from_epoch_minute(m: int) -> dt.datetime:
+    return _EPOCH + dt.timedelta(minutes=m)
+
+
+def to_epoch_second(t: dt.datetime) -> int:
+    """Ganze Sekunden seit 1970-01-01 (abgerundet)."""
+    return math.floor((t - _EPOCH).total_seconds())
+
+
+def from_epoch_second(s: int) -> dt.datetime:
+    return _EPOCH + dt.timedelta(seconds=s)
+
+
+def write_index(schedule_path: Path, header: Dict[str, Any], records: List[Record]) -> None:
+    """Schreibt den Index atomar (tmp + replace) passend zum aktuellen Stand der schedule.json."""
+    by_when = sorted(records)
+    by_id = sorted(records, key=lambda r: r[1])
+    _write_sections(
+        schedule_path, header, len(records),
+        [b"".join(_REC.pack(*r) for r in section) for section in (by_when, by_id)],
+    )
+
+
+def _write_sections(schedule_path: Path, header: Dict[str, Any], count: int, sections: List[bytes]) -> None:
+    st = schedule_path.stat()
+    head_json = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    pad = b"\0" * (-(_HEAD.size + len(head_json)) % 8)
+
+    path = index_path(schedule_path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEAD.pack(MAGIC, VERSION, 0, count, st.st_size, st.st_mtime_ns, len(head_json)))
+        f.write(head_json + pad)
+        for section in sections:
+            f.write(section)
+    os.replace(tmp, path)
+
+
+class IndexBuilder:
+    """
+    Sammelt Records beim streamenden Schreiben, gepackt (32 Byte pro Item statt Tupel/Dict).
+    Kommen die Items bereits nach (when, id) und id aufsteigend (iter_schedule), werden
+    beide Sektionen ohne Sortieren aus demselben Puffer geschrieben.
+    """
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self.count = 0
+        self.valid = True
+        self._sorted = True
+        self._last: Optional[Tuple[int, int]] = None
+
+    def add(self, item: Dict[str, Any], offset: int, length: int) -> None:
+        if not self.valid:
+            return
+        try:
+            key = (to_epoch_second(dt.datetime.fromisoformat(item["when"])), int(item["id"]))
+        except (KeyError, TypeError, ValueError):
+            self.valid = False  # Item ohne gültiges when/id: kein Index
+            self._buf = bytearray()
+            return
+        if self._last is not None and not (key > self._last and key[1] > self._last[1]):
+            self._sorted = False
+        self._last = key
+        self._buf += _REC.pack(key[0], key[1], offset, length)
+        self.count += 1
+
+    def write(self, schedule_path: Path, header: Dict[str, Any]) -> None:
+        """Nach dem Schreiben der Schedule-Datei aufrufen (Index merkt sich deren Größe/mtime)."""
+        if not self.valid:
+            remove_index(schedule_path)
+        elif self._sorted:
+            _write_sections(schedule_path, header, self.count, [self._buf, self._buf])
+        else:
+            records = [_REC.unpack_from(self._buf, i * _REC.size) for i in range(self.count)]
+            write_index(schedule_path, header, records)
+
+
+def remove_index(schedule_path: Path) -> None:
+    try:
+        index_path(schedule_path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+class _Column:
+    """Sequenz-Sicht auf ein Feld einer Record-Sektion (für bisect ohne Kopie)."""
+
+    def __init__(self, buf: mmap.mmap, start: int, count: int, field: int):
+        self.buf = buf
+        self.start = start
+        self.count = count
+        self.field = field
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> int:
+        return _REC.unpack_from(self.buf, self.start + i * _REC.size)[self.field]
+
+
+class ScheduleIndex:
+    """
+    Lesender Zugriff über den Sidecar-Index: einzelne Items per id und fällige Items
+    per Binärsuche, ohne die ganze schedule.json zu parsen.
+    """
+
+    def __init__(self, schedule_path: Path, buf: mmap.mmap, header: Dict[str, Any], count: int, data_start: int):
+        self.schedule_path = schedule_path
+        self.header = header
+        self._buf = buf
+        self._count = count
+        self._by_when = data_start
+        self._by_id = data_start + count * _REC.size
+
+    @classmethod
+    def open(cls, schedule_path: Path) -> Optional["ScheduleIndex"]:
+        """Öffnet den Index; None, wenn er fehlt, kaputt oder veraltet ist."""
+        path = index_path(schedule_path)
+        try:
+            st = schedule_path.stat()
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < _HEAD.size:
+                    return None
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        magic, version, _, count, size, mtime_ns, head_len = _HEAD.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION or size != st.st_size or mtime_ns != st.st_mtime_ns:
+            buf.close()
+            return None
+        header = json.loads(bytes(buf[_HEAD.size:_HEAD.size + head_len]).decode("utf-8"))
+        data_start = _HEAD.size + head_len + (-(_HEAD.size + head_len) % 8)
+        if len(buf) < data_start + 2 * count * _REC.size:
+            buf.close()
+            return None
+        return cls(schedule_path, buf, header, count, data_start)
+
+    def close(self) -> None:
+        self._buf.close()
+
+    def __enter__(self) -> "ScheduleIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, start: int, i: int) -> Record:
+        return _REC.unpack_from(self._buf, start + i * _REC.size)
+
+    def _read_items(self, records: List[Record]) -> List[Dict[str, Any]]:
+        items = []
+        with open(self.schedule_path, "rb") as f:
+            for _, _, offset, length in records:
+                f.seek(offset)
+                items.append(json.loads(f.read(length).decode("utf-8")))
+        return items
+
+    def item(self, rid: int) -> Optional[Dict[str, Any]]:
+        """Lädt genau ein Item (per id) aus der schedule.json."""
+        ids = _Column(self._buf, self._by_id, self._count, 1)
+        i = bisect.bisect_left(ids, rid)
+        if i == self._count or ids[i] != rid:
+            return None
+        return self._read_items([self._record(self._by_id, i)])[0]
+
+    def due(self, earliest: dt.datetime, latest: dt.datetime) -> List[Tuple[dt.datetime, int]]:
+        """(when, id) aller Items mit earliest <= when <= latest (sekundengenau), sortiert."""
+        whens = _Column(self._buf, self._by_when, self._count, 0)
+        lo = bisect.bisect_left(whens, math.ceil((earliest - _EPOCH).total_seconds()))
+        hi = bisect.bisect_right(whens, to_epoch_second(latest))
+        out = []
+        for i in range(lo, hi):
+            when_s, rid, _, _ = self._record(self._by_when, i)
+            out.append((from_epoch_second(when_s), rid))
+        return out
+
+    def items(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Lädt mehrere Items per id (fehlende werden ausgelassen)."""
+        col = _Column(self._buf, self._by_id, self._count, 1)
+        records = []
+        for rid in ids:
+            i = bisect.bisect_left(col, rid)
+            if i < self._count and col[i] == rid:
+                records.append(self._record(self._by_id, i))
+        return {int(it["id"]): it for it in self._read_items(records)}
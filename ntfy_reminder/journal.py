@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+from pathlib import Path
+from typing import IO, Optional, Set
+
+# Anzahl Journal-Einträge, ab der beim nächsten maybe_compact() ein neuer Snapshot entsteht
+DEFAULT_COMPACT_EVERY = 500
+
+
+def journal_path(sent_path: Path) -> Path:
+    return sent_path.with_name(sent_path.name + ".journal")
+
+
+def _fsync_dir(path: Path) -> None:
+    # Verzeichnis-Eintrag (rename) dauerhaft machen; auf Windows nicht möglich/nötig
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SentJournal:
+    """
+    Crash-sicherer Sent-State: Snapshot (sent.json, bisheriges Format) + Append-only Journal.
+
+    - mark_sent(id) hängt direkt nach dem erfolgreichen Versand eine Zeile an
+      <sent>.journal an und macht sie per fsync dauerhaft (kein Rewrite der ganzen Liste).
+    - load() liest Snapshot + Journal; eine abgeschnittene letzte Zeile (Absturz beim
+      Schreiben) wird ignoriert.
+    - compact() schreibt einen neuen Snapshot atomar (tmp + fsync + replace) und leert
+      danach das Journal. Stirbt der Prozess dazwischen, stehen ids doppelt in
+      Snapshot und Journal; das ist beim Einlesen harmlos.
+    """
+
+    def __init__(self, sent_path: Path, compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.sent_path = sent_path
+        self.journal_path = journal_path(sent_path)
+        self.compact_every = compact_every
+        self.sent_ids: Set[int] = set()
+        self.pending = 0  # Einträge im Journal seit dem letzten Snapshot
+        self._fh: Optional[IO[str]] = None
+        self.load()
+
+    def load(self) -> None:
+        self.sent_ids = set()
+        if self.sent_path.exists():
+            sent = json.loads(self.sent_path.read_text(encoding="utf-8"))
+            self.sent_ids = set(int(x) for x in sent.get("sent_ids", []))
+
+        self.pending = 0
+        if self.journal_path.exists():
+            data = self.journal_path.read_text(encoding="utf-8")
+            lines = data.split("\n")
+            # letzte Zeile ohne "\n" ist unvollständig geschrieben
+            for line in lines[:-1]:
+                line = line.strip()
+                if line:
+                    self.sent_ids.add(int(line))
+                    self.pending += 1
+
+    def __contains__(self, rid: int) -> bool:
+        return rid in self.sent_ids
+
+    def mark_sent(self, rid: int) -> None:
+        if self._fh is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._drop_partial_tail()
+            self._fh = open(self.journal_path, "a", encoding="utf-8")
+        self._fh.write(f"{int(rid)}\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self.sent_ids.add(int(rid))
+        self.pending += 1
+
+    def _drop_partial_tail(self) -> None:
+        """Schneidet eine unvollständige letzte Zeile ab (sie zählt beim Laden ohnehin nicht)."""
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "r+b") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def compact(self) -> None:
+        """Snapshot neu schreiben und Journal leeren."""
+        snapshot = {
+            "sent_ids": sorted(self.sent_ids),
+            "updated_at": dt.datetime.now().isoformat(timespec="seconds"),
+        }
+        self.sent_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.sent_path.with_name(self.sent_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot, indent=2, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.sent_path)
+        _fsync_dir(self.sent_path.parent)
+
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self.journal_path.exists():
+            with open(self.journal_path, "w", encoding="utf-8") as f:
+                f.flush()
+                os.fsync(f.fileno())
+        self.pending = 0
+
+    def maybe_compact(self) -> bool:
+        if self.pending >= self.compact_every:
+            self.compact()
+            return True
+        return False
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
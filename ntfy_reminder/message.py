@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from ntfy_reminder.config import DEFAULT_SERVER
+from ntfy_reminder.templates import CompiledTemplates, compile_templates
+
+# Nachrichten rendern ohne Netzwerk-Code: von send.py (Publisher, Pool, Pipelining) und
+# send_one.py (schlanker Einzelversand) gemeinsam genutzt. Bewusst ohne http.client und
+# Planer-Module, damit der Import billig bleibt.
+
+
+def load_env_file(env_path: str) -> Dict[str, str]:
+    env: Dict[str, str] = {}
+    with open(env_path, "r", encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("export "):
+                line = line[len("export "):].strip()
+            if "=" not in line:
+                continue
+            k, v = line.split("=", 1)
+            k = k.strip()
+            v = v.strip().strip('"').strip("'")
+            env[k] = v
+    return env
+
+
+def build_payload(schedule: dict, item: dict) -> dict:
+    """
+    Erzeuge ein payload Dict für Template-Platzhalter:
+      {id}, {day}, {k}, {per_day}, {when}, {time}, {url}
+    """
+    return {
+        "id": str(item.get("id", "")),
+        "day": str(item.get("day", "")),
+        "k": str(item.get("k", "")),
+        "n": str(item.get("k", "")),
+        "per_day": str(item.get("per_day", schedule.get("per_day", ""))),
+        "when": str(item.get("when", "")),
+        "time": str(item.get("time", "")),
+        # url wird später ergänzt
+        "url": "",
+    }
+
+
+def publish_mode(env: Dict[str, str]) -> str:
+    mode = str(env.get("NTFY_PUBLISH_MODE", "")).strip().lower() or "header"
+    if mode not in {"header", "json"}:
+        raise RuntimeError(f"NTFY_PUBLISH_MODE muss 'header' oder 'json' sein, nicht '{mode}'.")
+    return mode
+
+
+def build_message(
+    payload: Dict[str, str],
+    env: Dict[str, str],
+    server: str,
+    explain: bool = False,
+    click_url: Optional[str] = None,
+    markdown: bool = False,
+    mode: str = "header",
+    templates: Optional[CompiledTemplates] = None,
+) -> Tuple[str, bytes, Dict[str, str]]:
+    """
+    Rendert eine Nachricht zu (url, body, headers), ohne zu senden.
+
+    mode="header": POST {server}/{topic}, Text-Body, Title/Click/Actions/Markdown als Header
+    mode="json":   POST {server}/ mit JSON-Body (topic/title/message/click/actions/markdown)
+    templates: vorab geprüfte Templates (SendContext); sonst werden sie aus env kompiliert
+    """
+    if templates is None:
+        templates = compile_templates(env)
+    topic = templates.topic
+    title = templates.title.render(payload)
+    body = templates.message.render(payload)
+
+    if mode == "json":
+        # JSON publishing: alles im Body, POST an die Server-Root
+        msg: Dict[str, Any] = {"topic": topic, "title": title, "message": body}
+        if click_url:
+            msg["click"] = click_url
+            msg["actions"] = [{"action": "view", "label": "Start survey", "url": click_url}]
+        if markdown:
+            msg["markdown"] = True
+        url = f"{server.rstrip('/')}/"
+        data = json.dumps(msg, ensure_ascii=False).encode("utf-8")
+        if explain:
+            print(f"[explain] POST {url}")
+            print(f"[explain] JSON: {data.decode('utf-8')}")
+        return url, data, {"Content-Type": "application/json"}
+
+    url = f"{server.rstrip('/')}/{topic}"
+    data = body.encode("utf-8")
+
+    if explain:
+        print(f"[explain] POST {url}")
+        print(f"[explain] Title: {title}")
+        if click_url:
+            print(f"[explain] Click: {click_url}")
+        print(f"[explain] Body:\n{body}")
+
+    headers = {
+        "Title": title,
+        "Content-Type": "text/plain; charset=utf-8",
+    }
+
+    # Click action (alias für X-Click) :contentReference[oaicite:4]{index=4}
+    if click_url:
+        headers["Click"] = click_url
+
+        # Action Button (Button in der Notification) – Label bitte ASCII, sonst ggf. 400
+        headers["Actions"] = f"view, Start survey, {click_url}"
+
+    # Markdown (optional; Web-App only) :contentReference[oaicite:5]{index=5}
+    if markdown:
+        headers["Markdown"] = "yes"
+
+    return url, data, headers
+
+
+def resolve_server(env: Dict[str, str], server: Optional[str] = None) -> str:
+    """Expliziter Override, sonst NTFY_SERVER aus env, sonst DEFAULT_SERVER."""
+    return server or str(env.get("NTFY_SERVER", "")).strip() or DEFAULT_SERVER
+
+
+def markdown_enabled(env: Dict[str, str]) -> bool:
+    # Optional: Markdown für ntfy Web-App (nicht überall gerendert)
+    return str(env.get("NTFY_MARKDOWN", "")).strip().lower() in {"1", "true", "yes", "y"}
+
+
+def render_reminder(
+    schedule: Dict[str, Any],
+    item: Dict[str, Any],
+    env: Dict[str, str],
+    server: str,
+    templates: CompiledTemplates,
+    markdown: bool = False,
+    mode: str = "header",
+    explain: bool = False,
+) -> Tuple[str, bytes, Dict[str, str]]:
+    """Payload + Survey-Link + Nachricht für einen Reminder, als (url, body, headers)."""
+    payload = build_payload(schedule, item)
+
+    # Survey URL bauen und in payload schreiben
+    survey_url = templates.survey.render(payload) if templates.survey else ""
+    payload["url"] = survey_url
+
+    return build_message(
+        payload,
+        env,
+        server,
+        explain=explain,
+        click_url=survey_url or None,   # Click Header setzen (öffnet URL beim Tap)
+        markdown=markdown,
+        mode=mode,
+        templates=templates,
+    )
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import random
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Backoff-Defaults: 30s, 60s, 2min, ... höchstens 30min zwischen zwei Versuchen;
+# nach 6h (ab geplantem Zeitpunkt) landet ein Reminder im Dead-Letter-File
+DEFAULT_BASE_DELAY = 30.0
+DEFAULT_MAX_DELAY = 30 * 60.0
+DEFAULT_MAX_AGE = 6 * 3600.0
+
+
+def retry_path(state_path: Path) -> Path:
+    return state_path.with_name(state_path.name + ".retry.json")
+
+
+def dead_letter_path(state_path: Path) -> Path:
+    return state_path.with_name(state_path.name + ".dead.jsonl")
+
+
+def _iso(t: dt.datetime) -> str:
+    return t.isoformat(timespec="seconds")
+
+
+class RetryQueue:
+    """
+    Persistierte Warteschlange fehlgeschlagener Reminder eines Projekts (<sent>.retry.json).
+
+    - record_failure() zählt den Versuch und plant den nächsten mit exponentiellem Backoff
+      (base * 2^(n-1), höchstens max_delay) und Jitter (50-100 % der Wartezeit).
+    - Wäre der nächste Versuch später als when + max_age, wird der Reminder stattdessen als
+      JSON-Zeile an <sent>.dead.jsonl angehängt und aus der Warteschlange entfernt.
+    - due(now) liefert die ids, deren nächster Versuch fällig ist; der Dispatcher lädt nur
+      diese Items nach, statt den Schedule erneut zu durchsuchen.
+    """
+
+    def __init__(
+        self,
+        state_path: Path,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_age: float = DEFAULT_MAX_AGE,
+        rng: Optional[random.Random] = None,
+    ):
+        self.path = retry_path(state_path)
+        self.dead_path = dead_letter_path(state_path)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_age = max_age
+        self.rng = rng or random.Random()
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.dirty = False
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.entries = {int(rid): e for rid, e in data.get("items", {}).items()}
+
+    def __contains__(self, rid: int) -> bool:
+        return rid in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def next_attempt(self, rid: int) -> Optional[dt.datetime]:
+        e = self.entries.get(rid)
+        return dt.datetime.fromisoformat(e["next_at"]) if e else None
+
+    def waiting(self, rid: int, now: dt.datetime) -> bool:
+        """True, wenn der Reminder gerade im Backoff ist (nicht erneut senden)."""
+        t = self.next_attempt(rid)
+        return t is not None and t > now
+
+    def due(self, now: dt.datetime) -> List[int]:
+        """ids mit fälligem nächsten Versuch, älteste zuerst."""
+        due = [(e["next_at"], rid) for rid, e in self.entries.items() if dt.datetime.fromisoformat(e["next_at"]) <= now]
+        return [rid for _, rid in sorted(due)]
+
+    def record_failure(self, item: Dict[str, Any], err: Exception, now: dt.datetime) -> Optional[dt.datetime]:
+        """Versuch verbuchen; gibt den nächsten Versuchszeitpunkt zurück oder None (Dead Letter)."""
+        rid = int(item["id"])
+        e = self.entries.get(rid) or {"id": rid, "when": item.get("when"), "attempts": 0, "first_error_at": _iso(now)}
+        e["attempts"] += 1
+        e["last_error"] = str(err)[:500]
+
+        delay = min(self.max_delay, self.base_delay * 2 ** (e["attempts"] - 1))
+        delay *= self.rng.uniform(0.5, 1.0)
+        next_at = now + dt.timedelta(seconds=delay)
+
+        try:
+            deadline = dt.datetime.fromisoformat(str(e["when"])) + dt.timedelta(seconds=self.max_age)
+        except ValueError:
+            deadline = now
+        if next_at > deadline:
+            self._dead_letter(e, now)
+            return None
+
+        e["next_at"] = _iso(next_at)
+        self.entries[rid] = e
+        self.dirty = True
+        return next_at
+
+    def _dead_letter(self, entry: Dict[str, Any], now: dt.datetime) -> None:
+        record = {k: v for k, v in entry.items() if k != "next_at"}
+        record["dead_at"] = _iso(now)
+        self.dead_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.dead_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self.entries.pop(int(entry["id"]), None) is not None:
+            self.dirty = True
+
+    def dead_ids(self) -> Set[int]:
+        """ids, die bereits im Dead-Letter-File stehen (nicht erneut nachholen)."""
+        if not self.dead_path.exists():
+            return set()
+        ids = set()
+        for line in self.dead_path.read_text(encoding="utf-8").splitlines():
+            try:
+                ids.add(int(json.loads(line)["id"]))
+            except (ValueError, KeyError, TypeError):
+                continue  # unvollständige Zeile
+        return ids
+
+    def discard(self, rid: int) -> None:
+        """Nach erfolgreichem Versand (oder wenn das Item nicht mehr im Schedule ist)."""
+        if self.entries.pop(int(rid), None) is not None:
+            self.dirty = True
+
+    def prune(self, sent_ids: Iterable[int]) -> None:
+        """Einträge entfernen, die laut Sent-State schon zugestellt sind."""
+        for rid in set(self.entries) & set(sent_ids):
+            self.discard(rid)
+
+    def save(self) -> None:
+        """Atomar schreiben (tmp + replace); eine leere Warteschlange löscht die Datei."""
+        if not self.dirty:
+            return
+        if not self.entries:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+        else:
+            data = {
+                "items": {str(rid): e for rid, e in sorted(self.entries.items())},
+                "updated_at": _iso(dt.datetime.now()),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        self.dirty = False
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import bisect
 import datetime as dt
+import functools
+import itertools
 import json
+import os
 import random
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ntfy_reminder.binary import BinarySchedule, is_binary_schedule, load_binary_schedule, save_binary_schedule
+from ntfy_reminder.index import IndexBuilder, ScheduleIndex
+
+
+DAY_SECONDS = 24 * 3600
 
 
 @dataclass(frozen=True)
 class TimeWindow:
     start: dt.time  # inclusive
-    end: dt.time    # exclusive
+    end: dt.time    # exclusive; end < start: Fenster geht über Mitternacht (bis in den Folgetag)
 
     def minutes_range(self) -> Tuple[int, int]:
         """Return (start_minute, end_minute) end exclusive, minutes since 00:00."""
@@ -19,6 +29,12 @@ class TimeWindow:
         e = self.end.hour * 60 + self.end.minute
         return s, e
 
+    def seconds_range(self) -> Tuple[int, int]:
+        """(start, end) in Sekunden seit 00:00, end exklusiv."""
+        s = self.start.hour * 3600 + self.start.minute * 60 + self.start.second
+        e = self.end.hour * 3600 + self.end.minute * 60 + self.end.second
+        return s, e
+
 
 def daterange(start: dt.date, end: dt.date):
     cur = start
@@ -29,18 +45,20 @@ def daterange(start: dt.date, end: dt.date):
 
 def parse_hhmm(s: str) -> dt.time:
     """
-    Parse 'HH:MM' into datetime.time.
+    Parse 'HH:MM' (oder 'HH:MM:SS') into datetime.time.
     """
     try:
-        h, m = s.split(":")
-        return dt.time(int(h), int(m))
+        parts = s.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(s)
+        return dt.time(*(int(p) for p in parts))
     except Exception as e:
-        raise ValueError(f"Ungültiges Zeitformat '{s}'. Erwartet HH:MM (z.B. 08:30).") from e
+        raise ValueError(f"Ungültiges Zeitformat '{s}'. Erwartet HH:MM oder HH:MM:SS (z.B. 08:30).") from e
 
 
 def parse_windows(spec: str) -> List[TimeWindow]:
     """
-    spec like: "08:00-10:00,12:00-14:00,16:00-18:00"
+    spec like: "08:00-10:00,12:00-14:00,16:00-18:00" (22:00-02:00 geht über Mitternacht)
     """
     windows: List[TimeWindow] = []
     for part in spec.split(","):
@@ -56,43 +74,256 @@ def parse_windows(spec: str) -> List[TimeWindow]:
     return windows
 
 
+class AllowedTime:
+    """
+    Erlaubte Zeit eines Tages als sortierte, disjunkte Intervalle [starts[i], ends[i]) in Sekunden
+    seit 00:00, dazu Präfixsummen der Längen (prefix[i] = erlaubte Sekunden vor Intervall i).
+    Fenster über Mitternacht reichen über DAY_SECONDS hinaus in den Folgetag.
+    Mitgliedschaft, Rang und k-te erlaubte Sekunde kosten O(log Intervalle), ohne Minuten oder
+    Sekunden einzeln aufzuzählen.
+    """
+
+    def __init__(self, spans: Iterable[Tuple[int, int]]):
+        merged: List[List[int]] = []
+        for s, e in sorted(spans):
+            if e <= s:
+                continue
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+        self.prefix = list(itertools.accumulate((e - s for s, e in merged), initial=0))
+
+    @classmethod
+    def from_windows(cls, windows: List[TimeWindow]) -> "AllowedTime":
+        """
+        Fenster mit Ende < Start gehen über Mitternacht: 22:00-02:00 ist am Tag D ein Intervall
+        22:00 bis 02:00 des Folgetags (Sekunden 79200..93600), der Mindestabstand gilt also auch
+        über Mitternacht. Alle Fenster eines Tages müssen in 24h passen, sonst überschnitte sich
+        der Tag mit dem Folgetag (z.B. "22:00-02:00,01:00-03:00").
+        """
+        spans: List[Tuple[int, int]] = []
+        for w in windows:
+            s, e = w.seconds_range()
+            if e == s:
+                raise ValueError(f"Ungültiges Fenster (Ende = Start): {w.start}-{w.end}")
+            spans.append((s, e + DAY_SECONDS if e < s else e))
+        allowed = cls(spans)
+        if allowed.starts and allowed.ends[-1] - allowed.starts[0] > DAY_SECONDS:
+            raise ValueError(
+                f"Zeitfenster {windows_spec(windows)} überschneiden sich mit denen des Folgetags "
+                "(Fenster über Mitternacht enden nach dem frühesten Fensterbeginn)."
+            )
+        return allowed
+
+    @property
+    def total(self) -> int:
+        """Erlaubte Sekunden pro Tag."""
+        return self.prefix[-1]
+
+    def spans(self) -> Tuple[Tuple[int, int], ...]:
+        return tuple(zip(self.starts, self.ends))
+
+    def __contains__(self, t: int) -> bool:
+        i = bisect.bisect_right(self.starts, t) - 1
+        return i >= 0 and t < self.ends[i]
+
+    def rank(self, t: int) -> int:
+        """Anzahl erlaubter Sekunden vor t."""
+        i = bisect.bisect_right(self.starts, t) - 1
+        return 0 if i < 0 else self.prefix[i] + min(t, self.ends[i]) - self.starts[i]
+
+    def nth(self, k: int) -> int:
+        """k-te erlaubte Sekunde (0-basiert); Umkehrung von rank."""
+        if not 0 <= k < self.total:
+            raise IndexError(f"k={k} außerhalb von 0..{self.total - 1}")
+        i = bisect.bisect_right(self.prefix, k) - 1
+        return self.starts[i] + k - self.prefix[i]
+
+    def segments(self, step: int = 60) -> List[Tuple[int, int]]:
+        """
+        Intervalle im Raster `step` Sekunden: (a, b) = Rasterpunkte a..b-1 (Zeitpunkt = Index * step).
+        step=60 ergibt die Minuten-Segmente für max_per_day/feasible_or_raise.
+        """
+        out: List[Tuple[int, int]] = []
+        for s, e in zip(self.starts, self.ends):
+            a, b = -(-s // step), -(-e // step)
+            if a >= b:
+                continue
+            if out and a <= out[-1][1]:
+                out[-1] = (out[-1][0], max(out[-1][1], b))
+            else:
+                out.append((a, b))
+        return out
+
+    def points(self, step: int = 60) -> List[int]:
+        """Alle erlaubten Rasterpunkte (Sekunden seit 00:00, Vielfache von step)."""
+        return [i * step for a, b in self.segments(step) for i in range(a, b)]
+
+
 def windows_to_minute_slots(windows: List[TimeWindow]) -> List[int]:
     """
     Returns sorted allowed minutes-of-day (0..1439) where reminders may start.
-    Minute granularity.
+    Minute granularity. Fenster über Mitternacht liefern Minuten ab 1440 (Folgetag).
     """
-    allowed: List[int] = []
-    for w in windows:
-        s, e = w.minutes_range()
-        if e <= s:
-            raise ValueError(f"Ungültiges Fenster (Ende <= Start): {w.start}-{w.end}")
-        allowed.extend(range(s, e))
-    return sorted(set(allowed))
+    return [s // 60 for s in AllowedTime.from_windows(windows).points(60)]
+
+
+def windows_to_segments(windows: List[TimeWindow]) -> List[Tuple[int, int]]:
+    """
+    Fasst Zeitfenster zu sortierten, disjunkten Segmenten (start, end) zusammen,
+    Minuten seit 00:00 des Tages (über Mitternacht auch >= 1440), end exklusiv.
+    """
+    return AllowedTime.from_windows(windows).segments(60)
+
+
+def minutes_to_segments(allowed_minutes: List[int]) -> List[Tuple[int, int]]:
+    """Umkehrung von windows_to_minute_slots: Minutenliste -> Segmente."""
+    segments: List[Tuple[int, int]] = []
+    for m in sorted(set(allowed_minutes)):
+        if segments and m == segments[-1][1]:
+            segments[-1] = (segments[-1][0], m + 1)
+        else:
+            segments.append((m, m + 1))
+    return segments
 
 
 def interval_to_windows(start: dt.time, end: dt.time) -> List[TimeWindow]:
     return [TimeWindow(start, end)]
 
 
-def feasible_or_raise(allowed_minutes: List[int], per_day: int, min_gap: int):
+def max_per_day(segments: List[Tuple[int, int]], min_gap: int, limit: Optional[int] = None) -> int:
+    """
+    Maximal erreichbares per_day bei gegebenem min_gap (exakt).
+
+    Greedy: jeden Reminder so früh wie möglich setzen. Lücken zwischen den Fenstern
+    zählen beim Abstand mit. Mit `limit` bricht der Scan ab, sobald so viele
+    Reminder passen (Feasibility-Check in O(limit * log Fenster)).
+    """
+    step = max(min_gap, 1)
+    ends = [e for _, e in segments]
+    count = 0
+    t = segments[0][0] if segments else 0
+    while limit is None or count < limit:
+        i = bisect.bisect_right(ends, t)
+        if i == len(segments):
+            break
+        t = max(t, segments[i][0])
+        count += 1
+        t += step
+    return count
+
+
+def max_min_gap(segments: List[Tuple[int, int]], per_day: int) -> int:
+    """
+    Größtes min_gap, mit dem per_day Reminder noch passen (Umkehrung von max_per_day).
+    Gibt -1 zurück, wenn per_day selbst ohne Abstand nicht passt.
+    """
+    if not segments or max_per_day(segments, 0, limit=per_day) < per_day:
+        return -1
+    lo, hi = 0, segments[-1][1] - segments[0][0]
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if max_per_day(segments, mid, limit=per_day) >= per_day:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _gap_text(seconds: int) -> str:
+    return f"{seconds // 60}min" if seconds % 60 == 0 else f"{seconds // 60}min {seconds % 60}s"
+
+
+def feasible_or_raise(segments: List[Tuple[int, int]], per_day: int, min_gap: int, step: int = 60):
+    """
+    Exakter Feasibility-Check über die Segmente (siehe windows_to_segments).
+    Segmente und min_gap in Rasterpunkten zu `step` Sekunden (Default: Minuten).
+    """
     if per_day <= 0:
         raise ValueError("per_day muss >= 1 sein.")
     if min_gap < 0:
         raise ValueError("min_gap_minutes muss >= 0 sein.")
-    if not allowed_minutes:
+    if not segments:
         raise ValueError("Keine erlaubten Minuten im Intervall/Fenstern.")
 
-    # quick feasibility bound (necessary condition, not always sufficient but good guard)
-    available = len(allowed_minutes)
-    needed = per_day + (per_day - 1) * min_gap
-    if needed > available:
+    capacity = max_per_day(segments, min_gap, limit=per_day)
+    if capacity < per_day:
+        capacity = max_per_day(segments, min_gap)
+        gap = max_min_gap(segments, per_day)
+        hint = f"min_gap höchstens {_gap_text(gap * step)}" if gap >= 0 else "auch ohne Abstand nicht möglich"
         raise ValueError(
-            f"Unmöglich: per_day={per_day} mit min_gap={min_gap}min braucht ca. {needed} Minuten Platz, "
-            f"aber nur {available} Minuten sind erlaubt. "
+            f"Unmöglich: mit min_gap={_gap_text(min_gap * step)} passen höchstens {capacity} Reminder pro Tag, "
+            f"gewünscht sind per_day={per_day} ({hint}). "
             "=> min_gap reduzieren oder Fenster/Intervall vergrößern oder per_day reduzieren."
         )
 
 
+class GapSampler:
+    """
+    Exakter Sampler für per_day Zeitpunkte mit Mindestabstand (ohne Wiederholungsversuche).
+
+    Einmalig wird per dynamischer Programmierung gezählt, wie viele gültige Konfigurationen
+    es ab jedem erlaubten Zeitpunkt gibt. Danach wird jeder Tag direkt gezogen:
+    pro Zeitpunkt eine Zufallszahl aus `rng` + Binärsuche, also O(per_day * log n).
+    Jede gültige Konfiguration hat dieselbe Wahrscheinlichkeit (Gleichverteilung).
+    `unit`: Sekunden pro Wert in allowed/min_gap (60 = Minuten, 1 = Sekunden).
+    """
+
+    def __init__(self, allowed_minutes: List[int], per_day: int, min_gap: int, unit: int = 60):
+        self.allowed = sorted(set(allowed_minutes))
+        self.per_day = per_day
+        self.unit = unit
+        # zwei Zeitpunkte liegen nie auf demselben Wert, daher Abstand mindestens 1
+        step = max(min_gap, 1)
+        n = len(self.allowed)
+        # _next[i]: erster Index, der nach Wahl von allowed[i] noch erlaubt ist
+        self._next = [bisect.bisect_left(self.allowed, m + step) for m in self.allowed]
+
+        # _neg[j-1][i] = -(Anzahl Konfigurationen mit j Zeitpunkten aus allowed[i:]),
+        # negiert, damit die Liste aufsteigend sortiert ist (bisect)
+        self._neg: List[List[int]] = []
+        prev = [1] * (n + 1)
+        for _ in range(per_day):
+            cur = [0] * (n + 1)
+            for i in range(n - 1, -1, -1):
+                cur[i] = cur[i + 1] + prev[self._next[i]]
+            self._neg.append([-c for c in cur])
+            prev = cur
+        self.count = prev[0]
+
+    def sample(self, rng: random.Random) -> List[int]:
+        """Zieht eine gültige Konfiguration (sortierte Werte seit 00:00, in `unit`)."""
+        if self.count == 0:
+            raise ValueError("Keine gültige Konfiguration möglich.")
+        chosen: List[int] = []
+        lo = 0
+        for j in range(self.per_day, 0, -1):
+            neg = self._neg[j - 1]
+            r = rng.randrange(-neg[lo])
+            # letzte Position q >= lo mit count[q] > r
+            q = bisect.bisect_left(neg, -r, lo) - 1
+            chosen.append(self.allowed[q])
+            lo = self._next[q]
+        return chosen
+
+
+# Obergrenze für die Zähltabellen des GapSamplers (Rasterpunkte * per_day, je ein int):
+# sekundengenaue Raster über viele Stunden mit großem per_day würden sonst Hunderte MB belegen.
+MAX_SAMPLER_CELLS = 2_000_000
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_sampler(
+    spans: Tuple[Tuple[int, int], ...], resolution: int, per_day: int, min_gap_seconds: int
+) -> GapSampler:
+    # Die Zähltabellen hängen nur von Fenstern/Raster/per_day/min_gap ab, nicht vom Seed:
+    # bei vielen Teilnehmenden (plan-batch) und in jedem Worker werden sie nur einmal berechnet.
+    return GapSampler(AllowedTime(spans).points(resolution), per_day, min_gap_seconds, unit=1)
+
+
 def pick_times_for_day(
     day: dt.date,
     allowed_minutes: List[int],
@@ -100,47 +331,217 @@ def pick_times_for_day(
     min_gap: int,
     rng: random.Random,
     explain: bool = False,
-    max_attempts: int = 5000,
+    sampler: Optional[GapSampler] = None,
 ) -> List[dt.datetime]:
     """
-    Rejection sampling with constraint check.
     Picks per_day times on 'day' such that distance between any two is >= min_gap.
+    Gleichverteilt über alle gültigen Konfigurationen (siehe GapSampler).
+    `sampler` kann vorberechnet übergeben werden (z.B. einmal pro Schedule).
     """
-    feasible_or_raise(allowed_minutes, per_day, min_gap)
+    if sampler is None:
+        feasible_or_raise(minutes_to_segments(allowed_minutes), per_day, min_gap)
+        sampler = GapSampler(allowed_minutes, per_day, min_gap)
+
+    if sampler.count == 0:
+        raise RuntimeError(
+            f"Für {day.isoformat()} existiert kein gültiger Schedule. "
+            "=> min_gap reduzieren oder erlaubte Zeitfenster vergrößern."
+        )
 
-    def ok(candidate: int, chosen: List[int]) -> bool:
-        return all(abs(candidate - c) >= min_gap for c in chosen)
+    # Offsets ab 00:00 des Tages; über Mitternacht (>= 24h) landen sie am Folgetag
+    midnight = dt.datetime.combine(day, dt.time())
+    times = [midnight + dt.timedelta(seconds=v * sampler.unit) for v in sampler.sample(rng)]
+    if explain:
+        hhmm = ", ".join(_fmt_time(t.time()) + ("(+1)" if t.date() > day else "") for t in times)
+        print(f"[explain] {day.isoformat()}: gewählt -> {hhmm}")
+    return times
 
-    attempts = 0
-    while attempts < max_attempts:
-        attempts += 1
-        chosen: List[int] = []
-        pool = allowed_minutes[:]  # copy
-        rng.shuffle(pool)
-
-        for minute in pool:
-            if ok(minute, chosen):
-                chosen.append(minute)
-                if len(chosen) == per_day:
-                    chosen.sort()
-                    if explain:
-                        hhmm = ", ".join(f"{m//60:02d}:{m%60:02d}" for m in chosen)
-                        print(f"[explain] {day.isoformat()}: gewählt -> {hhmm}")
-                    return [
-                        dt.datetime.combine(day, dt.time(minute // 60, minute % 60))
-                        for minute in chosen
-                    ]
-
-        if explain and attempts % 500 == 0:
-            print(f"[explain] noch kein gültiger Satz für {day.isoformat()} nach {attempts} Versuchen...")
-
-    raise RuntimeError(
-        f"Konnte für {day.isoformat()} nach {max_attempts} Versuchen keinen gültigen Schedule finden. "
-        "=> min_gap reduzieren oder erlaubte Zeitfenster vergrößern."
-    )
 
+def _fmt_time(t: dt.time) -> str:
+    """HH:MM, mit Sekunden nur wenn nötig."""
+    return f"{t:%H:%M:%S}" if t.second else f"{t:%H:%M}"
 
-def generate_schedule(
+
+def windows_spec(windows: List[TimeWindow]) -> str:
+    """Normalisierte Schreibweise "HH:MM-HH:MM,..." (steht im Schedule-Header, für replan)."""
+    return ",".join(f"{_fmt_time(w.start)}-{_fmt_time(w.end)}" for w in windows)
+
+
+def _resolve_windows(
+    mode: str,
+    interval: Optional[Tuple[dt.time, dt.time]],
+    windows: Optional[List[TimeWindow]],
+) -> List[TimeWindow]:
+    if mode not in {"interval", "windows"}:
+        raise ValueError("mode muss 'interval' oder 'windows' sein.")
+
+    if mode == "interval":
+        if not interval:
+            raise ValueError("Für mode='interval' muss interval=(start,end) gesetzt sein.")
+        return interval_to_windows(interval[0], interval[1])
+    if not windows:
+        raise ValueError("Für mode='windows' muss windows=[...] gesetzt sein.")
+    return windows
+
+
+def _check_resolution(resolution: int) -> None:
+    if not 1 <= resolution <= 3600:
+        raise ValueError(f"resolution muss zwischen 1 und 3600 Sekunden liegen (ist {resolution}).")
+
+
+def _prepare_sampler(
+    win: List[TimeWindow], per_day: int, min_gap_minutes: int, explain: bool = False, resolution: int = 60
+) -> Tuple[AllowedTime, GapSampler]:
+    """
+    Machbarkeit prüfen und (erlaubte Zeit, Sampler) für alle Tage eines Schedules liefern.
+    resolution: Raster der Zeitpunkte in Sekunden (60 = minutengenau, 1 = sekundengenau).
+    """
+    _check_resolution(resolution)
+    allowed = AllowedTime.from_windows(win)
+    # exakter Check auf den Intervallen vor jeder Expansion: unmögliche Configs scheitern sofort
+    segments = allowed.segments(resolution)
+    gap = -(-min_gap_minutes * 60 // resolution)  # Mindestabstand in Rasterpunkten (aufgerundet)
+    if explain:
+        limit = max_min_gap(segments, per_day)
+        print(
+            f"[explain] Kapazität: max. {max_per_day(segments, gap)} Reminder/Tag "
+            f"bei min_gap={min_gap_minutes}min; "
+            f"max. min_gap={_gap_text(limit * resolution) if limit >= 0 else '-1min'} bei per_day={per_day}"
+        )
+    feasible_or_raise(segments, per_day, gap, resolution)
+
+    n = sum(b - a for a, b in segments)
+    if explain:
+        unit = "Minuten" if resolution == 60 else f"Zeitpunkte (Raster {resolution}s)"
+        print(f"[explain] erlaubte {unit} pro Tag: {n} (aus {len(win)} Fenster(n))")
+    if n * per_day > MAX_SAMPLER_CELLS:
+        raise ValueError(
+            f"Raster zu fein: {n} Zeitpunkte pro Tag x per_day={per_day} übersteigt {MAX_SAMPLER_CELLS} "
+            "=> größere resolution wählen (z.B. 60 statt 1 Sekunde) oder Fenster verkleinern."
+        )
+
+    sampler = _cached_sampler(allowed.spans(), resolution, per_day, min_gap_minutes * 60)
+    if explain:
+        print(f"[explain] gültige Konfigurationen pro Tag: {sampler.count}")
+    return allowed, sampler
+
+
+def _day_items(
+    times: List[dt.datetime], day: dt.date, per_day: int, first_id: int, resolution: int = 60
+) -> List[Dict[str, Any]]:
+    # times sind sortiert (pick_times_for_day sortiert die Zeitpunkte), daher ist k stabil
+    timespec, fmt = ("minutes", "%H:%M") if resolution % 60 == 0 else ("seconds", "%H:%M:%S")
+    return [
+        {
+            "id": first_id + k - 1,           # globale ID (1..N)
+            "day": day.isoformat(),           # "YYYY-MM-DD"
+            "k": k,                           # 1..per_day innerhalb des Tages
+            "per_day": per_day,               # für Templates
+            "when": t.isoformat(timespec=timespec),  # "YYYY-MM-DDTHH:MM" (bzw. ":SS")
+            "time": t.strftime(fmt),          # "HH:MM" (bzw. "HH:MM:SS")
+        }
+        for k, t in enumerate(times, start=1)
+    ]
+
+
+def schedule_header(
+    start_date: dt.date,
+    end_date: dt.date,
+    per_day: int,
+    min_gap_minutes: int,
+    mode: str,
+    interval: Optional[Tuple[dt.time, dt.time]] = None,
+    windows: Optional[List[TimeWindow]] = None,
+    resolution: int = 60,
+) -> Dict[str, Any]:
+    """Schedule-Felder ohne "items" (für das streamende Schreiben vor den Items)."""
+    header = {
+        "generated_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "per_day": per_day,
+        "min_gap_minutes": min_gap_minutes,
+        "mode": mode,
+        "windows": windows_spec(_resolve_windows(mode, interval, windows)),
+    }
+    if resolution != 60:
+        header["resolution_seconds"] = resolution
+    return header
+
+
+def day_rng(seed: Optional[int], day: dt.date) -> random.Random:
+    """
+    Eigener Zufallsstrom je (Seed, Tag). random.Random hasht str-Seeds (SHA-512), die Tage
+    sind also voneinander unabhängig: jeder Tag lässt sich einzeln reproduzieren, ohne die
+    Tage davor zu ziehen, und Tage können parallel geplant werden. Die participant_id steckt
+    bereits im Seed (derive_seed). seed=None: echte Zufälligkeit.
+    """
+    return random.Random(None if seed is None else f"{seed}:{day.isoformat()}")
+
+
+# Tage pro Aufgabe im Prozess-Pool (kleinere Stücke lohnen den Pickle-Overhead nicht)
+PLAN_CHUNK_DAYS = 32
+
+# (start_date, offset, count, Intervalle der erlaubten Zeit, resolution, per_day, min_gap_minutes, seed, explain)
+PlanTask = Tuple[dt.date, int, int, Tuple[Tuple[int, int], ...], int, int, int, Optional[int], bool]
+
+
+def _plan_days(task: PlanTask) -> List[Dict[str, Any]]:
+    """Items der Tage start_date + [offset, offset + count); läuft auch in Worker-Prozessen."""
+    start_date, offset, count, spans, resolution, per_day, min_gap, seed, explain = task
+    sampler = _cached_sampler(spans, resolution, per_day, min_gap * 60)
+    items: List[Dict[str, Any]] = []
+    for i in range(offset, offset + count):
+        day = start_date + dt.timedelta(days=i)
+        times = pick_times_for_day(day, sampler.allowed, per_day, min_gap, day_rng(seed, day), explain, sampler)
+        # jeder Tag hat genau per_day Items: ids folgen direkt aus dem Tagesindex
+        items += _day_items(times, day, per_day, i * per_day + 1, resolution)
+    return items
+
+
+def _bounded_map(fn: Any, tasks: Iterable[Any], workers: int) -> Iterator[Any]:
+    """
+    Wie ProcessPoolExecutor.map (Ergebnisse in Reihenfolge), aber höchstens 2 * workers
+    Aufgaben gleichzeitig unterwegs: schreibt der Aufrufer langsamer als gerechnet wird,
+    stauen sich nicht alle Ergebnisse im Speicher.
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending: Any = deque()
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def schedule_day(
+    day: dt.date,
+    start_date: dt.date,
+    per_day: int,
+    min_gap_minutes: int,
+    mode: str,
+    interval: Optional[Tuple[dt.time, dt.time]] = None,
+    windows: Optional[List[TimeWindow]] = None,
+    seed: Optional[int] = None,
+    resolution: int = 60,
+) -> List[Dict[str, Any]]:
+    """
+    Items eines einzelnen Tages, identisch zu den Items dieses Tages in generate_schedule
+    (gleicher Seed, gleiches start_date, auch die ids). Aufwand O(1) in der Studiendauer.
+    """
+    if day < start_date:
+        raise ValueError(f"{day.isoformat()} liegt vor dem Startdatum {start_date.isoformat()}.")
+    win = _resolve_windows(mode, interval, windows)
+    spans = _prepare_sampler(win, per_day, min_gap_minutes, resolution=resolution)[0].spans()
+    offset = (day - start_date).days
+    return _plan_days((start_date, offset, 1, spans, resolution, per_day, min_gap_minutes, seed, False))
+
+
+def iter_schedule(
     start_date: dt.date,
     end_date: dt.date,
     per_day: int,
@@ -150,71 +551,325 @@ def generate_schedule(
     windows: Optional[List[TimeWindow]] = None,
     seed: Optional[int] = None,
     explain: bool = False,
-) -> Dict[str, Any]:
-    rng = random.Random(seed)
+    workers: int = 1,
+    resolution: int = 60,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Wie generate_schedule, liefert die Items aber Tag für Tag (Generator): im Speicher liegt
+    immer nur ein Tag, egal wie lang der Studienzeitraum ist. Parameter werden sofort geprüft,
+    nicht erst beim ersten next(). Gleicher Seed -> dieselben Items wie generate_schedule.
+
+    workers > 1: Tage in Stücken von PLAN_CHUNK_DAYS auf einen Prozess-Pool verteilen. Jeder Tag
+    hat seinen eigenen Zufallsstrom (day_rng), das Ergebnis ist daher identisch zu workers=1.
+    resolution: Raster der Zeitpunkte in Sekunden (60 = minutengenau, 1 = sekundengenau).
+    """
     if explain and seed is not None:
-        print(f"[explain] Seed gesetzt auf: {seed}")
+        print(f"[explain] Seed gesetzt auf: {seed} (eigener Zufallsstrom pro Tag)")
+
+    win = _resolve_windows(mode, interval, windows)
+    spans = _prepare_sampler(win, per_day, min_gap_minutes, explain, resolution)[0].spans()
+    n_days = (end_date - start_date).days + 1
+    workers = max(1, min(workers, -(-n_days // PLAN_CHUNK_DAYS)))
+    if explain and workers > 1:
+        print(f"[explain] {n_days} Tage auf {workers} Prozesse verteilt (ohne Ausgabe pro Tag)")
+
+    def days() -> Iterator[Dict[str, Any]]:
+        if workers == 1:
+            for i in range(n_days):
+                yield from _plan_days((start_date, i, 1, spans, resolution, per_day, min_gap_minutes, seed, explain))
+            return
+        tasks = (
+            (start_date, i, min(PLAN_CHUNK_DAYS, n_days - i), spans, resolution, per_day, min_gap_minutes, seed, False)
+            for i in range(0, n_days, PLAN_CHUNK_DAYS)
+        )
+        for items in _bounded_map(_plan_days, tasks, workers):
+            yield from items
 
-    if mode not in {"interval", "windows"}:
-        raise ValueError("mode muss 'interval' oder 'windows' sein.")
+    return days()
 
-    if mode == "interval":
-        if not interval:
-            raise ValueError("Für mode='interval' muss interval=(start,end) gesetzt sein.")
-        win = interval_to_windows(interval[0], interval[1])
-    else:
-        if not windows:
-            raise ValueError("Für mode='windows' muss windows=[...] gesetzt sein.")
-        win = windows
 
-    allowed = windows_to_minute_slots(win)
+def generate_schedule(
+    start_date: dt.date,
+    end_date: dt.date,
+    per_day: int,
+    min_gap_minutes: int,
+    mode: str,
+    interval: Optional[Tuple[dt.time, dt.time]] = None,
+    windows: Optional[List[TimeWindow]] = None,
+    seed: Optional[int] = None,
+    explain: bool = False,
+    workers: int = 1,
+    resolution: int = 60,
+) -> Dict[str, Any]:
+    items = list(iter_schedule(
+        start_date, end_date, per_day, min_gap_minutes, mode, interval, windows, seed, explain, workers, resolution
+    ))
+    schedule = schedule_header(start_date, end_date, per_day, min_gap_minutes, mode, interval, windows, resolution)
+    schedule["items"] = items
+    return schedule
+
+
+@dataclass
+class Replan:
+    """Ergebnis von replan_schedule: neuer Schedule + was sich gegenüber dem alten geändert hat."""
+    schedule: Dict[str, Any]
+    frozen_days: List[str]       # Vergangenheit/heute oder mit bereits gesendeten Items: unverändert
+    kept_days: List[str]         # Zukunft, Konfiguration unverändert: Items + ids übernommen
+    changed_days: List[str]      # neu geplant (neue ids)
+    removed_ids: List[int]       # ungesendete Items aus neu geplanten bzw. weggefallenen Tagen
+    added: List[Dict[str, Any]]  # neue Items (ids ab max(alte ids) + 1)
+
+
+def replan_schedule(
+    old: Dict[str, Any],
+    start_date: dt.date,
+    end_date: dt.date,
+    per_day: int,
+    min_gap_minutes: int,
+    mode: str,
+    interval: Optional[Tuple[dt.time, dt.time]] = None,
+    windows: Optional[List[TimeWindow]] = None,
+    seed: Optional[int] = None,
+    sent_ids: Iterable[int] = (),
+    now: Optional[dt.datetime] = None,
+    explain: bool = False,
+    resolution: int = 60,
+) -> Replan:
+    """
+    Plant einen bestehenden Schedule inkrementell neu (z.B. per_day, Fenster oder Enddatum
+    mitten in der Studie geändert):
+
+    - Tage bis einschließlich heute und Tage mit bereits gesendeten Items bleiben unverändert.
+    - Zukünftige Tage, deren Konfiguration (per_day, min_gap, Fenster) gleich geblieben ist,
+      werden übernommen; nur neue bzw. geänderte Tage werden gezogen.
+    - Bestehende ids ändern sich nie und werden nicht wiederverwendet; neue Items bekommen
+      ids ab max(alte ids) + 1 (sent.json und r={id}-Links bleiben gültig).
+
+    Der Aufwand wächst mit der Zahl neu geplanter Tage, nicht mit der Studiendauer.
+    """
+    now = now or dt.datetime.now()
+    today = now.date().isoformat()
+    sent = set(int(x) for x in sent_ids)
+
+    win = _resolve_windows(mode, interval, windows)
+    spec = windows_spec(win)
+    old_config = (old.get("per_day"), old.get("min_gap_minutes"), old.get("windows"), old.get("resolution_seconds", 60))
+    same_config = old_config == (per_day, min_gap_minutes, spec, resolution)
     if explain:
-        print(f"[explain] erlaubte Minuten pro Tag: {len(allowed)} (aus {len(win)} Fenster(n))")
+        print(f"[explain] Stichtag {today}; Konfiguration {'unverändert' if same_config else 'geändert'}")
+
+    by_day: Dict[str, List[Dict[str, Any]]] = {}
+    max_id = 0
+    for it in old.get("items", []):
+        it = dict(it)  # Binär-Schedules liefern eigene Item-Objekte
+        by_day.setdefault(it.get("day") or str(it["when"])[:10], []).append(it)
+        max_id = max(max_id, int(it["id"]))
 
+    start_iso, end_iso = start_date.isoformat(), end_date.isoformat()
+    frozen, kept, removed = [], [], []
     items: List[Dict[str, Any]] = []
-    next_id = 1
-
-    for day in daterange(start_date, end_date):
-        times = pick_times_for_day(day, allowed, per_day, min_gap_minutes, rng, explain=explain)
-        # times sind sortiert (pick_times_for_day sortiert die Minuten), daher ist k stabil
-        for k, t in enumerate(times, start=1):
-            when = t.isoformat(timespec="minutes")
-            items.append({
-                "id": next_id,                    # globale ID (1..N)
-                "day": day.isoformat(),           # "YYYY-MM-DD"
-                "k": k,                           # 1..per_day innerhalb des Tages
-                "per_day": per_day,               # für Templates
-                "when": when,                     # "YYYY-MM-DDTHH:MM"
-                "time": t.strftime("%H:%M"),      # "HH:MM"
-            })
-            next_id += 1
-
-    return {
-        "generated_at": dt.datetime.now().isoformat(timespec="seconds"),
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
+    for day, day_items in sorted(by_day.items()):
+        if day <= today or any(int(it["id"]) in sent for it in day_items):
+            frozen.append(day)
+        elif same_config and start_iso <= day <= end_iso:
+            kept.append(day)
+        else:
+            removed += [int(it["id"]) for it in day_items]
+            continue
+        items += day_items
+
+    changed = [
+        day for day in daterange(start_date, end_date)
+        if day.isoformat() > today and day.isoformat() not in frozen and day.isoformat() not in kept
+    ]
+    added: List[Dict[str, Any]] = []
+    if changed:
+        _, sampler = _prepare_sampler(win, per_day, min_gap_minutes, explain, resolution)
+        for day in changed:
+            # gleicher Zufallsstrom wie bei plan: ein neu geplanter Tag bekommt dieselben Zeiten
+            times = pick_times_for_day(
+                day, sampler.allowed, per_day, min_gap_minutes, day_rng(seed, day), explain=explain, sampler=sampler
+            )
+            added += _day_items(times, day, per_day, max_id + len(added) + 1, resolution)
+    items += added
+    items.sort(key=lambda it: (str(it["when"]), int(it["id"])))
+
+    schedule = {k: v for k, v in old.items() if k not in ("items", "resolution_seconds")}
+    if resolution != 60:
+        schedule["resolution_seconds"] = resolution
+    first_day = min([start_iso] + frozen)
+    schedule.update({
+        "replanned_at": now.isoformat(timespec="seconds"),
+        "start_date": first_day,
+        "end_date": end_iso,
         "per_day": per_day,
         "min_gap_minutes": min_gap_minutes,
         "mode": mode,
+        "windows": spec,
         "items": items,
-    }
+    })
+    return Replan(schedule, frozen, kept, [d.isoformat() for d in changed], removed, added)
+
+
+def _batch_one(task: Tuple[str, Optional[int], Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    pid, seed, kwargs = task
+    return pid, generate_schedule(seed=seed, **kwargs)
+
+
+def generate_schedule_batch(
+    participant_seeds: Dict[str, Optional[int]],
+    workers: int = 1,
+    **kwargs: Any,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Erzeugt Schedules für viele Teilnehmende in einem Prozess.
+    participant_seeds: participant_id -> Seed (z.B. aus derive_seed)
+    kwargs: wie generate_schedule (ohne seed)
+
+    Jeder Schedule ist identisch zu generate_schedule(..., seed=seed) mit demselben Seed;
+    geteilt werden nur die seed-unabhängigen Vorberechnungen (Fenster, Zähltabellen).
+    Liefert (participant_id, schedule) nacheinander, damit nie alle im Speicher liegen.
+    workers > 1: Teilnehmende auf einen Prozess-Pool verteilen (Reihenfolge bleibt gleich).
+    """
+    if workers > 1 and len(participant_seeds) > 1:
+        kwargs = {**kwargs, "explain": False}
+        tasks = ((pid, seed, kwargs) for pid, seed in participant_seeds.items())
+        yield from _bounded_map(_batch_one, tasks, workers)
+        return
+    for pid, seed in participant_seeds.items():
+        yield pid, generate_schedule(seed=seed, **kwargs)
 
 
 def save_schedule(schedule: Dict[str, Any], path: Path):
+    """
+    Schreibt schedule.json (gleiches Format wie json.dumps(indent=2)) atomar und baut
+    dabei den Sidecar-Index <path>.idx (id -> Byte-Offset, Items sortiert nach `when`).
+    Endet der Pfad auf .bin, wird stattdessen das kompakte Binärformat geschrieben,
+    bei .ndjson eine Zeile pro Item (siehe write_schedule_stream).
+    """
+    header = {k: v for k, v in schedule.items() if k != "items"}
+    write_schedule_stream(header, schedule.get("items", []), path)
+
+
+def write_schedule_stream(header: Dict[str, Any], items: Iterable[Dict[str, Any]], path: Path) -> int:
+    """
+    Schreibt die Items, während sie erzeugt werden (z.B. aus iter_schedule), direkt in die
+    Datei statt erst alles im Speicher zu sammeln; gibt die Anzahl Items zurück.
+
+    - .json:   dasselbe Format wie save_schedule (byte-identisch)
+    - .ndjson: erste Zeile Header, danach ein Item pro Zeile
+    - .bin:    Binärformat (spaltenweise, braucht alle Zeilen vor dem Schreiben)
+
+    Für .json/.ndjson entsteht der Sidecar-Index nebenbei (32 Byte pro Item).
+    Bricht der Generator ab, bleibt die bisherige Datei unverändert.
+    """
+    if path.suffix == ".bin":
+        rows = []
+        save_binary_schedule({**header, "items": _counting(items, rows)}, path)
+        return len(rows)
+
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(schedule, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    builder = IndexBuilder()
+    tmp = path.with_name(path.name + ".tmp")
+    pos = 0
+    try:
+        with open(tmp, "wb") as f:
+            def emit(text: str) -> int:
+                nonlocal pos
+                data = text.encode("utf-8")
+                f.write(data)
+                pos += len(data)
+                return len(data)
+
+            if path.suffix == ".ndjson":
+                emit(json.dumps(header, ensure_ascii=False) + "\n")
+                for item in items:
+                    start = pos
+                    builder.add(item, start, emit(json.dumps(item, ensure_ascii=False)))
+                    emit("\n")
+            else:
+                it = iter(items)
+                first = next(it, None)
+                emit("{")
+                for n, (k, v) in enumerate(header.items()):
+                    value = json.dumps(v, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+                    emit(f"{',' if n else ''}\n  {json.dumps(k, ensure_ascii=False)}: {value}")
+                emit(f"{',' if header else ''}\n  \"items\": [" if first is not None
+                     else f"{',' if header else ''}\n  \"items\": []")
+                if first is not None:
+                    for n, item in enumerate(itertools.chain([first], it)):
+                        emit(("," if n else "") + "\n    ")
+                        start = pos
+                        builder.add(item, start, emit(json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n    ")))
+                emit("\n  ]\n}\n" if first is not None else "\n}\n")
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    builder.write(path, header)
+    return builder.count
+
+
+def _counting(items: Iterable[Dict[str, Any]], seen: List[None]) -> Iterator[Dict[str, Any]]:
+    for item in items:
+        seen.append(None)
+        yield item
 
 
 def load_schedule(path: Path) -> Dict[str, Any]:
     """
     Lädt eine zuvor gespeicherte schedule.json wieder ein.
     (Wird z.B. für `send-all` verwendet.)
+    Binär-Schedules (*.bin) werden per mmap gelesen; "items" ist dann eine lazy Sequenz.
     """
+    if is_binary_schedule(path):
+        return load_binary_schedule(path)
+    if path.suffix == ".ndjson":
+        with open(path, encoding="utf-8") as f:
+            schedule = json.loads(f.readline())
+            schedule["items"] = [json.loads(line) for line in f if line.strip()]
+        return schedule
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+def close_schedule(schedule: Dict[str, Any]) -> None:
+    """Gibt das mmap eines per load_schedule geladenen *.bin frei (JSON/NDJSON: nichts zu tun)."""
+    close = getattr(schedule.get("items"), "close", None)
+    if close is not None:
+        close()
+
+
+def open_schedule_view(path: Path):
+    """
+    Schneller Lesezugriff (header, item, items, due) ohne alles zu parsen:
+    BinarySchedule für *.bin, sonst der Sidecar-Index; None, wenn keiner nutzbar ist.
+    """
+    if is_binary_schedule(path):
+        return BinarySchedule(path)
+    return ScheduleIndex.open(path)
+
+
+def load_schedule_item(path: Path, rid: int) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Lädt ein einzelnes Item per id: über den Sidecar-Index nur dessen Bytes,
+    sonst (kein/veralteter Index) die ganze Datei. Gibt (Schedule-Header, Item oder None) zurück.
+    """
+    view = open_schedule_view(path)
+    if view is not None:
+        with view:
+            return view.header, view.item(int(rid))
+    schedule = load_schedule(path)
+    item = next((it for it in schedule.get("items", []) if int(it.get("id", -1)) == int(rid)), None)
+    return schedule, item
+
+
+def format_item(item: Dict[str, Any]) -> str:
+    return f"  ID {item['id']}: {item['day']} #{item['k']}/{item['per_day']} @ {item['time']} ({item['when']})"
+
+
 def pretty_print(schedule: Dict[str, Any]):
     print("Geplante Zeitpunkte:")
     for item in schedule["items"]:
-        print(f"  ID {item['id']}: {item['day']} #{item['k']}/{item['per_day']} @ {item['time']} ({item['when']})")
+        print(format_item(item))
 
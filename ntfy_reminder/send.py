@@ -1,24 +1,242 @@
 from __future__ import annotations
-import urllib.request
-from typing import Dict, Optional
-
-
-def load_env_file(env_path: str) -> Dict[str, str]:
-    env: Dict[str, str] = {}
-    with open(env_path, "r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line or line.startswith("#"):
-                continue
-            if line.startswith("export "):
-                line = line[len("export "):].strip()
-            if "=" not in line:
-                continue
-            k, v = line.split("=", 1)
-            k = k.strip()
-            v = v.strip().strip('"').strip("'")
-            env[k] = v
-    return env
+import http.client
+import os
+import ssl
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ntfy_reminder.message import (  # noqa: F401  (load_env_file/build_message: bisherige Import-Pfade)
+    build_message,
+    load_env_file,
+    markdown_enabled,
+    publish_mode,
+    render_reminder,
+    resolve_server,
+)
+from ntfy_reminder.metrics import REGISTRY
+from ntfy_reminder.templates import CompiledTemplates, compile_templates
+
+
+HTTP_SECONDS = REGISTRY.histogram(
+    "ntfy_http_request_seconds", "Dauer eines POST an ntfy (kind=pipeline: ganze Pipeline)"
+)
+RENDER_SECONDS = REGISTRY.histogram("ntfy_render_seconds", "Rendern einer Nachricht (Payload + Templates)")
+
+
+class PublishError(RuntimeError):
+    """ntfy hat mit einem HTTP-Fehlerstatus geantwortet."""
+
+    def __init__(self, status: int, url: str, body: str = ""):
+        super().__init__(f"HTTP {status} von {url}: {body.strip()[:200]}")
+        self.status = status
+
+
+class Publisher:
+    """
+    Wiederverwendbare HTTP/1.1 keep-alive Verbindungen pro Server (http.client).
+
+    - pro (scheme, host, port) höchstens `max_idle_per_host` offene Verbindungen im Pool
+    - Verbindungen, die länger als `idle_timeout` Sekunden ungenutzt waren, werden geschlossen
+    - eine vom Server geschlossene (wiederverwendete) Verbindung wird einmal neu aufgebaut
+    Thread-safe; als Context-Manager nutzbar (schließt alle Verbindungen).
+    """
+
+    def __init__(self, timeout: float = 20.0, max_idle_per_host: int = 4, idle_timeout: float = 30.0):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self._pool: Dict[Tuple[str, str, int], List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def __enter__(self) -> "Publisher":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _connect(self, key: Tuple[str, str, int]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _acquire(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._pool.get(key, [])
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used <= self.idle_timeout:
+                    return conn, True
+                conn.close()
+        return self._connect(key), False
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._pool.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def evict_idle(self) -> None:
+        """Schließt Verbindungen, die länger als idle_timeout ungenutzt sind."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            for key, idle in self._pool.items():
+                keep = [(c, t) for c, t in idle if t >= cutoff]
+                for c, t in idle:
+                    if t < cutoff:
+                        c.close()
+                self._pool[key] = keep
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._pool.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._pool.clear()
+
+    @staticmethod
+    def _split(url: str) -> Tuple[Tuple[str, str, int], str]:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        return (scheme, parts.hostname or "", port), path
+
+    @staticmethod
+    def _host_header(key: Tuple[str, str, int]) -> str:
+        """Host-Header wie http.client: IPv6 in Klammern, Standard-Port des Schemas weglassen."""
+        scheme, host, port = key
+        if ":" in host:
+            host = f"[{host}]"
+        return host if port == (443 if scheme == "https" else 80) else f"{host}:{port}"
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> bytes:
+        """POST über eine gepoolte Verbindung; gibt den Response-Body zurück."""
+        with HTTP_SECONDS.time(kind="single"):
+            return self._post(url, body, headers)
+
+    def _post(self, url: str, body: bytes, headers: Dict[str, str]) -> bytes:
+        key, path = self._split(url)
+
+        for attempt in range(2):
+            conn, reused = self._acquire(key)
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # Server hat eine ruhende keep-alive Verbindung geschlossen: einmal neu verbinden
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            if resp.status >= 400:
+                raise PublishError(resp.status, url, data.decode("utf-8", "replace"))
+            return data
+        raise AssertionError("unreachable")
+
+    def post_pipelined(self, requests: List[Tuple[str, bytes, Dict[str, str]]]) -> List[Optional[Exception]]:
+        """
+        HTTP/1.1 Pipelining: schreibt alle POSTs (gleicher Server) auf einmal auf eine
+        Verbindung und liest danach die Antworten der Reihe nach.
+        Gibt pro Request None (ok) oder den Fehler zurück. Bricht die Verbindung ab, gelten
+        alle noch unbeantworteten Requests als fehlgeschlagen (ggf. doppelt zugestellt).
+        """
+        if not requests:
+            return []
+        with HTTP_SECONDS.time(kind="pipeline"):
+            return self._post_pipelined(requests)
+
+    def _post_pipelined(self, requests: List[Tuple[str, bytes, Dict[str, str]]]) -> List[Optional[Exception]]:
+        key, _ = self._split(requests[0][0])
+        host = self._host_header(key)
+        out = bytearray()
+        for url, body, headers in requests:
+            k, path = self._split(url)
+            if k != key:
+                raise ValueError("post_pipelined: alle Requests müssen an denselben Server gehen.")
+            out += f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n".encode("latin-1")
+            for name, value in headers.items():
+                out += f"{name}: {value}\r\n".encode("latin-1")
+            out += b"\r\n" + body
+
+        results: List[Optional[Exception]] = [None] * len(requests)
+        for attempt in range(2):
+            conn, reused = self._acquire(key)
+            answered = 0
+            will_close = False
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                reader = _SharedReader(conn.sock.makefile("rb"))
+                try:
+                    conn.sock.sendall(out)
+                    for i, (url, _, _) in enumerate(requests):
+                        resp = http.client.HTTPResponse(reader, method="POST")  # type: ignore[arg-type]
+                        resp.begin()
+                        data = resp.read()
+                        answered += 1
+                        if resp.status >= 400:
+                            results[i] = PublishError(resp.status, url, data.decode("utf-8", "replace"))
+                        will_close = resp.will_close
+                        if will_close and answered < len(requests):
+                            raise http.client.RemoteDisconnected("Server hat die Verbindung geschlossen")
+                finally:
+                    reader.fp.close()
+            except Exception as e:
+                conn.close()
+                stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+                if stale and reused and answered == 0 and attempt == 0:
+                    continue
+                for i in range(answered, len(requests)):
+                    results[i] = e
+                return results
+
+            if will_close:
+                conn.close()  # letzte Antwort mit "Connection: close": nicht zurück in den Pool (wie post())
+            else:
+                self._release(key, conn)
+            return results
+        raise AssertionError("unreachable")
+
+
+class _SharedReader:
+    """
+    Gemeinsamer gepufferter Leser für mehrere HTTPResponse-Objekte (Pipelining):
+    HTTPResponse ruft makefile() und schließt die Datei nach jeder Antwort;
+    hier bleibt der Puffer (mit evtl. schon gelesenen Folgeantworten) erhalten.
+    """
+
+    def __init__(self, fp: Any):
+        self.fp = fp
+
+    def makefile(self, *args: Any, **kwargs: Any) -> "_SharedReader":
+        return self
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.fp, name)
 
 
 def send_ntfy(
@@ -28,52 +246,231 @@ def send_ntfy(
     explain: bool = False,
     click_url: Optional[str] = None,
     markdown: bool = False,
+    publisher: Optional[Publisher] = None,
+    mode: str = "header",
 ) -> None:
     """
     payload: Dict mit Variablen für Templates (z.B. id/day/k/per_day/time/when/url)
     click_url: setzt den ntfy Click/X-Click Header (öffnet URL beim Tap) :contentReference[oaicite:2]{index=2}
     markdown: setzt Markdown Header (Web-App only, optional) :contentReference[oaicite:3]{index=3}
+    publisher: gepoolte Verbindungen wiederverwenden (sonst eine Verbindung nur für diese Nachricht)
+    mode: "header" (Default) oder "json" (siehe build_message)
+    """
+    url, data, headers = build_message(payload, env, server, explain, click_url, markdown, mode)
+    if publisher is not None:
+        publisher.post(url, data, headers)
+        return
+    with Publisher(max_idle_per_host=0) as single:
+        single.post(url, data, headers)
+
+
+@dataclass(frozen=True)
+class SendContext:
     """
-    topic = env.get("NTFY_TOPIC")
-    title_tpl = env.get("NTFY_TITLE")
-    msg_tpl = env.get("NTFY_MESSAGE")
-
-    missing = [k for k in ["NTFY_TOPIC", "NTFY_TITLE", "NTFY_MESSAGE"] if not env.get(k)]
-    if missing:
-        raise RuntimeError(f"Fehlende Werte in env: {', '.join(missing)}")
-
-    try:
-        title = title_tpl.format(**payload)
-        body = msg_tpl.format(**payload)
-    except KeyError as e:
-        raise RuntimeError(
-            f"Template-Platzhalter fehlt: {e}. Verfügbare Keys: {', '.join(sorted(payload.keys()))}"
-        ) from e
-
-    url = f"{server.rstrip('/')}/{topic}"
-    data = body.encode("utf-8")
-
-    if explain:
-        print(f"[explain] POST {url}")
-        print(f"[explain] Title: {title}")
-        if click_url:
-            print(f"[explain] Click: {click_url}")
-        print(f"[explain] Body:\n{body}")
-
-    req = urllib.request.Request(url, data=data, method="POST")
-    req.add_header("Title", title)
-    req.add_header("Content-Type", "text/plain; charset=utf-8")
-
-    # Click action (alias für X-Click) :contentReference[oaicite:4]{index=4}
-    if click_url:
-        req.add_header("Click", click_url)
-
-        # Action Button (Button in der Notification) – Label bitte ASCII, sonst ggf. 400
-        req.add_header("Actions", f"view, Start survey, {click_url}")
-
-    # Markdown (optional; Web-App only) :contentReference[oaicite:5]{index=5}
-    if markdown:
-        req.add_header("Markdown", "yes")
-
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        _ = resp.read()
+    Einmal geparste Versand-Konfiguration (env + Server), wiederverwendbar für viele Reminder.
+    """
+    env: Dict[str, str]
+    server: str
+    markdown: bool = False
+    # Survey-Link Template, z.B. https://www.soscisurvey.de/DEINPROJEKT/?r={id}
+    survey_tpl: str = ""
+    # "header" (ein POST pro Nachricht mit Title/Click/... Headern) oder "json"
+    # (JSON-Body an die Server-Root; Bursts werden gepipelined über eine Verbindung)
+    publish_mode: str = "header"
+    # beim Laden kompiliert + geprüft: Template-Fehler fallen vor dem ersten Versand auf
+    templates: Optional[CompiledTemplates] = None
+
+    @classmethod
+    def from_env(cls, env: Dict[str, str], server: Optional[str] = None) -> "SendContext":
+        """
+        server: expliziter Override; sonst NTFY_SERVER aus env, sonst DEFAULT_SERVER.
+        """
+        return cls(
+            env=env,
+            server=resolve_server(env, server),
+            markdown=markdown_enabled(env),
+            survey_tpl=str(env.get("SURVEY_URL_TEMPLATE", "")).strip(),
+            publish_mode=publish_mode(env),
+            templates=compile_templates(env),
+        )
+
+    @classmethod
+    def from_env_file(cls, env_path: str, server: Optional[str] = None) -> "SendContext":
+        """
+        Gecacht pro env-Datei und Server; ändert sich der Stand der Datei (Gerät/Inode/mtime/Größe
+        wie filewatch.file_key, also auch bei atomarem Ersetzen), wird sie neu gelesen und der
+        Eintrag ersetzt (ein Daemon mit Hot Reload sammelt so keine alten Kontexte an).
+        """
+        st = os.stat(env_path)
+        key = (os.path.abspath(env_path), server)
+        stamp = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        with _CTX_LOCK:
+            cached = _CTX_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        ctx = cls.from_env(load_env_file(env_path), server)
+        with _CTX_LOCK:
+            _CTX_CACHE[key] = (stamp, ctx)
+        return ctx
+
+
+# (env-Datei, Server) -> ((Gerät, Inode, mtime, Größe), SendContext); SendContext ist unveränderlich
+_CTX_CACHE: Dict[Tuple[str, Optional[str]], Tuple[Tuple[int, int, int, int], SendContext]] = {}
+_CTX_LOCK = threading.Lock()
+
+
+def render_item(
+    ctx: SendContext,
+    schedule: Dict[str, Any],
+    item: Dict[str, Any],
+    explain: bool = False,
+) -> Tuple[str, bytes, Dict[str, str]]:
+    """Payload + Survey-Link + Nachricht für einen Reminder, als (url, body, headers)."""
+    with RENDER_SECONDS.time():
+        return _render_item(ctx, schedule, item, explain)
+
+
+def _render_item(
+    ctx: SendContext,
+    schedule: Dict[str, Any],
+    item: Dict[str, Any],
+    explain: bool,
+) -> Tuple[str, bytes, Dict[str, str]]:
+    templates = ctx.templates or compile_templates(ctx.env)
+    return render_reminder(
+        schedule, item, ctx.env, ctx.server, templates, ctx.markdown, ctx.publish_mode, explain=explain
+    )
+
+
+def send_item(
+    ctx: SendContext,
+    schedule: Dict[str, Any],
+    item: Dict[str, Any],
+    explain: bool = False,
+    publisher: Optional[Publisher] = None,
+) -> None:
+    """Sendet einen Reminder aus dem Schedule."""
+    url, data, headers = render_item(ctx, schedule, item, explain=explain)
+    if publisher is not None:
+        publisher.post(url, data, headers)
+        return
+    with Publisher(max_idle_per_host=0) as single:
+        single.post(url, data, headers)
+
+
+class RateLimiter:
+    """
+    Token-Bucket pro Server: höchstens `rate` Nachrichten pro Sekunde (Burst bis `burst`).
+    rate <= 0 bedeutet unbegrenzt. Thread-safe; acquire() blockiert bis ein Token frei ist.
+    clock: liefert monotonic() und sleep() (Default: das time-Modul; virtuelle Uhr in der Simulation).
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Any = time):
+        self.rate = rate
+        self.clock = clock
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # server -> (tokens, last)
+        self._lock = threading.Lock()
+
+    def acquire(self, server: str) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = self.clock.monotonic()
+                tokens, last = self._buckets.get(server, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1.0:
+                    self._buckets[server] = (tokens - 1.0, now)
+                    return
+                self._buckets[server] = (tokens, now)
+                wait = (1.0 - tokens) / self.rate
+            self.clock.sleep(wait)
+
+
+# ein Versandauftrag: (Kontext, Schedule, Item)
+SendJob = Tuple[SendContext, Dict[str, Any], Dict[str, Any]]
+
+
+# maximale Anzahl Requests, die beim Pipelining auf einmal geschrieben werden
+PIPELINE_DEPTH = 32
+
+
+def publish_pipelined(
+    jobs: List[SendJob],
+    publisher: Publisher,
+    limiter: Optional[RateLimiter] = None,
+    explain: bool = False,
+) -> Iterator[Tuple[SendJob, Optional[Exception]]]:
+    """
+    Sendet Jobs gebündelt: pro Server werden je PIPELINE_DEPTH Requests auf eine
+    Verbindung gepipelined. Liefert einen Fehlerbericht pro Nachricht (job, Fehler oder None).
+    """
+    by_server: Dict[str, List[Tuple[SendJob, Tuple[str, bytes, Dict[str, str]]]]] = {}
+    for job in jobs:
+        ctx, schedule, item = job
+        try:
+            req = render_item(ctx, schedule, item, explain=explain)
+        except Exception as e:
+            yield job, e
+            continue
+        by_server.setdefault(ctx.server, []).append((job, req))
+
+    for server, entries in by_server.items():
+        for i in range(0, len(entries), PIPELINE_DEPTH):
+            window = entries[i:i + PIPELINE_DEPTH]
+            if limiter is not None:
+                for _ in window:
+                    limiter.acquire(server)
+            errors = publisher.post_pipelined([req for _, req in window])
+            for (job, _), err in zip(window, errors):
+                yield job, err
+
+
+def send_many(
+    jobs: Iterable[SendJob],
+    publisher: Publisher,
+    concurrency: int = 1,
+    limiter: Optional[RateLimiter] = None,
+    explain: bool = False,
+) -> Iterator[Tuple[SendJob, Optional[Exception]]]:
+    """
+    Sendet viele Reminder, mit bis zu `concurrency` parallelen Requests (Thread-Pool
+    um den gepoolten Publisher). Liefert (job, Fehler oder None) in Abschlussreihenfolge,
+    damit Aufrufer jeden Reminder erst nach erfolgreichem Versand als gesendet markieren.
+
+    Jobs mit publish_mode="json" werden stattdessen gepipelined (publish_pipelined),
+    verteilt auf `concurrency` Verbindungen.
+    """
+    jobs = list(jobs)
+    piped = [job for job in jobs if job[0].publish_mode == "json"]
+    single = [job for job in jobs if job[0].publish_mode != "json"]
+
+    def run(job: SendJob) -> None:
+        ctx, schedule, item = job
+        if limiter is not None:
+            limiter.acquire(ctx.server)
+        send_item(ctx, schedule, item, explain=explain, publisher=publisher)
+
+    if concurrency <= 1:
+        yield from publish_pipelined(piped, publisher, limiter, explain)
+        for job in single:
+            try:
+                run(job)
+            except Exception as e:
+                yield job, e
+            else:
+                yield job, None
+        return
+
+    # erst hier importieren: concurrent.futures zieht logging nach (Startzeit bei concurrency=1)
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        chunks = [piped[i::concurrency] for i in range(concurrency) if piped[i::concurrency]]
+        piped_futures = [pool.submit(lambda c: list(publish_pipelined(c, publisher, limiter, explain)), c) for c in chunks]
+        futures = {pool.submit(run, job): job for job in single}
+        for fut in as_completed(futures):
+            yield futures[fut], fut.exception()
+        for fut in piped_futures:
+            yield from fut.result()
@@ -0,0 +1,181 @@
+"""
+Schlanker Einstiegspunkt für genau einen Versand (ein Prozess pro Reminder, z.B. Cron/systemd):
+
+    python -m ntfy_reminder.send_one ID [--schedule out/schedule.json] [--env-file config/ntfy.env]
+                                        [--server URL] [--explain] [--dry-run]
+
+Gleiche Nachricht wie `python run.py send ID`, aber mit minimalen Imports (kein argparse,
+kein http.client/email, kein Planer): das Item kommt über den Sidecar-Index bzw. das
+Binärformat, gesendet wird ein einzelner POST direkt über einen Socket (TLS nur bei https).
+"""
+from __future__ import annotations
+
+import json
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ntfy_reminder.message import load_env_file, markdown_enabled, publish_mode, render_reminder, resolve_server
+from ntfy_reminder.templates import compile_templates
+
+USAGE = (
+    "usage: python -m ntfy_reminder.send_one ID [--schedule PATH] [--env-file PATH] "
+    "[--server URL] [--explain] [--dry-run]"
+)
+DEFAULTS: Dict[str, Any] = {
+    "schedule": "out/schedule.json",
+    "env_file": "config/ntfy.env",
+    "server": None,
+    "explain": False,
+    "dry_run": False,
+}
+TIMEOUT = 20.0
+
+
+def parse_args(argv: List[str]) -> Dict[str, Any]:
+    """Bewusst ohne argparse (Import + Parser-Aufbau kosten spürbar Startzeit)."""
+    args = dict(DEFAULTS, id=None)
+    it = iter(argv)
+    for arg in it:
+        if arg in ("-h", "--help"):
+            print(USAGE)
+            raise SystemExit(0)
+        if arg in ("--explain", "--dry-run"):
+            args[arg[2:].replace("-", "_")] = True
+        elif arg.split("=", 1)[0] in ("--schedule", "--env-file", "--server"):
+            name, sep, value = arg.partition("=")
+            if not sep:
+                value = next(it, None)
+                if value is None:
+                    raise SystemExit(f"{USAGE}\n{name} braucht einen Wert.")
+            args[name[2:].replace("-", "_")] = value
+        elif args["id"] is None and arg.isdigit():
+            args["id"] = int(arg)
+        else:
+            raise SystemExit(f"{USAGE}\nUnbekanntes Argument: {arg}")
+    if args["id"] is None:
+        raise SystemExit(f"{USAGE}\nID fehlt.")
+    return args
+
+
+def load_item(path: Path, rid: int) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """(Schedule-Header, Item oder None); wie schedule.load_schedule_item, ohne den Planer zu importieren."""
+    from ntfy_reminder.binary import BinarySchedule, is_binary_schedule
+    from ntfy_reminder.index import ScheduleIndex
+
+    view = BinarySchedule(path) if is_binary_schedule(path) else ScheduleIndex.open(path)
+    if view is not None:
+        with view:
+            return view.header, view.item(rid)
+
+    # kein/veralteter Index: ganze Datei lesen
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".ndjson":
+            header = json.loads(f.readline())
+            items = (json.loads(line) for line in f if line.strip())
+        else:
+            header = json.load(f)
+            items = iter(header.get("items", []))
+        item = next((it for it in items if int(it.get("id", -1)) == rid), None)
+    return header, item
+
+
+def _read_response(sock: socket.socket) -> Tuple[int, bytes]:
+    """Status + Body einer HTTP/1.1-Antwort (Connection: close, ggf. chunked)."""
+    chunks = []
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        chunks.append(data)
+    raw = b"".join(chunks)
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        raise ConnectionError(f"ungültige HTTP-Antwort: {lines[0]!r}") from None
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:])}
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        out = bytearray()
+        while body:
+            size_line, _, rest = body.partition(b"\r\n")
+            size = int(size_line.split(b";")[0], 16)
+            if size == 0:
+                break
+            out += rest[:size]
+            body = rest[size + 2:]
+        body = bytes(out)
+    elif "content-length" in headers:
+        body = body[:int(headers["content-length"])]
+    return status, body
+
+
+def post(url: str, body: bytes, headers: Dict[str, str], timeout: float = TIMEOUT) -> bytes:
+    """Ein POST ohne Verbindungs-Pool; wirft RuntimeError bei HTTP-Fehlerstatus."""
+    scheme, _, rest = url.partition("://")
+    hostport, slash, path = rest.partition("/")
+    path = "/" + path if slash else "/"
+    if hostport.startswith("["):  # IPv6: [::1]:8080
+        host, _, port_s = hostport[1:].partition("]")
+        port_s = port_s.lstrip(":")
+    else:
+        host, _, port_s = hostport.partition(":")
+    port = int(port_s) if port_s else (443 if scheme == "https" else 80)
+
+    request = f"POST {path} HTTP/1.1\r\nHost: {hostport}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n"
+    request += "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        if scheme == "https":
+            import ssl  # nur für https (Import kostet spürbar Startzeit)
+
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        sock.sendall(request.encode("latin-1") + body)
+        status, data = _read_response(sock)
+    finally:
+        sock.close()
+    if status >= 400:
+        raise RuntimeError(f"HTTP {status} von {url}: {data.decode('utf-8', 'replace').strip()[:200]}")
+    return data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    rid, schedule_path = args["id"], Path(args["schedule"])
+
+    try:
+        env = load_env_file(args["env_file"])
+        templates = compile_templates(env)
+        mode = publish_mode(env)
+    except OSError as e:
+        raise SystemExit(f"{args['env_file']}: {e.strerror or e}") from e
+    except RuntimeError as e:
+        raise SystemExit(f"{args['env_file']}: {e}") from e
+
+    if not schedule_path.exists():
+        raise SystemExit(f"{schedule_path} nicht gefunden.")
+    header, item = load_item(schedule_path, rid)
+    if not item:
+        raise SystemExit(f"ID {rid} nicht im Schedule gefunden ({schedule_path}).")
+
+    url, body, headers = render_reminder(
+        header, item, env, resolve_server(env, args["server"]), templates,
+        markdown_enabled(env), mode, explain=args["explain"],
+    )
+    if args["dry_run"]:
+        print(f"[dry-run] Würde Reminder ID {rid} senden.")
+        return 0
+    try:
+        post(url, body, headers)
+    except (OSError, RuntimeError) as e:
+        print(f"FEHLER: Reminder ID {rid}: {e}", file=sys.stderr)
+        return 1
+    print(f"OK: Reminder ID {rid} gesendet.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ntfy_reminder.journal import SentJournal
+from ntfy_reminder.schedule import load_schedule, save_schedule
+
+# Optionales SQLite-Backend (Standardbibliothek): alle Projekte in einer Datenbank.
+#   projects:   Name, env-Datei, Schedule-Header (JSON ohne items)
+#   items:      ein Reminder pro Zeile; `when` + status indexiert, data = Item als JSON (verlustfrei)
+#   deliveries: erfolgreiche Zustellungen (überleben ein erneutes `plan`)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name     TEXT PRIMARY KEY,
+    env_file TEXT,
+    header   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    project TEXT    NOT NULL REFERENCES projects(name) ON DELETE CASCADE,
+    id      INTEGER NOT NULL,
+    "when"  TEXT    NOT NULL,
+    status  TEXT    NOT NULL DEFAULT 'pending',
+    data    TEXT    NOT NULL,
+    PRIMARY KEY (project, id)
+);
+CREATE INDEX IF NOT EXISTS items_when_status ON items("when", status);
+CREATE TABLE IF NOT EXISTS deliveries (
+    project TEXT    NOT NULL,
+    item_id INTEGER NOT NULL,
+    sent_at TEXT    NOT NULL,
+    PRIMARY KEY (project, item_id)
+);
+"""
+
+DEFAULT_DB = "out/ntfy.sqlite3"
+
+
+# "when" ist TEXT ("2026-01-20T10:06" bzw. mit --resolution < 60 "2026-01-20T10:06:45") und wird als String
+# verglichen: "10:06" < "10:06:00" < "10:06:45". Obergrenzen daher mit Sekunden, Untergrenzen auf voller
+# Minute ohne (sonst fiele das minutengenaue Item genau auf der Grenze heraus).
+def _lower_bound(t: dt.datetime) -> str:
+    return t.isoformat(timespec="seconds" if t.second else "minutes")
+
+
+class SqliteStore:
+    """Schedules + Zustellstatus mehrerer Projekte in einer SQLite-Datenbank (WAL-Modus)."""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: jede Zustellung ist nach commit auch bei Stromausfall dauerhaft (exactly once)
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SqliteStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # --- Schedules ---
+
+    def save_schedule(self, project: str, schedule: Dict[str, Any], env_file: Optional[str] = None) -> None:
+        """Ersetzt den Schedule eines Projekts; bereits zugestellte ids bleiben als 'sent' markiert."""
+        header = {k: v for k, v in schedule.items() if k != "items"}
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO projects(name, env_file, header) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET env_file=COALESCE(excluded.env_file, env_file), header=excluded.header",
+                (project, env_file, json.dumps(header, ensure_ascii=False)),
+            )
+            self.conn.execute("DELETE FROM items WHERE project=?", (project,))
+            self.conn.executemany(
+                'INSERT INTO items(project, id, "when", data) VALUES (?, ?, ?, ?)',
+                (
+                    (project, int(it["id"]), str(it["when"]), json.dumps(it, ensure_ascii=False))
+                    for it in schedule.get("items", [])
+                ),
+            )
+            self.conn.execute(
+                "UPDATE items SET status='sent' WHERE project=? AND id IN "
+                "(SELECT item_id FROM deliveries WHERE project=?)",
+                (project, project),
+            )
+
+    def update_schedule(
+        self, project: str, header: Dict[str, Any], remove_ids: List[int], add_items: List[Dict[str, Any]]
+    ) -> None:
+        """Inkrementell (replan): nur entfernte/neue Items schreiben, der Rest bleibt unangetastet."""
+        header = {k: v for k, v in header.items() if k != "items"}
+        with self.conn:
+            self.conn.execute(
+                "UPDATE projects SET header=? WHERE name=?", (json.dumps(header, ensure_ascii=False), project)
+            )
+            self.conn.executemany(
+                "DELETE FROM items WHERE project=? AND id=?", ((project, int(rid)) for rid in remove_ids)
+            )
+            self.conn.executemany(
+                'INSERT INTO items(project, id, "when", data) VALUES (?, ?, ?, ?)',
+                ((project, int(it["id"]), str(it["when"]), json.dumps(it, ensure_ascii=False)) for it in add_items),
+            )
+
+    def projects(self) -> List[Tuple[str, Optional[str]]]:
+        """(name, env_file) aller Projekte."""
+        return list(self.conn.execute("SELECT name, env_file FROM projects ORDER BY name"))
+
+    def header(self, project: str) -> Dict[str, Any]:
+        row = self.conn.execute("SELECT header FROM projects WHERE name=?", (project,)).fetchone()
+        if row is None:
+            raise KeyError(f"Projekt '{project}' nicht in {self.db_path}.")
+        return json.loads(row[0])
+
+    def load_schedule(self, project: str) -> Dict[str, Any]:
+        schedule = self.header(project)
+        rows = self.conn.execute('SELECT data FROM items WHERE project=? ORDER BY id', (project,))
+        schedule["items"] = [json.loads(data) for (data,) in rows]
+        return schedule
+
+    def item(self, project: str, rid: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT data FROM items WHERE project=? AND id=?", (project, int(rid))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # --- Zustellstatus ---
+
+    def due(
+        self,
+        earliest: dt.datetime,
+        latest: Optional[dt.datetime] = None,
+        projects: Optional[List[str]] = None,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Alle noch nicht gesendeten Items mit earliest <= when <= latest über alle Projekte
+        (eine indizierte Abfrage), sortiert nach when. latest=None: ohne Obergrenze.
+        """
+        sql = 'SELECT project, data FROM items WHERE status=\'pending\' AND "when" >= ?'
+        params: List[Any] = [_lower_bound(earliest)]
+        if latest is not None:
+            sql += ' AND "when" <= ?'
+            params.append(latest.isoformat(timespec="seconds"))
+        if projects:
+            sql += f" AND project IN ({','.join('?' * len(projects))})"
+            params += projects
+        sql += ' ORDER BY "when", project, id'
+        return [(project, json.loads(data)) for project, data in self.conn.execute(sql, params)]
+
+    def latest_sent(self, project: str, earliest: dt.datetime, latest: dt.datetime) -> Optional[dt.datetime]:
+        """Jüngster bereits gesendete Zeitpunkt eines Projekts in [earliest, latest] (für catch-up)."""
+        row = self.conn.execute(
+            'SELECT MAX("when") FROM items WHERE project=? AND status=\'sent\' AND "when" >= ? AND "when" <= ?',
+            (project, _lower_bound(earliest), latest.isoformat(timespec="seconds")),
+        ).fetchone()
+        return dt.datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def sent_ids(self, project: str) -> Set[int]:
+        return {rid for (rid,) in self.conn.execute("SELECT item_id FROM deliveries WHERE project=?", (project,))}
+
+    def mark_sent(self, project: str, rid: int) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO deliveries(project, item_id, sent_at) VALUES (?, ?, ?)",
+                (project, int(rid), dt.datetime.now().isoformat(timespec="seconds")),
+            )
+            self.conn.execute("UPDATE items SET status='sent' WHERE project=? AND id=?", (project, int(rid)))
+
+    # --- Import/Export zum JSON-Layout (out/<p>_schedule.json + out/<p>_sent.json) ---
+
+    def import_json(self, project: str, schedule_path: Path, sent_path: Path, env_file: Optional[str] = None) -> int:
+        """Importiert Schedule + Sent-State eines Projekts; gibt die Anzahl Items zurück."""
+        schedule = load_schedule(schedule_path)
+        journal = SentJournal(sent_path)
+        journal.close()
+        self.save_schedule(project, schedule, env_file=env_file)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO deliveries(project, item_id, sent_at) VALUES (?, ?, ?)",
+                ((project, rid, "") for rid in journal.sent_ids),
+            )
+            self.conn.execute(
+                "UPDATE items SET status='sent' WHERE project=? AND id IN "
+                "(SELECT item_id FROM deliveries WHERE project=?)",
+                (project, project),
+            )
+        return len(schedule.get("items", []))
+
+    def export_json(self, project: str, schedule_path: Path, sent_path: Path) -> int:
+        """Schreibt Schedule + Sent-State eines Projekts ins JSON-Layout zurück."""
+        schedule = self.load_schedule(project)
+        save_schedule(schedule, schedule_path)
+        journal = SentJournal(sent_path)
+        journal.sent_ids = self.sent_ids(project)
+        journal.compact()
+        journal.close()
+        return len(schedule["items"])
+
+
+class SqliteSentState:
+    """Sent-State eines Projekts im SQLite-Backend, gleiche Schnittstelle wie SentJournal."""
+
+    def __init__(self, store: SqliteStore, project: str):
+        self.store = store
+        self.project = project
+        self.sent_ids = store.sent_ids(project)
+        self.pending = 0  # Zustellungen sind sofort committed, nichts zu kompaktieren
+
+    def __contains__(self, rid: int) -> bool:
+        return rid in self.sent_ids
+
+    def mark_sent(self, rid: int) -> None:
+        self.store.mark_sent(self.project, rid)
+        self.sent_ids.add(int(rid))
+
+    def maybe_compact(self) -> bool:
+        return False
+
+    def compact(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, List, Optional, Tuple
+
+# Lokaler Stub eines ntfy-Servers für Benchmarks und Trockenübungen ohne echten Versand:
+# nimmt POST /<topic> (Header-Modus) und POST / (JSON-Modus) an, antwortet wie ntfy mit
+# einer JSON-Nachricht, hält Verbindungen offen (HTTP/1.1, auch Pipelining) und zählt mit.
+# record=True: jede angenommene Nachricht landet mit Ankunftszeit (clock()) in `arrivals`
+# (tools/simulate.py: virtuelle Uhr, Auswertung von Verspätung/Duplikaten/Lücken).
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1  # Antwort gepuffert in einem Stück senden
+    disable_nagle_algorithm = True  # TCP_NODELAY wie ntfy (Go); sonst ~40ms Stau beim Pipelining
+    server: "StubServer"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        srv = self.server
+
+        if srv.latency > 0:
+            time.sleep(srv.latency)
+        failed = srv.fail_rate > 0 and srv.rng.random() < srv.fail_rate
+        with srv.lock:
+            srv.requests += 1
+            srv.failed += failed
+            n = srv.requests
+        if srv.log is not None:
+            with srv.lock:
+                srv.log.write(json.dumps({
+                    "path": self.path, "title": self.headers.get("Title"), "body": body.decode("utf-8", "replace"),
+                }, ensure_ascii=False) + "\n")
+                srv.log.flush()
+
+        if srv.arrivals is not None and not failed:
+            topic, title = self.path.strip("/"), self.headers.get("Title")
+            if not topic:  # JSON-Modus: topic/title stehen im Body
+                try:
+                    msg = json.loads(body)
+                    topic, title = msg.get("topic", ""), msg.get("title")
+                except ValueError:
+                    pass
+            with srv.lock:
+                srv.arrivals.append((srv.clock(), topic, title))
+
+        if failed:
+            status, out = 503, b'{"code":50301,"http":503,"error":"stub: simulierter Fehler"}'
+        else:
+            topic = self.path.strip("/") or "json"
+            status, out = 200, json.dumps({
+                "id": f"stub{n}", "time": int(time.time()), "event": "message", "topic": topic,
+            }).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+        self.wfile.flush()
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        addr: Tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        log_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        record: bool = False,
+        clock: Callable[[], Any] = time.time,
+    ):
+        super().__init__(addr, _Handler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failed = 0
+        self.log = open(log_path, "a", encoding="utf-8") if log_path else None
+        self.clock = clock
+        # (Ankunftszeit, topic, title) je angenommener Nachricht
+        self.arrivals: Optional[List[Tuple[Any, str, Optional[str]]]] = [] if record else None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """Im Hintergrund-Thread starten (für Benchmarks im selben Prozess)."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self.log is not None:
+            self.log.close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Lokaler ntfy-Stub (kein echter Versand).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="künstliche Antwortzeit pro Request")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="Anteil Requests mit HTTP 503 (0..1)")
+    ap.add_argument("--log", default=None, help="empfangene Nachrichten als JSON-Zeilen anhängen")
+    args = ap.parse_args()
+
+    srv = StubServer((args.host, args.port), args.latency_ms / 1000.0, args.fail_rate, args.log)
+    print(f"ntfy-Stub läuft auf {srv.url} (Strg+C beendet)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import string
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+# Platzhalter, die build_payload (message.py) für jeden Reminder liefert
+PAYLOAD_KEYS: FrozenSet[str] = frozenset({"id", "day", "k", "n", "per_day", "when", "time", "url"})
+
+REQUIRED_ENV = ("NTFY_TOPIC", "NTFY_TITLE", "NTFY_MESSAGE")
+
+
+class Template:
+    """
+    Einmal mit string.Formatter().parse zerlegtes Format-Template.
+
+    Einfache Platzhalter ({id}, {when}, ...) werden beim Rendern nur noch zusammengefügt;
+    Templates mit Format-Spec/Konvertierung ({k:>2}, {id!r}) fallen auf str.format zurück.
+    """
+
+    def __init__(self, name: str, source: str, allowed: FrozenSet[str] = PAYLOAD_KEYS):
+        self.name = name
+        self.source = source
+        self.fields: List[str] = []
+        parts: List[Tuple[str, Optional[str]]] = []
+        simple = True
+        try:
+            parsed = list(string.Formatter().parse(source))
+        except ValueError as e:
+            raise RuntimeError(f"{name}: ungültiges Template {source!r}: {e}") from e
+
+        for literal, field, spec, conversion in parsed:
+            if field is None:
+                parts.append((literal, None))
+                continue
+            key = field.split(".", 1)[0].split("[", 1)[0]
+            if not key or key.isdigit():
+                raise RuntimeError(f"{name}: Platzhalter brauchen einen Namen, z.B. {{id}} (Template {source!r}).")
+            if key not in allowed:
+                raise RuntimeError(
+                    f"{name}: Template-Platzhalter fehlt: '{key}'. Verfügbare Keys: {', '.join(sorted(allowed))}"
+                )
+            if key != field or spec or conversion:
+                simple = False
+            self.fields.append(key)
+            parts.append((literal, key))
+
+        # None: str.format nötig
+        self._parts: Optional[List[Tuple[str, Optional[str]]]] = parts if simple else None
+
+    def render(self, values: Dict[str, str]) -> str:
+        if self._parts is None:
+            return self.source.format(**values)
+        out = []
+        for literal, key in self._parts:
+            out.append(literal)
+            if key is not None:
+                out.append(values[key])  # payload-Werte sind bereits Strings
+        return "".join(out)
+
+
+class CompiledTemplates(NamedTuple):
+    """
+    Geprüfte Templates eines env: Titel, Nachricht und optional der Survey-Link.
+    (NamedTuple statt dataclass: dataclasses kostet beim Import spürbar Startzeit, siehe send_one.)
+    """
+    topic: str
+    title: Template
+    message: Template
+    survey: Optional[Template] = None
+
+
+def compile_templates(env: Dict[str, str]) -> CompiledTemplates:
+    """
+    Parst und prüft NTFY_TITLE, NTFY_MESSAGE und SURVEY_URL_TEMPLATE einmal (beim Laden
+    der Konfiguration bzw. beim Planen) statt bei jeder Nachricht.
+    """
+    missing = [k for k in REQUIRED_ENV if not env.get(k)]
+    if missing:
+        raise RuntimeError(f"Fehlende Werte in env: {', '.join(missing)}")
+
+    survey_src = str(env.get("SURVEY_URL_TEMPLATE", "")).strip()
+    return CompiledTemplates(
+        topic=env["NTFY_TOPIC"],
+        title=Template("NTFY_TITLE", env["NTFY_TITLE"]),
+        message=Template("NTFY_MESSAGE", env["NTFY_MESSAGE"]),
+        # der Survey-Link entsteht vor {url}
+        survey=Template("SURVEY_URL_TEMPLATE", survey_src, PAYLOAD_KEYS - {"url"}) if survey_src else None,
+    )
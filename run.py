@@ -3,9 +3,9 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import hashlib
+import re
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 from ntfy_reminder.config import (
     DEFAULT_START,
@@ -17,15 +17,14 @@ from ntfy_reminder.config import (
     DEFAULT_WINDOWS_SPEC,
     DEFAULT_INTERVAL_SPEC,
 )
-from ntfy_reminder.schedule import (
-    generate_schedule,
-    save_schedule,
-    pretty_print,
-    parse_windows,
-    parse_hhmm,
-    load_schedule,
-)
-from ntfy_reminder.send import load_env_file, send_ntfy
+
+# Planer, SQLite und HTTP-Versand werden erst im jeweiligen Subcommand importiert:
+# jeder Aufruf (z.B. `send`) zahlt nur die Startzeit der Module, die er wirklich braucht.
+if TYPE_CHECKING:
+    from ntfy_reminder.send import SendContext
+    from ntfy_reminder.sqlite_store import SqliteStore
+
+DEFAULT_DB = "out/ntfy.sqlite3"  # = sqlite_store.DEFAULT_DB (hier, damit --help sqlite3 nicht importiert)
 
 
 def parse_date(s: str) -> dt.date:
@@ -34,6 +33,8 @@ def parse_date(s: str) -> dt.date:
 
 def parse_interval_spec(spec: str) -> Tuple[dt.time, dt.time]:
     # "HH:MM-HH:MM"
+    from ntfy_reminder.schedule import parse_hhmm
+
     a, b = spec.split("-", 1)
     return parse_hhmm(a.strip()), parse_hhmm(b.strip())
 
@@ -50,6 +51,8 @@ def derive_seed(base_seed: Optional[int], participant_id: Optional[str], explain
         return None
 
     if participant_id:
+        import hashlib
+
         h = hashlib.sha256(participant_id.encode("utf-8")).hexdigest()
         pid_int = int(h[:12], 16)  # 48-bit reichen
         if base_seed is None:
@@ -64,6 +67,41 @@ def derive_seed(base_seed: Optional[int], participant_id: Optional[str], explain
     return base_seed
 
 
+_PARTICIPANT_ID_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def load_participants(path: Path) -> List[str]:
+    """
+    Teilnehmendenliste laden:
+    - .json: ["p01", "p02", ...] oder [{"participant_id": "p01"}, ...]
+    - sonst CSV: Spalte participant_id (falls Header vorhanden), sonst erste Spalte
+    """
+    import csv
+    import json
+    from collections import Counter
+
+    if path.suffix.lower() == ".json":
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        ids = [str(x["participant_id"]) if isinstance(x, dict) else str(x) for x in raw]
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = [row for row in csv.reader(f) if row and row[0].strip()]
+        col = 0
+        if rows and "participant_id" in [c.strip() for c in rows[0]]:
+            col = [c.strip() for c in rows[0]].index("participant_id")
+            rows = rows[1:]
+        ids = [row[col] for row in rows]
+
+    ids = [x.strip() for x in ids if x.strip()]
+    bad = [x for x in ids if not _PARTICIPANT_ID_RE.match(x)]
+    if bad:
+        raise SystemExit(f"Ungültige participant_id(s) (erlaubt: A-Z a-z 0-9 _ . -): {', '.join(bad[:5])}")
+    dupes = sorted(pid for pid, n in Counter(ids).items() if n > 1)
+    if dupes:
+        raise SystemExit(f"Doppelte participant_id(s): {', '.join(dupes[:5])}")
+    return ids
+
+
 def build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(
         description="ntfy Umfrage-Erinnerungen: planen (randomisiert) und senden."
@@ -86,13 +124,19 @@ def build_parser() -> argparse.ArgumentParser:
     ap.add_argument(
         "--windows",
         default=DEFAULT_WINDOWS_SPEC,
-        help='Zeitfenster (für mode=windows), z.B. "08:00-10:00,12:00-14:00"',
+        help='Zeitfenster (für mode=windows), z.B. "08:00-10:00,12:00-14:00"; "22:00-02:00" geht über Mitternacht',
     )
     ap.add_argument(
         "--interval",
         default=DEFAULT_INTERVAL_SPEC,
         help='Intervall (für mode=interval), z.B. "08:00-18:00"',
     )
+    ap.add_argument(
+        "--resolution",
+        type=int,
+        default=60,
+        help="Raster der Zeitpunkte in Sekunden: 60 = minutengenau (Default), 1 = sekundengenau, 300 = 5 Minuten",
+    )
 
     # Randomisierung / Personalisierung
     ap.add_argument("--seed", type=int, default=None, help="Seed für reproduzierbare Randomisierung")
@@ -107,12 +151,53 @@ def build_parser() -> argparse.ArgumentParser:
     ap.add_argument("--server", default=DEFAULT_SERVER, help="ntfy server URL")
     ap.add_argument("--out", default="out/schedule.json", help="Output schedule JSON")
 
+    # Backend: Dateien (Default) oder eine SQLite-Datenbank für alle Projekte
+    ap.add_argument("--backend", choices=["json", "sqlite"], default="json",
+                    help="Speicherort der Schedules: json (Dateien, --out) oder sqlite (--db, --project)")
+    ap.add_argument("--db", default=DEFAULT_DB, help="SQLite-Datenbank (für --backend sqlite)")
+    ap.add_argument("--project", default=None, help="Projektname (für --backend sqlite und db-import/db-export)")
+
     sub = ap.add_subparsers(dest="cmd", required=True)
 
     # plan subcommand
     plan_p = sub.add_parser("plan", help="Schedule erzeugen und speichern/anzeigen")
     plan_p.add_argument("--explain", action="store_true", help="Erklärt jeden Schritt (Seminar-Modus)")
     plan_p.add_argument("--dry-run", action="store_true", help="Nichts senden, nur planen/anzeigen")
+    plan_p.add_argument("--format", choices=["json", "ndjson", "bin"], default="json",
+                        help="Speicherformat: json (lesbar), ndjson (ein Item pro Zeile) oder bin (kompakt, Endung .bin)")
+    plan_p.add_argument("--quiet", action="store_true",
+                        help="Nur Zusammenfassung statt aller Zeitpunkte ausgeben (lange Zeiträume)")
+    plan_p.add_argument("--workers", type=int, default=1,
+                        help="Prozesse für lange Zeiträume (Tage werden verteilt; 0 = alle Kerne). Ergebnis wie mit 1")
+
+    # replan subcommand
+    replan_p = sub.add_parser(
+        "replan", help="Bestehenden Schedule ab morgen neu planen (gesendete/vergangene Items + ids bleiben)"
+    )
+    replan_p.add_argument("--sent", default=None,
+                          help="Sent-State (Default: neben --out, <p>_schedule.json -> <p>_sent.json)")
+    replan_p.add_argument("--explain", action="store_true", help="Erklärt jeden Schritt (Seminar-Modus)")
+    replan_p.add_argument("--dry-run", action="store_true", help="Nur anzeigen, nichts speichern")
+
+    # plan-batch subcommand
+    batch_p = sub.add_parser("plan-batch", help="Schedules für viele Teilnehmende in einem Lauf erzeugen")
+    batch_p.add_argument("participants", help="Teilnehmendenliste (CSV mit participant_id oder JSON-Liste)")
+    batch_p.add_argument("--out-dir", default="out", help="Zielordner; schreibt <out-dir>/<participant_id>_schedule.json")
+    batch_p.add_argument("--explain", action="store_true", help="Erklärt jeden Schritt (Seminar-Modus)")
+    batch_p.add_argument("--dry-run", action="store_true", help="Nur planen, nichts speichern")
+    batch_p.add_argument("--format", choices=["json", "ndjson", "bin"], default="json",
+                         help="Speicherformat: json (lesbar), ndjson (ein Item pro Zeile) oder bin (kompakt)")
+    batch_p.add_argument("--workers", type=int, default=1,
+                         help="Prozesse (Teilnehmende werden verteilt; 0 = alle Kerne). Ergebnis wie mit 1")
+
+    # db-import / db-export subcommands (JSON-Layout <-> SQLite)
+    for name, help_text in (
+        ("db-import", "Projekt aus out/<p>_schedule.json + out/<p>_sent.json in die SQLite-DB übernehmen"),
+        ("db-export", "Projekt aus der SQLite-DB nach out/<p>_schedule.json + out/<p>_sent.json schreiben"),
+    ):
+        db_p = sub.add_parser(name, help=help_text)
+        db_p.add_argument("--schedule", default=None, help="Schedule-Datei (Default out/<project>_schedule.json)")
+        db_p.add_argument("--sent", default=None, help="Sent-State (Default out/<project>_sent.json)")
 
     # send subcommand
     send_p = sub.add_parser("send", help="Eine Nachricht senden (ID)")
@@ -124,26 +209,117 @@ def build_parser() -> argparse.ArgumentParser:
     sendall_p = sub.add_parser("send-all", help="Alle Reminder aus out/schedule.json senden (Demo)")
     sendall_p.add_argument("--explain", action="store_true", help="Erklärt den Versand (Seminar-Modus)")
     sendall_p.add_argument("--dry-run", action="store_true", help="Nichts senden, nur anzeigen")
+    sendall_p.add_argument("--concurrency", type=int, default=1, help="Parallele Requests (Default 1)")
+    sendall_p.add_argument("--rate", type=float, default=0, help="Max. Nachrichten/Sekunde pro Server (0 = unbegrenzt)")
 
     return ap
 
 
-def _build_payload(schedule: dict, item: dict) -> dict:
-    """
-    Erzeuge ein payload Dict für Template-Platzhalter:
-      {id}, {day}, {k}, {per_day}, {when}, {time}, {url}
-    """
-    return {
-        "id": str(item.get("id", "")),
-        "day": str(item.get("day", "")),
-        "k": str(item.get("k", "")),
-        "n": str(item.get("k", "")),
-        "per_day": str(item.get("per_day", schedule.get("per_day", ""))),
-        "when": str(item.get("when", "")),
-        "time": str(item.get("time", "")),
-        # url wird später ergänzt
-        "url": "",
+def _open_store(args: argparse.Namespace) -> "SqliteStore":
+    from ntfy_reminder.sqlite_store import SqliteStore
+
+    if not args.project:
+        raise SystemExit("--project ist für --backend sqlite bzw. db-import/db-export erforderlich.")
+    return SqliteStore(Path(args.db))
+
+
+def _load_context(args: argparse.Namespace) -> "SendContext":
+    """env laden und Templates prüfen; Fehler als verständliche Meldung statt Traceback."""
+    from ntfy_reminder.send import SendContext
+
+    # --server überschreibt NTFY_SERVER aus env nur, wenn explizit gesetzt
+    try:
+        return SendContext.from_env_file(args.env_file, None if args.server == DEFAULT_SERVER else args.server)
+    except RuntimeError as e:
+        raise SystemExit(f"{args.env_file}: {e}") from e
+
+
+def _check_templates(args: argparse.Namespace, explain: bool) -> None:
+    """Beim Planen: Templates der env-Datei (falls vorhanden) schon jetzt prüfen, nicht erst beim Senden."""
+    if not Path(args.env_file).exists():
+        if explain:
+            print(f"[explain] {args.env_file} fehlt, Templates werden erst beim Senden geprüft.")
+        return
+    ctx = _load_context(args)
+    if explain and ctx.templates is not None:
+        fields = sorted(set(ctx.templates.title.fields + ctx.templates.message.fields))
+        print(f"[explain] Templates ok ({args.env_file}), Platzhalter: {', '.join(fields) or '-'}")
+
+
+class PlanSummary:
+    """Zählt beim Streamen mit (Anzahl, Tage, erster/letzter Zeitpunkt), ohne Items zu behalten."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.days = 0
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+        self._day: Optional[str] = None
+
+    def tap(self, items: Iterator[Dict[str, Any]], echo: bool = False) -> Iterator[Dict[str, Any]]:
+        from ntfy_reminder.schedule import format_item
+
+        for item in items:
+            self.count += 1
+            if item["day"] != self._day:
+                self.days += 1
+                self._day = item["day"]
+            self.first = self.first or item["when"]
+            self.last = item["when"]
+            if echo:
+                print(format_item(item))
+            yield item
+
+    def __str__(self) -> str:
+        if not self.count:
+            return "Keine Reminder geplant."
+        return f"{self.count} Reminder an {self.days} Tag(en) geplant ({self.first} .. {self.last})."
+
+
+def _default_sent_path(schedule_path: Path) -> Path:
+    """out/<p>_schedule.json -> out/<p>_sent.json (Konvention wie tools/dispatch_due.py)."""
+    stem = schedule_path.stem
+    if stem.endswith("_schedule"):
+        return schedule_path.with_name(stem[: -len("_schedule")] + "_sent.json")
+    return schedule_path.with_name("sent.json")
+
+
+def _plan_kwargs(args: argparse.Namespace, start: dt.date, end: dt.date) -> Dict[str, Any]:
+    """Gemeinsame generate_schedule-Parameter für plan und plan-batch."""
+    from ntfy_reminder.schedule import parse_windows
+
+    kwargs: Dict[str, Any] = {
+        "start_date": start,
+        "end_date": end,
+        "per_day": args.per_day,
+        "min_gap_minutes": args.min_gap,
+        "mode": args.mode,
+        "resolution": args.resolution,
     }
+    if args.mode == "windows":
+        kwargs["windows"] = parse_windows(args.windows)
+    else:
+        kwargs["interval"] = parse_interval_spec(args.interval)
+    return kwargs
+
+
+def _crosses_midnight(args: argparse.Namespace) -> bool:
+    """Reicht ein Fenster bzw. das Intervall über Mitternacht (Items am Folgetag, "day" = Planungstag)?"""
+    from ntfy_reminder.schedule import DAY_SECONDS, AllowedTime, interval_to_windows, parse_windows
+
+    if args.mode == "windows":
+        win = parse_windows(args.windows)
+    else:
+        win = interval_to_windows(*parse_interval_spec(args.interval))
+    allowed = AllowedTime.from_windows(win)
+    return bool(allowed.ends) and allowed.ends[-1] > DAY_SECONDS
+
+
+def _workers(args: argparse.Namespace) -> int:
+    """--workers 0 = alle Kerne."""
+    import os
+
+    return args.workers if args.workers > 0 else (os.cpu_count() or 1)
 
 
 def main():
@@ -160,53 +336,129 @@ def main():
     explain_flag = bool(getattr(args, "explain", False))
     seed = derive_seed(args.seed, args.participant_id, explain=explain_flag)
 
+    if args.cmd in {"plan", "plan-batch", "replan"}:
+        _check_templates(args, args.explain)
+        if getattr(args, "format", "json") == "bin":
+            if args.resolution % 60:
+                raise SystemExit("--format bin speichert minutengenau; für --resolution unter 60s json oder ndjson nutzen.")
+            if _crosses_midnight(args):
+                raise SystemExit(
+                    "--format bin speichert Zeitpunkte nur am Planungstag; für Fenster über Mitternacht json oder ndjson nutzen."
+                )
+
     if args.cmd == "plan":
-        if args.mode == "windows":
-            windows = parse_windows(args.windows)
-            schedule = generate_schedule(
-                start_date=start,
-                end_date=end,
-                per_day=args.per_day,
-                min_gap_minutes=args.min_gap,
-                mode="windows",
-                windows=windows,
-                seed=seed,
-                explain=args.explain,
-            )
-        else:
-            interval = parse_interval_spec(args.interval)
-            schedule = generate_schedule(
-                start_date=start,
-                end_date=end,
-                per_day=args.per_day,
-                min_gap_minutes=args.min_gap,
-                mode="interval",
-                interval=interval,
-                seed=seed,
-                explain=args.explain,
-            )
+        from ntfy_reminder.schedule import iter_schedule, schedule_header, write_schedule_stream
 
-        save_schedule(schedule, out_path)
-        pretty_print(schedule)
+        # Items Tag für Tag erzeugen und sofort schreiben/ausgeben (nie der ganze Schedule im Speicher)
+        kwargs = _plan_kwargs(args, start, end)
+        summary = PlanSummary()
+        items = summary.tap(
+            iter_schedule(seed=seed, explain=args.explain, workers=_workers(args), **kwargs), echo=not args.quiet
+        )
+        header = schedule_header(**kwargs)
+        if not args.quiet:
+            print("Geplante Zeitpunkte:")
+        if args.backend == "sqlite":
+            with _open_store(args) as store:
+                store.save_schedule(args.project, {**header, "items": items}, env_file=args.env_file)
+            out_path = Path(f"{args.db}#{args.project}")
+        else:
+            if args.format != "json":
+                out_path = out_path.with_suffix(f".{args.format}")
+            write_schedule_stream(header, items, out_path)
+        if args.quiet:
+            print(summary)
         print(f"\nGespeichert in: {out_path}")
 
         if args.dry_run:
             print("\n[dry-run] Kein Versand.")
         return
 
-    # ab hier: Versand
-    env = load_env_file(args.env_file)
-    server = args.server
-    env_server = str(env.get("NTFY_SERVER", "")).strip()
-    if env_server and args.server == DEFAULT_SERVER:
-        server = env_server
+    if args.cmd == "replan":
+        from ntfy_reminder.journal import SentJournal
+        from ntfy_reminder.schedule import load_schedule, replan_schedule, save_schedule
+
+        if args.backend == "sqlite":
+            with _open_store(args) as store:
+                old, sent_ids = store.load_schedule(args.project), store.sent_ids(args.project)
+            out_path = Path(f"{args.db}#{args.project}")
+        else:
+            if not out_path.exists():
+                raise SystemExit(f"{out_path} nicht gefunden; zuerst `plan` ausführen.")
+            sent_path = Path(args.sent) if args.sent else _default_sent_path(out_path)
+            journal = SentJournal(sent_path)
+            old, sent_ids = load_schedule(out_path), journal.sent_ids
+            journal.close()
+
+        result = replan_schedule(
+            old, seed=seed, sent_ids=sent_ids, explain=args.explain, **_plan_kwargs(args, start, end)
+        )
+        print(
+            f"replan: {len(result.frozen_days)} Tag(e) eingefroren, {len(result.kept_days)} übernommen, "
+            f"{len(result.changed_days)} neu geplant; {len(result.removed_ids)} Item(s) entfernt, "
+            f"{len(result.added)} neu"
+            + (f" (ids {result.added[0]['id']}..{result.added[-1]['id']})" if result.added else "")
+        )
+        if args.explain and result.changed_days:
+            print(f"[explain] neu geplant: {', '.join(result.changed_days)}")
+        if args.dry_run:
+            print("[dry-run] Nichts gespeichert.")
+            return
+
+        if args.backend == "sqlite":
+            with _open_store(args) as store:
+                store.update_schedule(args.project, result.schedule, result.removed_ids, result.added)
+        else:
+            save_schedule(result.schedule, out_path)
+        print(f"Gespeichert in: {out_path}")
+        return
+
+    if args.cmd == "plan-batch":
+        from ntfy_reminder.schedule import generate_schedule_batch, save_schedule
+
+        pids = load_participants(Path(args.participants))
+        seeds = {pid: derive_seed(args.seed, pid) for pid in pids}
+        out_dir = Path(args.out_dir)
+        batch = generate_schedule_batch(
+            seeds, workers=_workers(args), explain=args.explain, **_plan_kwargs(args, start, end)
+        )
+        # sqlite: jede participant_id wird ein eigenes Projekt in der Datenbank
+        store = None
+        if args.backend == "sqlite" and not args.dry_run:
+            from ntfy_reminder.sqlite_store import SqliteStore
+
+            store = SqliteStore(Path(args.db))
+        try:
+            for pid, schedule in batch:
+                path = out_dir / f"{pid}_schedule.{args.format}"
+                if store is not None:
+                    store.save_schedule(pid, schedule, env_file=args.env_file)
+                    path = Path(f"{args.db}#{pid}")
+                elif not args.dry_run:
+                    save_schedule(schedule, path)
+                if args.explain:
+                    print(f"[explain] {pid}: seed={seeds[pid]} items={len(schedule['items'])} -> {path}")
+        finally:
+            if store is not None:
+                store.close()
+        target = args.db if args.backend == "sqlite" else out_dir
+        print(f"{len(pids)} Schedules {'geplant' if args.dry_run else f'gespeichert in: {target}'}")
+        return
 
-    # Optional: Markdown für ntfy Web-App (nicht überall gerendert)
-    markdown_flag = str(env.get("NTFY_MARKDOWN", "")).strip().lower() in {"1", "true", "yes", "y"}
+    if args.cmd in {"db-import", "db-export"}:
+        schedule_path = Path(args.schedule or f"out/{args.project}_schedule.json")
+        sent_path = Path(args.sent or f"out/{args.project}_sent.json")
+        with _open_store(args) as store:
+            if args.cmd == "db-import":
+                n = store.import_json(args.project, schedule_path, sent_path, env_file=args.env_file)
+                print(f"{n} Reminder aus {schedule_path} nach {args.db} importiert (Projekt {args.project}).")
+            else:
+                n = store.export_json(args.project, schedule_path, sent_path)
+                print(f"{n} Reminder nach {schedule_path} + {sent_path} exportiert.")
+        return
 
-    # Survey-Link Template aus env (empfohlen)
-    # Beispiel: https://www.soscisurvey.de/DEINPROJEKT/?r={id}
-    survey_tpl = str(env.get("SURVEY_URL_TEMPLATE", "")).strip()
+    # ab hier: Versand
+    ctx = _load_context(args)
 
     if getattr(args, "dry_run", False):
         if args.cmd == "send":
@@ -216,46 +468,48 @@ def main():
         return
 
     if args.cmd == "send":
-        schedule = load_schedule(out_path)
-        item = next((it for it in schedule.get("items", []) if int(it.get("id", -1)) == int(args.id)), None)
+        from ntfy_reminder.schedule import load_schedule_item
+        from ntfy_reminder.send import send_item
+
+        if args.backend == "sqlite":
+            with _open_store(args) as store:
+                schedule, item = store.header(args.project), store.item(args.project, args.id)
+            out_path = Path(f"{args.db}#{args.project}")
+        else:
+            # über den Sidecar-Index wird nur dieses eine Item gelesen
+            schedule, item = load_schedule_item(out_path, args.id)
         if not item:
             raise SystemExit(f"ID {args.id} nicht im Schedule gefunden ({out_path}).")
 
-        payload = _build_payload(schedule, item)
-
-        # Survey URL bauen und in payload schreiben
-        survey_url = survey_tpl.format(**payload) if survey_tpl else ""
-        payload["url"] = survey_url
-
-        send_ntfy(
-            payload,
-            env,
-            server,
-            explain=args.explain,
-            click_url=survey_url or None,   # Click Header setzen (öffnet URL beim Tap)
-            markdown=markdown_flag,
-        )
+        send_item(ctx, schedule, item, explain=args.explain)
         print(f"OK: Reminder ID {args.id} gesendet.")
         return
 
     if args.cmd == "send-all":
-        schedule = load_schedule(out_path)
+        from ntfy_reminder.schedule import load_schedule
+        from ntfy_reminder.send import Publisher, RateLimiter, send_many
 
-        for item in schedule.get("items", []):
-            payload = _build_payload(schedule, item)
-
-            survey_url = survey_tpl.format(**payload) if survey_tpl else ""
-            payload["url"] = survey_url
-
-            send_ntfy(
-                payload,
-                env,
-                server,
-                explain=args.explain,
-                click_url=survey_url or None,
-                markdown=markdown_flag,
+        if args.backend == "sqlite":
+            with _open_store(args) as store:
+                schedule = store.load_schedule(args.project)
+        else:
+            schedule = load_schedule(out_path)
+
+        # keep-alive Verbindungen (eine pro paralleler Anfrage) statt Handshake pro Nachricht
+        failed = 0
+        jobs = [(ctx, schedule, item) for item in schedule.get("items", [])]
+        with Publisher(max_idle_per_host=max(1, args.concurrency)) as publisher:
+            results = send_many(
+                jobs, publisher, concurrency=args.concurrency, limiter=RateLimiter(args.rate), explain=args.explain
             )
-            print(f"OK: Reminder ID {payload['id']} gesendet.")
+            for (_, _, item), err in results:
+                if err is not None:
+                    failed += 1
+                    print(f"FEHLER: Reminder ID {item.get('id')}: {err}")
+                else:
+                    print(f"OK: Reminder ID {item.get('id')} gesendet.")
+        if failed:
+            raise SystemExit(f"{failed} von {len(jobs)} Reminder(n) nicht gesendet.")
         return
 
 
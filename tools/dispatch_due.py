@@ -3,25 +3,79 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import json
-import subprocess
+import fnmatch
+import heapq
+import select
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Set, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
 
+# tools/ liegt neben dem Paket: Repo-Root importierbar machen
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def load_json(path: Path) -> Dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+from ntfy_reminder.catchup import (  # noqa: E402
+    DEFAULT_LOOKBACK_HOURS, DEFAULT_RATE, POLICIES, CatchUpReport, select_catch_up,
+)
+from ntfy_reminder.filewatch import FileWatcher  # noqa: E402
+from ntfy_reminder.journal import SentJournal  # noqa: E402
+from ntfy_reminder.metrics import REGISTRY, serve_metrics  # noqa: E402
+from ntfy_reminder.retry import (  # noqa: E402
+    DEFAULT_BASE_DELAY, DEFAULT_MAX_AGE, DEFAULT_MAX_DELAY, RetryQueue,
+)
+from ntfy_reminder.schedule import close_schedule, load_schedule, open_schedule_view  # noqa: E402
+from ntfy_reminder.send import Publisher, RateLimiter, SendContext, send_many  # noqa: E402
+from ntfy_reminder.sqlite_store import DEFAULT_DB, SqliteSentState, SqliteStore  # noqa: E402
 
 
-def save_json(path: Path, obj: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+# Metriken (siehe --metrics-textfile / --metrics-port)
+SENT = REGISTRY.counter("ntfy_reminders_sent_total", "Erfolgreich gesendete Reminder")
+FAILED = REGISTRY.counter("ntfy_reminders_failed_total", "Fehlgeschlagene Versandversuche")
+RETRIED = REGISTRY.counter("ntfy_reminders_retried_total", "Eingeplante Wiederholungen nach Fehlern")
+DEAD = REGISTRY.counter("ntfy_reminders_dead_letter_total", "Aufgegebene Reminder (Dead Letter)")
+LATE = REGISTRY.counter("ntfy_reminders_late_total", "Gesendet mehr als 60s nach dem geplanten Zeitpunkt")
+SKIPPED = REGISTRY.counter("ntfy_reminders_skipped_total", "Verpasst und nicht gesendet (catch-up Policy bzw. älter als grace)")
+RELOADED = REGISTRY.counter("ntfy_reloads_total", "Im Daemon neu geladene Schedules bzw. env-Dateien")
+LATENESS = REGISTRY.histogram("ntfy_dispatch_lateness_seconds", "Versandzeit minus geplantes when")
+STAGE = REGISTRY.histogram(
+    "ntfy_dispatch_stage_seconds",
+    "Dauer der Dispatcher-Phasen (schedule_load, due_scan, send inkl. persist, persist)",
+)
+LATE_AFTER = 60.0
+
+
+class Clock:
+    """Echte Uhr. tools/simulate.py ersetzt CLOCK durch eine virtuelle (Tage in Sekunden durchspielen)."""
+
+    def now(self) -> dt.datetime:
+        return dt.datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float, wake: Optional[int] = None) -> None:
+        """wake: Dateideskriptor (inotify), der das Warten vorzeitig beendet, sobald er lesbar ist."""
+        if wake is None:
+            time.sleep(seconds)
+        else:
+            select.select([wake], [], [], seconds)
+
+
+CLOCK: Clock = Clock()
 
 
 def floor_to_minute(t: dt.datetime) -> dt.datetime:
     return t.replace(second=0, microsecond=0)
 
 
+def fmt_when(t: dt.datetime) -> str:
+    """Zeitpunkt für Ausgaben: minutengenau, mit Sekunden nur wenn geplant (--resolution < 60)."""
+    return t.isoformat(timespec="seconds" if t.second else "minutes")
+
+
 def derive_paths_from_project(project: str) -> tuple[str, str, str]:
     """
     Konvention:
@@ -36,135 +90,826 @@ def derive_paths_from_project(project: str) -> tuple[str, str, str]:
     )
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser(description="Send due reminders based on schedule.json (exactly once).")
+@dataclass(frozen=True)
+class Project:
+    name: str
+    schedule_path: Path
+    sent_path: Path
+    env_file: str  # string
 
-    # Komfort: ein Projektname statt drei Pfade
-    ap.add_argument("--project", default=None,
-                    help="Projektname; nutzt out/<p>_schedule.json, out/<p>_sent.json, config/<p>.env")
 
-    # Explizite Pfade (optional, wenn project nicht genutzt wird)
-    ap.add_argument("--schedule", default=None, help="Path to schedule.json")
-    ap.add_argument("--sent", default=None, help="Path to sent-state file (sent.json)")
-    ap.add_argument("--env-file", default=None, help="env file (NTFY_* + SURVEY_URL_TEMPLATE)")
+SCHEDULE_SUFFIXES = ("_schedule.json", "_schedule.ndjson", "_schedule.bin")
 
-    # Ausführung / Wiring
-    ap.add_argument("--runpy", required=True, help="Path to run.py")
-    ap.add_argument("--python", required=True, help="Python executable to use")
-    ap.add_argument("--server", default=None, help="Optional ntfy server override")
 
-    # Timing/Debug
-    ap.add_argument("--grace-minutes", type=int, default=2,
-                    help="Send reminders within [now-grace, now] minutes (timer drift).")
-    ap.add_argument("--dry-run", action="store_true", help="Do not send, only print what would be sent.")
-    ap.add_argument("--explain", action="store_true", help="Verbose output.")
-    args = ap.parse_args()
-
-    # --- Pfade auflösen ---
-    schedule_s: Optional[str] = args.schedule
-    sent_s: Optional[str] = args.sent
-    env_s: Optional[str] = args.env_file
+def discover_projects(projects_dir: Path, config_dir: Path = Path("config")) -> List[Project]:
+    """
+    Alle Projekte in einem Verzeichnis: <dir>/<p>_schedule.json (oder .ndjson/.bin)
+    -> sent: <dir>/<p>_sent.json, env: config/<p>.env
+    """
+    found: Dict[str, Path] = {}
+    for suffix in reversed(SCHEDULE_SUFFIXES):  # .json gewinnt, wenn mehrere existieren
+        for path in projects_dir.glob(f"*{suffix}"):
+            found[path.name[: -len(suffix)]] = path
+    return [
+        Project(name, found[name], projects_dir / f"{name}_sent.json", str(config_dir / f"{name}.env"))
+        for name in sorted(found)
+    ]
+
+
+def resolve_projects(args: argparse.Namespace) -> List[Project]:
+    if args.projects_dir:
+        projects = discover_projects(Path(args.projects_dir))
+        if args.project:
+            # --project als Filter (Glob-Muster erlaubt, z.B. "seminar*")
+            projects = [p for p in projects if any(fnmatch.fnmatchcase(p.name, pat) for pat in args.project)]
+        if not projects:
+            raise SystemExit(f"Keine Projekte (*_schedule.json) in {args.projects_dir} gefunden.")
+        return projects
 
     if args.project:
-        schedule_s, sent_s, env_s = derive_paths_from_project(args.project)
-
-    if not schedule_s or not sent_s or not env_s:
+        projects = []
+        for name in args.project:
+            schedule_s, sent_s, env_s = derive_paths_from_project(name)
+            schedule_path = Path(schedule_s)
+            if not schedule_path.exists() and schedule_path.with_suffix(".bin").exists():
+                schedule_path = schedule_path.with_suffix(".bin")  # plan --format bin
+            projects.append(Project(name, schedule_path, Path(sent_s), env_s))
+        return projects
+
+    if not args.schedule or not args.sent or not args.env_file:
         raise SystemExit(
             "Fehlende Pfade. Nutze entweder:\n"
             "  --project <name>\n"
             "oder gib alle drei an:\n"
             "  --schedule ... --sent ... --env-file ...\n"
         )
+    return [Project("(explicit paths)", Path(args.schedule), Path(args.sent), args.env_file)]
 
-    schedule_path = Path(schedule_s)
-    sent_path = Path(sent_s)
-    env_file = env_s  # string
 
-    if not schedule_path.exists():
-        print(f"[dispatch] schedule not found: {schedule_path}")
-        return 2
+def resolve_sqlite_projects(args: argparse.Namespace, store: SqliteStore) -> List[Project]:
+    """Projekte aus der Datenbank (alle oder per --project gewählt); env: gespeichert, sonst config/<p>.env."""
+    stored = dict(store.projects())
+    names = args.project or sorted(stored)
+    projects = []
+    for name in names:
+        if name not in stored:
+            print(f"[dispatch] project not in {store.db_path}: {name}")
+            continue
+        env_file = args.env_file or stored[name] or derive_paths_from_project(name)[2]
+        projects.append(Project(name, store.db_path, sqlite_state_path(store, name), env_file))
+    return projects
 
-    schedule = load_json(schedule_path)
-    items = schedule.get("items", [])
 
-    sent_ids: Set[int] = set()
-    if sent_path.exists():
-        sent = load_json(sent_path)
-        sent_ids = set(int(x) for x in sent.get("sent_ids", []))
-    else:
-        sent = {"sent_ids": [], "updated_at": ""}
+def sqlite_state_path(store: SqliteStore, name: str) -> Path:
+    """Basis für Projekt-Dateien neben der DB (Retry-Warteschlange, Dead Letter): <db>.<project>"""
+    return store.db_path.with_name(f"{store.db_path.name}.{name}")
 
-    now = floor_to_minute(dt.datetime.now())
-    grace = dt.timedelta(minutes=max(0, args.grace_minutes))
-    earliest = now - grace
 
-    due = []
-    for it in items:
-        try:
-            rid = int(it["id"])
-            when = floor_to_minute(dt.datetime.fromisoformat(it["when"]))
-        except Exception:
-            continue
+def parse_item(it: Dict[str, Any]) -> Optional[Tuple[dt.datetime, int]]:
+    """(when, id) sekundengenau: ein Reminder um 10:06:45 ist erst ab 10:06:45 fällig."""
+    try:
+        return dt.datetime.fromisoformat(it["when"]), int(it["id"])
+    except Exception:
+        return None
+
+
+def open_retry_queue(args: argparse.Namespace, state_path: Path) -> RetryQueue:
+    """Retry-Warteschlange neben dem Sent-State (<sent>.retry.json, Dead Letter: <sent>.dead.jsonl)."""
+    return RetryQueue(
+        state_path,
+        base_delay=args.retry_base_seconds,
+        max_delay=DEFAULT_MAX_DELAY,
+        max_age=args.retry_max_age_minutes * 60.0,
+    )
+
 
+def record_failure(name: str, retry: RetryQueue, item: Dict[str, Any], err: Exception) -> Optional[dt.datetime]:
+    """Fehlschlag protokollieren und Wiederholung einplanen (oder Dead Letter)."""
+    rid = int(item["id"])
+    next_at = retry.record_failure(item, err, CLOCK.now())
+    FAILED.inc(project=name)
+    (DEAD if next_at is None else RETRIED).inc(project=name)
+    if next_at is None:
+        print(f"[dispatch] {name}: ERROR sending id={rid}: {err} -> dead letter ({retry.dead_path})")
+    else:
+        print(f"[dispatch] {name}: ERROR sending id={rid}: {err} -> retry {retry.entries[rid]['attempts']} "
+              f"um {next_at.isoformat(timespec='seconds')}")
+    return next_at
+
+
+def record_sent(name: str, item: Dict[str, Any]) -> None:
+    """Metriken für einen gesendeten Reminder: Zähler + Verspätung gegenüber `when`."""
+    SENT.inc(project=name)
+    try:
+        lateness = (CLOCK.now() - dt.datetime.fromisoformat(item["when"])).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        return
+    LATENESS.observe(max(0.0, lateness), project=name)
+    if lateness > LATE_AFTER:
+        LATE.inc(project=name)
+
+
+def write_metrics(args: argparse.Namespace) -> None:
+    if args.metrics_textfile:
+        REGISTRY.write_textfile(Path(args.metrics_textfile))
+
+
+def catch_up_range(args: argparse.Namespace, earliest: dt.datetime) -> Tuple[dt.datetime, dt.datetime]:
+    """Nachhol-Zeitraum [earliest - lookback, earliest - 1s] (direkt vor dem grace-Fenster)."""
+    return earliest - dt.timedelta(hours=args.catch_up_hours), earliest - dt.timedelta(seconds=1)
+
+
+def find_missed(
+    listing: List[Tuple[dt.datetime, int]],
+    sent_ids: Any,
+    retry: RetryQueue,
+) -> Tuple[List[Tuple[dt.datetime, int]], Optional[dt.datetime]]:
+    """(verpasste (when, id), jüngster gesendeter Zeitpunkt) aus den Items des Nachhol-Zeitraums."""
+    if not listing:
+        return [], None
+    dead = retry.dead_ids()
+    missed = []
+    latest_sent = None
+    for when, rid in listing:
         if rid in sent_ids:
-            continue
+            latest_sent = when if latest_sent is None else max(latest_sent, when)
+        elif rid not in retry and rid not in dead:
+            missed.append((when, rid))
+    return missed, latest_sent
+
+
+def run_once(
+    args: argparse.Namespace,
+    project: Project,
+    publisher: Optional[Publisher] = None,
+    limiter: Optional[RateLimiter] = None,
+    catch_up_limiter: Optional[RateLimiter] = None,
+    report: Optional[CatchUpReport] = None,
+) -> int:
+    """
+    Ein Durchlauf (systemd oneshot): fällige Reminder in [now-grace, now] senden, danach
+    verpasste Reminder gemäß --catch-up (gedrosselt mit catch_up_limiter).
+    publisher/limiter/report können über mehrere Projekte geteilt werden (run_all).
+    """
+    schedule_path = project.schedule_path
+    sent_path = project.sent_path
+
+    if not schedule_path.exists():
+        print(f"[dispatch] schedule not found: {schedule_path}")
+        return 2
 
-        if earliest <= when <= now:
-            due.append((when, rid))
+    journal = SentJournal(sent_path)
+    sent_ids = journal.sent_ids
+    retry = open_retry_queue(args, sent_path)
+    retry.prune(sent_ids)
 
+    # fällig: [volle Minute - grace, jetzt]; die Obergrenze sekundengenau, damit nichts zu früh rausgeht
+    clock = CLOCK.now()
+    now = clock
+    grace = dt.timedelta(minutes=max(0, args.grace_minutes))
+    earliest = floor_to_minute(clock) - grace
+
+    # Wiederholungen kommen aus der Retry-Warteschlange, unabhängig vom grace-Fenster
+    retry_ids = [rid for rid in retry.due(clock) if rid not in sent_ids]
+
+    catching_up = args.catch_up != "skip"
+    cu_start, cu_end = catch_up_range(args, earliest)
+    listing: List[Tuple[dt.datetime, int]] = []  # alle Items im Nachhol-Zeitraum
+
+    with STAGE.time(stage="schedule_load"):
+        view = open_schedule_view(schedule_path)
+        schedule = view.header if view is not None else load_schedule(schedule_path)
+    if view is not None:
+        # Sidecar-Index bzw. Binärformat: Zeitfenster per Binärsuche, nur fällige Items lesen
+        with view, STAGE.time(stage="due_scan"):
+            due = [
+                (when, rid) for when, rid in view.due(earliest, now)
+                if rid not in sent_ids and rid not in retry
+            ]
+            if catching_up:
+                listing = view.due(cu_start, cu_end)
+            missed, latest_sent = find_missed(listing, sent_ids, retry)
+            catch_up, dropped = select_catch_up(args.catch_up, missed, latest_sent)
+            by_id = view.items([rid for _, rid in due + catch_up] + retry_ids)
+    else:
+        items = schedule.get("items", [])
+
+        with STAGE.time(stage="due_scan"):
+            due = []
+            for it in items:
+                parsed = parse_item(it)
+                if parsed is None:
+                    continue
+                when, rid = parsed
+
+                if catching_up and cu_start <= when <= cu_end:
+                    listing.append((when, rid))
+
+                if rid in sent_ids or rid in retry:
+                    continue
+
+                if earliest <= when <= now:
+                    due.append((when, rid))
+
+            missed, latest_sent = find_missed(listing, sent_ids, retry)
+            catch_up, dropped = select_catch_up(args.catch_up, missed, latest_sent)
+            by_id = {int(it["id"]): it for it in items if "id" in it}
+
+    if catching_up:
+        cu_report = report if report is not None else CatchUpReport()
+        cu_report.add(CatchUpReport(missed=len(catch_up) + dropped, queued=len(catch_up), dropped=dropped))
+        if dropped:
+            SKIPPED.inc(dropped, project=project.name)
+
+    for rid in retry_ids:
+        if rid in by_id:
+            due.append((dt.datetime.fromisoformat(by_id[rid]["when"]), rid))
+        else:
+            retry.discard(rid)  # nicht mehr im Schedule (neu geplant)
     due.sort()
 
     if args.explain:
-        proj = args.project if args.project else "(explicit paths)"
-        print(f"[dispatch] project={proj}")
-        print(f"[dispatch] schedule={schedule_path}")
+        print(f"[dispatch] project={project.name}")
+        print(f"[dispatch] schedule={schedule_path} (index={'ja' if view is not None else 'nein'})")
         print(f"[dispatch] sent={sent_path}")
-        print(f"[dispatch] now={now.isoformat(timespec='minutes')} earliest={earliest.isoformat(timespec='minutes')}")
-        print(f"[dispatch] due_count={len(due)}")
+        print(f"[dispatch] now={now.isoformat(timespec='seconds')} earliest={earliest.isoformat(timespec='minutes')}")
+        print(f"[dispatch] due_count={len(due)} (davon retries={len(retry_ids)}, Retry-Warteschlange={len(retry)})")
+        if catching_up:
+            print(f"[dispatch] catch-up={args.catch_up} seit {cu_start.isoformat(timespec='minutes')}: "
+                  f"verpasst={len(catch_up) + dropped} nachholen={len(catch_up)} verwerfen={dropped}")
+
+    if not due and not catch_up:
+        retry.save()
+        return 0
 
-    if not due:
+    # env/Templates einmal parsen, dann alle fälligen Reminder im Prozess senden
+    ctx = SendContext.from_env_file(project.env_file, args.server)
+
+    if args.dry_run:
+        for when, rid in due:
+            print(f"[dry-run] would send id={rid} scheduled={fmt_when(when)}")
+        for when, rid in catch_up:
+            print(f"[dry-run] would catch up id={rid} scheduled={fmt_when(when)}")
         return 0
 
-    for when, rid in due:
-        # WICHTIG: globale run.py Optionen VOR dem Subcommand "send"
-        cmd = [
-            args.python,
-            args.runpy,
-            "--env-file", env_file,
-            "--out", str(schedule_path),
+    if args.explain:
+        for when, rid in due:
+            print(f"[dispatch] sending id={rid} scheduled={fmt_when(when)}")
+
+    own_publisher = publisher is None
+    if publisher is None:
+        publisher = Publisher(max_idle_per_host=max(1, args.concurrency))
+    try:
+        # erst die aktuell fälligen, dann das Nachholen mit eigener (niedriger) Rate
+        rounds = [
+            (due, limiter or RateLimiter(args.rate, clock=CLOCK), None),
+            (
+                catch_up,
+                catch_up_limiter or RateLimiter(args.catch_up_rate, clock=CLOCK),
+                cu_report if catching_up else None,
+            ),
         ]
-        if args.server:
-            cmd += ["--server", args.server]
+        for selected, round_limiter, counts in rounds:
+            jobs = [(ctx, schedule, by_id[rid]) for _, rid in selected if rid in by_id]
+            with STAGE.time(stage="send"):
+                results = send_many(
+                    jobs, publisher, concurrency=args.concurrency, limiter=round_limiter, explain=args.explain
+                )
+                for (_, _, item), err in results:
+                    rid = int(item["id"])
+                    if err is not None:
+                        record_failure(project.name, retry, item, err)
+                        if counts is not None:
+                            counts.failed += 1
+                        continue  # nicht als sent markieren
+                    with STAGE.time(stage="persist"):
+                        journal.mark_sent(rid)  # sofort dauerhaft, vor dem nächsten Versand
+                    retry.discard(rid)
+                    record_sent(project.name, item)
+                    if counts is not None:
+                        counts.sent += 1
+    finally:
+        if own_publisher:
+            publisher.close()
+        with STAGE.time(stage="persist"):
+            retry.save()
+            journal.maybe_compact()
+        journal.close()
 
-        cmd += ["send", str(rid)]
+    return 0
 
-        if args.explain:
-            cmd += ["--explain"]
 
-        if args.dry_run:
-            print(f"[dry-run] would send id={rid} scheduled={when.isoformat(timespec='minutes')}")
+def run_all(args: argparse.Namespace, projects: List[Project]) -> int:
+    """
+    Ein Durchlauf über mehrere Projekte in einem Prozess (statt ein Timer je Projekt).
+    Jedes Projekt nutzt seine eigene env/Server-Konfiguration; ein Fehler in einem
+    Projekt (fehlende env, kaputter Schedule, ...) wird gemeldet, die anderen laufen weiter.
+    """
+    rc = 0
+    limiter = RateLimiter(args.rate, clock=CLOCK)  # Limit gilt pro Server, projektübergreifend
+    catch_up_limiter = RateLimiter(args.catch_up_rate, clock=CLOCK)
+    report = CatchUpReport()
+    with Publisher(max_idle_per_host=max(1, args.concurrency)) as publisher:
+        for project in projects:
+            try:
+                rc = max(rc, run_once(args, project, publisher, limiter, catch_up_limiter, report))
+            except Exception as e:
+                print(f"[dispatch] {project.name}: FEHLER, Projekt übersprungen: {e}")
+                rc = max(rc, 1)
+    if args.catch_up != "skip" and (report.missed or args.explain):
+        print(f"[dispatch] {report.summary(args.catch_up)}")
+    write_metrics(args)
+    return rc
+
+
+def run_once_sqlite(args: argparse.Namespace, store: SqliteStore, projects: List[Project]) -> int:
+    """Ein Durchlauf gegen die SQLite-DB: eine indizierte Abfrage über alle Projekte."""
+    # fällig: [volle Minute - grace, jetzt]; die Obergrenze sekundengenau, damit nichts zu früh rausgeht
+    clock = CLOCK.now()
+    now = clock
+    grace = dt.timedelta(minutes=max(0, args.grace_minutes))
+    earliest = floor_to_minute(clock) - grace
+
+    by_name = {p.name: p for p in projects}
+    retries = {name: open_retry_queue(args, p.sent_path) for name, p in by_name.items()}
+    with STAGE.time(stage="due_scan"):
+        due = [
+            (name, item) for name, item in (store.due(earliest, now, list(by_name)) if by_name else [])
+            if int(item["id"]) not in retries[name]
+        ]
+    n_retry = 0
+    for name, retry in retries.items():
+        for rid in retry.due(clock):
+            item = store.item(name, rid)
+            if item is None or rid in store.sent_ids(name):
+                retry.discard(rid)
+                continue
+            due.append((name, item))
+            n_retry += 1
+    # Nachholen: verpasste (pending) Items vor dem grace-Fenster, Auswahl pro Projekt
+    catch_up: List[Tuple[str, Dict[str, Any]]] = []
+    report = CatchUpReport()
+    if args.catch_up != "skip" and by_name:
+        cu_start, cu_end = catch_up_range(args, earliest)
+        missed_by_project: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        for name, item in store.due(cu_start, cu_end, list(by_name)):
+            missed_by_project.setdefault(name, {})[int(item["id"])] = item
+        for name, items in missed_by_project.items():
+            listing = [(dt.datetime.fromisoformat(it["when"]), rid) for rid, it in items.items()]
+            missed, _ = find_missed(listing, (), retries[name])
+            selected, dropped = select_catch_up(args.catch_up, missed, store.latest_sent(name, cu_start, cu_end))
+            report.add(CatchUpReport(missed=len(selected) + dropped, queued=len(selected), dropped=dropped))
+            if dropped:
+                SKIPPED.inc(dropped, project=name)
+            catch_up += [(name, items[rid]) for _, rid in selected]
+        catch_up.sort(key=lambda entry: entry[1]["when"])
+
+    if args.explain:
+        print(f"[dispatch] db={store.db_path} projects={','.join(by_name)}")
+        print(f"[dispatch] now={now.isoformat(timespec='seconds')} earliest={earliest.isoformat(timespec='minutes')}")
+        print(f"[dispatch] due_count={len(due)} (davon retries={n_retry}) catch_up={len(catch_up)}")
+
+    if args.dry_run:
+        for name, item in due:
+            print(f"[dry-run] {name}: would send id={item['id']} scheduled={item['when']}")
+        for name, item in catch_up:
+            print(f"[dry-run] {name}: would catch up id={item['id']} scheduled={item['when']}")
+        return 0
+
+    ctxs: Dict[str, Optional[SendContext]] = {}
+    headers: Dict[str, Dict[str, Any]] = {}
+
+    def to_jobs(entries: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Any], Dict[int, str]]:
+        jobs, owner = [], {}
+        for name, item in entries:
+            if name not in ctxs:
+                try:
+                    ctxs[name] = SendContext.from_env_file(by_name[name].env_file, args.server)
+                    headers[name] = store.header(name)
+                except Exception as e:
+                    print(f"[dispatch] {name}: FEHLER, Projekt übersprungen: {e}")
+                    ctxs[name] = None
+            if ctxs[name] is None:
+                continue
+            jobs.append((ctxs[name], headers[name], item))
+            owner[id(item)] = name  # Jobs werden in send_many per id() zurückgeordnet
+        return jobs, owner
+
+    with Publisher(max_idle_per_host=max(1, args.concurrency)) as publisher:
+        # erst die aktuell fälligen, dann das Nachholen mit eigener (niedriger) Rate
+        for entries, rate, counts in ((due, args.rate, None), (catch_up, args.catch_up_rate, report)):
+            jobs, owner = to_jobs(entries)
+            with STAGE.time(stage="send"):
+                results = send_many(
+                    jobs, publisher, concurrency=args.concurrency, limiter=RateLimiter(rate, clock=CLOCK),
+                    explain=args.explain,
+                )
+                for (_, _, item), err in results:
+                    name, rid = owner[id(item)], int(item["id"])
+                    if err is not None:
+                        record_failure(name, retries[name], item, err)
+                        if counts is not None:
+                            counts.failed += 1
+                        continue  # nicht als sent markieren
+                    with STAGE.time(stage="persist"):
+                        store.mark_sent(name, rid)  # commit mit synchronous=FULL
+                    retries[name].discard(rid)
+                    record_sent(name, item)
+                    if counts is not None:
+                        counts.sent += 1
+    with STAGE.time(stage="persist"):
+        for retry in retries.values():
+            retry.save()
+    if args.catch_up != "skip" and (report.missed or args.explain):
+        print(f"[dispatch] {report.summary(args.catch_up)}")
+    write_metrics(args)
+    return 1 if any(ctx is None for ctx in ctxs.values()) else 0
+
+
+@dataclass
+class ProjectState:
+    """Daemon: im Speicher gehaltener Zustand eines Projekts."""
+    project: Project
+    schedule: Dict[str, Any]
+    ctx: SendContext
+    journal: Union[SentJournal, SqliteSentState]
+    retry: RetryQueue
+
+
+# (fällig um, Projekt-Index, id, retry, Item)
+HeapEntry = Tuple[dt.datetime, int, int, bool, Dict[str, Any]]
+
+
+def queue_project(
+    st: ProjectState,
+    idx: int,
+    earliest: dt.datetime,
+    listing: Optional[List[Tuple[dt.datetime, int]]] = None,
+    cu_range: Optional[Tuple[dt.datetime, dt.datetime]] = None,
+) -> Tuple[List[HeapEntry], Dict[int, Dict[str, Any]]]:
+    """
+    Heap-Einträge der noch nicht gesendeten Reminder eines Projekts: Retries zu ihrem
+    Backoff-Zeitpunkt, sonst ab earliest zum geplanten `when`. Gibt (Einträge, id -> Item) zurück;
+    Retries zu ids, die nicht mehr im Schedule stehen (neu geplant), werden verworfen.
+    listing: sammelt zusätzlich (when, id) aller Items in cu_range (Nachhol-Zeitraum).
+    """
+    entries: List[HeapEntry] = []
+    in_schedule: Dict[int, Dict[str, Any]] = {}
+    for it in st.schedule.get("items", []):
+        parsed = parse_item(it)
+        if parsed is None:
+            continue
+        when, rid = parsed
+        in_schedule[rid] = it
+        if listing is not None and cu_range is not None and cu_range[0] <= when <= cu_range[1]:
+            listing.append((when, rid))
+        if rid in st.journal:
+            continue
+        if rid in st.retry:
+            entries.append((st.retry.next_attempt(rid), idx, rid, True, it))
+        elif when >= earliest:
+            entries.append((when, idx, rid, False, it))
+    for rid in set(st.retry.entries) - set(in_schedule):
+        st.retry.discard(rid)
+    st.retry.save()
+    return entries, in_schedule
+
+
+def hot_reload(
+    args: argparse.Namespace,
+    changed: Set[Path],
+    states: List[ProjectState],
+    heap: List[HeapEntry],
+    pending_cu: Set[Tuple[int, int]],
+    store: Optional[SqliteStore] = None,
+) -> None:
+    """
+    Daemon: geänderte Schedules/env-Dateien neu laden und den Heap der betroffenen Projekte
+    neu aufbauen. Erst wenn die neue Datei vollständig geparst ist, wird umgeschaltet; ist sie
+    (noch) nicht lesbar, bleibt der alte Stand. Sent-State und Retry-Warteschlange bleiben erhalten,
+    eingeplante Nachhol-Einträge ebenso (sofern die id noch im Schedule steht).
+    """
+    earliest = floor_to_minute(CLOCK.now()) - dt.timedelta(minutes=max(0, args.grace_minutes))
+    requeue: Dict[int, Tuple[List[HeapEntry], Dict[int, Dict[str, Any]]]] = {}
+    for idx, st in enumerate(states):
+        p = st.project
+        reload_schedule = store is None and p.schedule_path in changed
+        reload_env = Path(p.env_file) in changed
+        if not reload_schedule and not reload_env:
+            continue
+        schedule, ctx = st.schedule, st.ctx
+        try:
+            if reload_schedule:
+                with STAGE.time(stage="schedule_load"):
+                    schedule = load_schedule(p.schedule_path)
+            if reload_env:
+                ctx = SendContext.from_env_file(p.env_file, args.server)
+        except Exception as e:
+            print(f"[dispatch] {p.name}: Neu laden fehlgeschlagen, alter Stand bleibt: {e}")
             continue
+        states[idx] = ProjectState(p, schedule, ctx, st.journal, st.retry)
+        if reload_schedule:
+            close_schedule(st.schedule)  # Items im Heap sind eigene Dicts, das alte Mapping wird nicht mehr gebraucht
+        for kind, reloaded in (("schedule", reload_schedule), ("env", reload_env)):
+            if reloaded:
+                RELOADED.inc(project=p.name, kind=kind)
+        if reload_schedule:
+            requeue[idx] = queue_project(states[idx], idx, earliest)
+        what = " + ".join(k for k, r in (("schedule", reload_schedule), ("env", reload_env)) if r)
+        print(f"[dispatch] {p.name}: neu geladen ({what})")
+
+    if not requeue:
+        return
+    kept: List[HeapEntry] = []
+    caught_up: Dict[Tuple[int, int], dt.datetime] = {}
+    for entry in heap:
+        idx, rid = entry[1], entry[2]
+        if idx not in requeue:
+            kept.append(entry)
+        elif (idx, rid) in pending_cu:
+            caught_up[(idx, rid)] = entry[0]
+    for idx, (entries, in_schedule) in requeue.items():
+        for (i, rid), at in caught_up.items():
+            if i == idx and rid in in_schedule and rid not in states[idx].journal:
+                entries = [e for e in entries if e[2] != rid]
+                entries.append((at, idx, rid, True, in_schedule[rid]))
+            elif i == idx:
+                pending_cu.discard((i, rid))
+        kept += entries
+    heapq.heapify(kept)
+    heap[:] = kept
+
+
+def run_daemon(
+    args: argparse.Namespace,
+    projects: List[Project],
+    store: Optional[SqliteStore] = None,
+    until: Optional[dt.datetime] = None,
+) -> int:
+    """
+    Langlaufender Dispatcher: alle Schedules bleiben im Speicher, ein Min-Heap über die
+    nächsten `when`-Zeitpunkte aller Projekte bestimmt, wie lange geschlafen wird.
+    Fehlgeschlagene Reminder kommen mit ihrem Backoff-Zeitpunkt zurück in den Heap,
+    nachzuholende (--catch-up) im Abstand 1/--catch-up-rate ab Start
+    (retry=True: beide nicht an das grace-Fenster gebunden).
+    Steht nichts mehr aus, wartet der Daemon auf geänderte Dateien (Hot Reload) und läuft weiter;
+    er endet nur mit Strg+C/SIGTERM, mit --no-reload sobald nichts mehr aussteht.
+    until: vorher beenden, sobald der nächste Reminder erst danach fällig ist bzw. die Uhr until
+    überschreitet (simulierter Ausfall, Ende der Simulation).
+    """
+    started = CLOCK.now()
+    grace = dt.timedelta(minutes=max(0, args.grace_minutes))
+    earliest = floor_to_minute(started) - grace
+    cu_start, cu_end = catch_up_range(args, earliest)
+    catch_up: List[Tuple[dt.datetime, int, int, Dict[str, Any]]] = []
+    report = CatchUpReport()
+
+    states: List[ProjectState] = []
+    heap: List[HeapEntry] = []
+    for p in projects:
+        journal: Union[SentJournal, SqliteSentState]
+        try:
+            if store is not None:
+                with STAGE.time(stage="schedule_load"):
+                    schedule = store.load_schedule(p.name)
+                journal = SqliteSentState(store, p.name)
+            elif not p.schedule_path.exists():
+                print(f"[dispatch] schedule not found: {p.schedule_path}")
+                continue
+            else:
+                with STAGE.time(stage="schedule_load"):
+                    schedule = load_schedule(p.schedule_path)
+                journal = SentJournal(p.sent_path)
+            ctx = SendContext.from_env_file(p.env_file, args.server)
+            retry = open_retry_queue(args, p.sent_path)
+        except Exception as e:
+            print(f"[dispatch] {p.name}: FEHLER, Projekt übersprungen: {e}")
+            continue
+        retry.prune(journal.sent_ids)
+        idx = len(states)
+        states.append(ProjectState(p, schedule, ctx, journal, retry))
 
+        listing: List[Tuple[dt.datetime, int]] = []
+        entries, in_schedule = queue_project(
+            states[idx], idx, earliest, listing if args.catch_up != "skip" else None, (cu_start, cu_end)
+        )
+        heap += entries
+
+        missed, latest_sent = find_missed(listing, journal.sent_ids, retry)
+        selected, dropped = select_catch_up(args.catch_up, missed, latest_sent)
+        report.add(CatchUpReport(missed=len(selected) + dropped, queued=len(selected), dropped=dropped))
+        if dropped:
+            SKIPPED.inc(dropped, project=p.name)
+        catch_up += [(when, idx, rid, in_schedule[rid]) for when, rid in selected]
+
+    # Nachholen gleichmäßig verteilen statt alles auf einmal (ntfy Rate-Limits)
+    pending_cu = set()
+    for i, (_, idx, rid, it) in enumerate(sorted(catch_up, key=lambda c: c[:3])):
+        offset = i / args.catch_up_rate if args.catch_up_rate > 0 else 0.0
+        heap.append((started + dt.timedelta(seconds=offset), idx, rid, True, it))
+        pending_cu.add((idx, rid))
+
+    heapq.heapify(heap)
+    if args.explain:
+        print(f"[dispatch] daemon: projects={len(states)} pending={len(heap)} catch_up={len(pending_cu)}")
+    if report.missed and not pending_cu:
+        print(f"[dispatch] {report.summary(args.catch_up)}")
+
+    # Hot Reload: ersetzte Schedules (replan) und env-Dateien ohne Neustart übernehmen
+    watcher = None
+    if not args.no_reload:
+        watched = [Path(st.project.env_file) for st in states]
+        if store is None:
+            watched += [st.project.schedule_path for st in states]
+        watcher = FileWatcher(watched, clock=CLOCK.monotonic)
         if args.explain:
-            print(f"[dispatch] sending id={rid} scheduled={when.isoformat(timespec='minutes')}")
-            print(f"[dispatch] cmd: {' '.join(cmd)}")
+            print(f"[dispatch] daemon: beobachte {len(watcher.keys)} Dateien ({watcher.mode})")
+
+    # systemctl stop (SIGTERM) wie Strg+C: Sent-State kompaktieren, Retry-Warteschlange speichern
+    previous_sigterm = None
+    if threading.current_thread() is threading.main_thread():
+        previous_sigterm = signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    publisher = Publisher(max_idle_per_host=max(1, args.concurrency))
+    limiter = RateLimiter(args.rate, clock=CLOCK)
+    metrics_server = serve_metrics(args.metrics_port) if args.metrics_port else None
+    write_metrics(args)
+    try:
+        while True:
+            if watcher is not None:
+                changed = watcher.changed()
+                if changed:
+                    hot_reload(args, set(changed), states, heap, pending_cu, store)
+            if not heap and watcher is None:
+                break  # --no-reload: es kann nichts mehr dazukommen
+            when = heap[0][0] if heap else None
+            if until is not None and (when or CLOCK.now()) > until:
+                break
+            # ohne ausstehende Reminder auf Änderungen warten (replan, neue env), nicht beenden
+            wait = (when - CLOCK.now()).total_seconds() if when is not None else float("inf")
+            if until is not None:
+                wait = min(wait, (until - CLOCK.now()).total_seconds() + 1e-3)
+            if wait > 0:
+                publisher.evict_idle()
+                # höchstens 60s am Stück schlafen (Uhr-Sprünge, Suspend); mit inotify früher, sobald
+                # sich eine beobachtete Datei ändert, beim Polling spätestens zum nächsten stat()-Vergleich
+                chunk = 60.0
+                if watcher is not None and watcher.fileno() is None:
+                    chunk = min(chunk, watcher.poll_interval)
+                CLOCK.sleep(min(wait, chunk), wake=watcher.fileno() if watcher is not None else None)
+                continue
+
+            # alle jetzt fälligen Reminder (projektübergreifend) gemeinsam senden
+            now = CLOCK.now()
+            earliest = floor_to_minute(now) - grace
+            batch: Dict[int, Tuple[int, int]] = {}  # id(item) -> (Projekt-Index, id)
+            jobs = []
+            while heap and heap[0][0] <= now:
+                when, idx, rid, is_retry, item = heapq.heappop(heap)
+                st = states[idx]
+                if not is_retry and when < earliest:
+                    print(f"[dispatch] {st.project.name}: skip id={rid} (älter als grace)")
+                    SKIPPED.inc(project=st.project.name)
+                    continue
+                if args.dry_run:
+                    print(f"[dry-run] {st.project.name}: would send id={rid} scheduled={item['when']}")
+                    continue
+                batch[id(item)] = (idx, rid)
+                jobs.append((st.ctx, st.schedule, item))
+
+            t_send = time.perf_counter()
+            results = send_many(jobs, publisher, concurrency=args.concurrency, limiter=limiter, explain=args.explain)
+            for (_, _, item), err in results:
+                idx, rid = batch[id(item)]
+                st = states[idx]
+                if (idx, rid) in pending_cu:
+                    pending_cu.discard((idx, rid))
+                    if err is not None:
+                        report.failed += 1
+                    else:
+                        report.sent += 1
+                    if not pending_cu:
+                        print(f"[dispatch] {report.summary(args.catch_up)}")
+                if err is not None:
+                    next_at = record_failure(st.project.name, st.retry, item, err)
+                    if next_at is not None:
+                        heapq.heappush(heap, (next_at, idx, rid, True, item))
+                    continue  # nicht als sent markieren
+
+                with STAGE.time(stage="persist"):
+                    st.journal.mark_sent(rid)
+                st.retry.discard(rid)
+                record_sent(st.project.name, item)
+                if args.explain:
+                    print(f"[dispatch] {st.project.name}: sent id={rid} scheduled={item['when']}")
+            if jobs:
+                STAGE.observe(time.perf_counter() - t_send, stage="send")
+
+            with STAGE.time(stage="persist"):
+                for idx in {idx for idx, _ in batch.values()}:
+                    st = states[idx]
+                    st.retry.save()
+                    st.journal.maybe_compact()
+            write_metrics(args)
+    except KeyboardInterrupt:
+        print("[dispatch] daemon beendet.")
+        return 0
+    finally:
+        if previous_sigterm is not None:
+            signal.signal(signal.SIGTERM, previous_sigterm)
+        publisher.close()
+        if watcher is not None:
+            watcher.close()
+        write_metrics(args)
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        for st in states:
+            close_schedule(st.schedule)
+            st.retry.save()
+            if st.journal.pending:
+                st.journal.compact()
+            st.journal.close()
+
+    if args.explain:
+        print("[dispatch] daemon: keine ausstehenden Reminder mehr.")
+    return 0
 
-        res = subprocess.run(cmd, capture_output=True, text=True)
-        if res.returncode != 0:
-            print(f"[dispatch] ERROR sending id={rid} (rc={res.returncode})")
-            if res.stdout:
-                print(res.stdout.rstrip())
-            if res.stderr:
-                print(res.stderr.rstrip())
-            continue  # nicht als sent markieren
 
-        sent_ids.add(rid)
+def build_parser() -> argparse.ArgumentParser:
+    """Dispatcher-Optionen (auch von tools/simulate.py genutzt)."""
+    ap = argparse.ArgumentParser(description="Send due reminders based on schedule.json (exactly once).")
 
-    sent["sent_ids"] = sorted(sent_ids)
-    sent["updated_at"] = dt.datetime.now().isoformat(timespec="seconds")
-    save_json(sent_path, sent)
+    # Komfort: ein Projektname statt drei Pfade
+    ap.add_argument("--project", action="append", default=None,
+                    help="Projektname; nutzt out/<p>_schedule.json, out/<p>_sent.json, config/<p>.env "
+                         "(mehrfach angebbar; mit --projects-dir Filter, Glob-Muster erlaubt)")
+    ap.add_argument("--projects-dir", default=None,
+                    help="Alle <p>_schedule.json in diesem Verzeichnis (z.B. out/) in einem Durchlauf senden; "
+                         "env je Projekt aus config/<p>.env")
 
-    return 0
+    # Explizite Pfade (optional, wenn project nicht genutzt wird)
+    ap.add_argument("--schedule", default=None, help="Path to schedule.json")
+    ap.add_argument("--sent", default=None, help="Path to sent-state file (sent.json)")
+    ap.add_argument("--env-file", default=None, help="env file (NTFY_* + SURVEY_URL_TEMPLATE)")
+
+    # Alternativ: alle Projekte in einer SQLite-Datenbank (run.py --backend sqlite)
+    ap.add_argument("--backend", choices=["json", "sqlite"], default="json",
+                    help="json: Dateien wie oben; sqlite: Schedules + Sent-State aus --db")
+    ap.add_argument("--db", default=DEFAULT_DB, help="SQLite-Datenbank (für --backend sqlite)")
+
+    # Ausführung / Wiring
+    # veraltet: Versand läuft im Prozess, kein run.py-Subprozess mehr (nur noch akzeptiert)
+    ap.add_argument("--runpy", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--python", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--server", default=None, help="Optional ntfy server override")
+    ap.add_argument("--daemon", action="store_true",
+                    help="Langlaufend: schläft bis zum nächsten fälligen Reminder und sendet im Prozess.")
+    ap.add_argument("--concurrency", type=int, default=1, help="Parallele Requests beim Versand (Default 1)")
+    ap.add_argument("--rate", type=float, default=0,
+                    help="Max. Nachrichten/Sekunde pro ntfy-Server (0 = unbegrenzt)")
+    ap.add_argument("--no-reload", action="store_true",
+                    help="Daemon: geänderte Schedules/env-Dateien nicht automatisch neu laden (inotify bzw. Polling); "
+                         "endet dann, sobald nichts mehr aussteht")
+
+    # Timing/Debug
+    ap.add_argument("--grace-minutes", type=int, default=2,
+                    help="Send reminders within [now-grace, now] minutes (timer drift).")
+    ap.add_argument("--catch-up", choices=POLICIES, default="skip",
+                    help="Verpasste Reminder (vor dem grace-Fenster, z.B. nach Reboot): skip (Default), "
+                         "send-latest-per-participant (pro Projekt nur den jüngsten) oder drain (alle, gedrosselt)")
+    ap.add_argument("--catch-up-hours", type=float, default=DEFAULT_LOOKBACK_HOURS,
+                    help="Wie weit zurück nach verpassten Remindern gesucht wird")
+    ap.add_argument("--catch-up-rate", type=float, default=DEFAULT_RATE,
+                    help="Max. Nachrichten/Sekunde pro Server beim Nachholen (0 = unbegrenzt)")
+    ap.add_argument("--retry-base-seconds", type=float, default=DEFAULT_BASE_DELAY,
+                    help="Fehlgeschlagene Reminder: erste Wartezeit, verdoppelt sich je Versuch (mit Jitter)")
+    ap.add_argument("--retry-max-age-minutes", type=float, default=DEFAULT_MAX_AGE / 60,
+                    help="Nach so vielen Minuten ab geplantem Zeitpunkt -> Dead Letter (<sent>.dead.jsonl)")
+    ap.add_argument("--metrics-textfile", default=None,
+                    help="Metriken im Prometheus-Textformat hierhin schreiben (z.B. für den node_exporter textfile collector)")
+    ap.add_argument("--metrics-port", type=int, default=0,
+                    help="Daemon: Metriken unter http://127.0.0.1:PORT/metrics bereitstellen")
+    ap.add_argument("--dry-run", action="store_true", help="Do not send, only print what would be sent.")
+    ap.add_argument("--explain", action="store_true", help="Verbose output.")
+    return ap
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+
+    if args.backend == "sqlite":
+        with SqliteStore(Path(args.db)) as store:
+            projects = resolve_sqlite_projects(args, store)
+            if args.daemon:
+                return run_daemon(args, projects, store)
+            return run_once_sqlite(args, store, projects)
+
+    projects = resolve_projects(args)
+
+    if args.daemon:
+        return run_daemon(args, projects)
+
+    return run_all(args, projects)
 
 
 if __name__ == "__main__":
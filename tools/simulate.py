@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Dispatcher-Simulation mit virtueller Uhr gegen den lokalen ntfy-Stub (kein echter Versand):
+
+    python tools/simulate.py --participants 1000 --days 60
+    python tools/simulate.py --participants 200 --days 14 --fail-rate 0.02 \\
+        --outage-at 50 --outage-minutes 90 --catch-up drain
+    python tools/simulate.py --projects-dir out          # vorhandene Schedules (als Kopie, Sent-State frisch)
+
+Es läuft der unveränderte Daemon-Loop aus dispatch_due.py (Sent-State, Retry, grace, catch-up);
+nur dispatch_due.CLOCK ist virtuell: Warten springt sofort vor, echte Rechen- und Versandzeit
+zählt --speed-fach (1 = wie im Betrieb, 0 = gar nicht). Der Stub notiert jede Ankunft mit
+virtueller Uhrzeit; der Bericht zeigt Durchsatz, Verspätung, Duplikate und fehlende Reminder.
+Alle weiteren Optionen (--grace-minutes, --catch-up, --rate, --concurrency, ...) wie dispatch_due.py.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# tools/ liegt neben dem Paket: Repo-Root importierbar machen
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ntfy_reminder.config import (  # noqa: E402
+    DEFAULT_MIN_GAP_MINUTES, DEFAULT_PER_DAY, DEFAULT_START, DEFAULT_WINDOWS_SPEC,
+)
+from ntfy_reminder.schedule import generate_schedule_batch, load_schedule, parse_windows, save_schedule  # noqa: E402
+from ntfy_reminder.stub_server import StubServer  # noqa: E402
+from tools import dispatch_due  # noqa: E402
+from tools.dispatch_due import DEAD, SKIPPED, Project, resolve_projects, run_daemon  # noqa: E402
+
+# Verspätungs-Klassen für den Bericht (obere Grenze in Sekunden)
+LATENESS_BUCKETS = ((1, "<1s"), (10, "1-10s"), (60, "10-60s"), (300, "1-5min"), (float("inf"), ">5min"))
+
+
+class VirtualClock(dispatch_due.Clock):
+    """
+    Virtuelle Uhr ab `start`: sleep() springt sofort vor, echte Laufzeit zählt `speed`-fach.
+    Thread-safe (RateLimiter schläft bei --concurrency in mehreren Threads).
+    """
+
+    def __init__(self, start: dt.datetime, speed: float = 1.0):
+        self.start = start
+        self.speed = speed
+        self._t0 = time.perf_counter()
+        self._skipped = 0.0
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        with self._lock:
+            return (time.perf_counter() - self._t0) * self.speed + self._skipped
+
+    def now(self) -> dt.datetime:
+        return self.start + dt.timedelta(seconds=self.monotonic())
+
+    def sleep(self, seconds: float, wake: Optional[int] = None) -> None:
+        if seconds > 0:
+            with self._lock:
+                self._skipped += seconds
+
+    def advance_to(self, t: dt.datetime) -> None:
+        """Uhr auf t vorstellen (simulierter Ausfall); nie zurück."""
+        self.sleep((t - self.now()).total_seconds())
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank Perzentil (q in 0..100) einer sortierten Liste."""
+    if not values:
+        return 0.0
+    k = max(0, min(len(values) - 1, int(round(q / 100.0 * len(values) + 0.5)) - 1))
+    return values[k]
+
+
+def floor_day(t: dt.datetime) -> dt.datetime:
+    return dt.datetime.combine(t.date(), dt.time())
+
+
+def _topic(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", name)[:64] or "sim"
+
+
+def prepare_projects(args: argparse.Namespace, work: Path) -> List[Project]:
+    """
+    Schedules im Arbeitsverzeichnis anlegen: synthetisch (--participants/--days) oder Kopien
+    vorhandener Projekte (--project/--projects-dir/--schedule). Je Projekt eine env mit
+    topic=Projekt und title={id}, damit der Stub jede Ankunft zuordnen kann.
+    """
+    config = work / "config"
+    config.mkdir(parents=True, exist_ok=True)
+    if args.project or args.projects_dir or args.schedule:
+        # Sent-State und env werden nicht gelesen; resolve_projects verlangt bei --schedule trotzdem alle drei Pfade
+        args.sent, args.env_file = args.sent or "-", args.env_file or "-"
+        sources = [(p.name, load_schedule(p.schedule_path)) for p in resolve_projects(args)]
+    else:
+        start = dt.date.fromisoformat(args.start)
+        seeds = {f"p{i:05d}": args.seed + i for i in range(args.participants)}
+        sources = generate_schedule_batch(
+            seeds, start_date=start, end_date=start + dt.timedelta(days=args.days - 1), per_day=args.per_day,
+            min_gap_minutes=args.min_gap, mode="windows", windows=parse_windows(args.windows),
+        )
+
+    projects = []
+    for name, schedule in sources:
+        topic = _topic(name)
+        schedule_path = work / f"{topic}_schedule.json"
+        save_schedule(schedule, schedule_path)
+        env_path = config / f"{topic}.env"
+        env_path.write_text(
+            f"NTFY_TOPIC={topic}\nNTFY_TITLE={{id}}\nNTFY_MESSAGE={{when}}\nNTFY_PUBLISH_MODE={args.publish_mode}\n",
+            encoding="utf-8",
+        )
+        projects.append(Project(topic, schedule_path, work / f"{topic}_sent.json", str(env_path)))
+    return projects
+
+
+def expected_items(projects: List[Project], since: dt.datetime) -> Dict[Tuple[str, int], dt.datetime]:
+    """(Projekt, id) -> geplanter Zeitpunkt aller Items ab Simulationsbeginn."""
+    expected = {}
+    for p in projects:
+        for it in load_schedule(p.schedule_path).get("items", []):
+            when = dt.datetime.fromisoformat(it["when"])
+            if when >= since:
+                expected[(p.name, int(it["id"]))] = when
+    return expected
+
+
+def build_report(
+    expected: Dict[Tuple[str, int], dt.datetime],
+    arrivals: List[Tuple[dt.datetime, str, Optional[str]]],
+    stub: StubServer,
+    real_seconds: float,
+    sim_start: dt.datetime,
+    sim_end: dt.datetime,
+) -> Dict[str, Any]:
+    seen: Dict[Tuple[str, int], int] = {}
+    lateness: List[float] = []
+    unknown = 0
+    for t, topic, title in arrivals:
+        try:
+            key = (topic, int(title or ""))
+        except ValueError:
+            unknown += 1
+            continue
+        if key not in expected:
+            unknown += 1
+            continue
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] == 1:
+            lateness.append((t - expected[key]).total_seconds())
+    lateness.sort()
+
+    buckets: Dict[str, int] = {label: 0 for _, label in LATENESS_BUCKETS}
+    for s in lateness:
+        buckets[next(label for bound, label in LATENESS_BUCKETS if s < bound)] += 1
+    virtual_seconds = (sim_end - sim_start).total_seconds()
+    return {
+        "expected": len(expected),
+        "delivered": len(seen),
+        "missed": len(expected) - len(seen),
+        "duplicates": sum(n - 1 for n in seen.values()),
+        "unknown": unknown,
+        "stub_requests": stub.requests,
+        "stub_failed": stub.failed,
+        "skipped_grace_or_catch_up": int(SKIPPED.total()),
+        "dead_letter": int(DEAD.total()),
+        "lateness_s": {
+            "p50": percentile(lateness, 50), "p90": percentile(lateness, 90),
+            "p99": percentile(lateness, 99), "max": lateness[-1] if lateness else 0.0,
+        },
+        "lateness_buckets": buckets,
+        "real_seconds": real_seconds,
+        "virtual_seconds": virtual_seconds,
+        "speedup": virtual_seconds / real_seconds if real_seconds > 0 else 0.0,
+        "msgs_per_s": len(arrivals) / real_seconds if real_seconds > 0 else 0.0,
+        "sim_start": sim_start.isoformat(timespec="seconds"),
+        "sim_end": sim_end.isoformat(timespec="seconds"),
+    }
+
+
+def print_report(r: Dict[str, Any]) -> None:
+    lat = r["lateness_s"]
+    print(f"Simulation {r['sim_start']} .. {r['sim_end']}: {r['virtual_seconds'] / 86400:.1f} Tage "
+          f"in {r['real_seconds']:.1f}s (x{r['speedup']:.0f})")
+    print(f"  zugestellt {r['delivered']}/{r['expected']}, fehlend {r['missed']}, Duplikate {r['duplicates']}"
+          + (f", unbekannt {r['unknown']}" if r["unknown"] else ""))
+    print(f"  verworfen (grace/catch-up) {r['skipped_grace_or_catch_up']}, Dead Letter {r['dead_letter']}, "
+          f"Stub: {r['stub_requests']} Requests, davon {r['stub_failed']} mit 503")
+    print(f"  Durchsatz {r['msgs_per_s']:.0f} Nachrichten/s (Echtzeit)")
+    print(f"  Verspätung p50={lat['p50']:.3f}s p90={lat['p90']:.3f}s p99={lat['p99']:.3f}s max={lat['max']:.3f}s")
+    print("  " + "  ".join(f"{label}: {n}" for label, n in r["lateness_buckets"].items()))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = dispatch_due.build_parser()
+    ap.description = "Dispatcher mit virtueller Uhr gegen den lokalen ntfy-Stub durchspielen."
+    sim = ap.add_argument_group("Simulation")
+    sim.add_argument("--participants", type=int, default=100, help="synthetische Teilnehmende (je ein Projekt)")
+    sim.add_argument("--days", type=int, default=7, help="Studiendauer in Tagen")
+    sim.add_argument("--start", default=DEFAULT_START.isoformat(), help="erster Studientag YYYY-MM-DD")
+    sim.add_argument("--per-day", type=int, default=DEFAULT_PER_DAY)
+    sim.add_argument("--min-gap", type=int, default=DEFAULT_MIN_GAP_MINUTES, help="Mindestabstand in Minuten")
+    sim.add_argument("--windows", default=DEFAULT_WINDOWS_SPEC, help='Zeitfenster, z.B. "08:00-12:00,14:00-20:00"')
+    sim.add_argument("--seed", type=int, default=1)
+    sim.add_argument("--speed", type=float, default=1.0,
+                     help="Faktor für echte Laufzeit auf der virtuellen Uhr (1 = wie im Betrieb, 0 = kostenlos)")
+    sim.add_argument("--fail-rate", type=float, default=0.0, help="Anteil Stub-Antworten mit HTTP 503 (0..1)")
+    sim.add_argument("--latency-ms", type=float, default=0.0, help="künstliche Antwortzeit des Stubs")
+    sim.add_argument("--publish-mode", choices=["header", "json"], default="header")
+    sim.add_argument("--outage-at", type=float, default=None, help="Ausfall nach so vielen Stunden (Daemon gestoppt)")
+    sim.add_argument("--outage-minutes", type=float, default=60.0, help="Dauer des Ausfalls")
+    sim.add_argument("--workdir", default=None, help="Arbeitsverzeichnis behalten (Default: temporär)")
+    sim.add_argument("--report", default=None, help="Bericht zusätzlich als JSON schreiben")
+    return ap
+
+
+def simulate(args: argparse.Namespace, work: Path) -> Dict[str, Any]:
+    projects = prepare_projects(args, work)
+    if not projects:
+        raise SystemExit("Keine Projekte für die Simulation.")
+    expected = expected_items(projects, dt.datetime.min)
+    sim_start = floor_day(min(expected.values())) if expected else dt.datetime.combine(DEFAULT_START, dt.time())
+
+    clock = VirtualClock(sim_start, args.speed)
+    dispatch_due.CLOCK = clock
+    stub = StubServer(latency=args.latency_ms / 1000.0, fail_rate=args.fail_rate, seed=args.seed,
+                      record=True, clock=clock.now).start()
+    args.server = stub.url
+    # Dateien ändern sich während der Simulation nicht: ohne Hot Reload endet der Daemon, sobald nichts mehr aussteht
+    args.no_reload = True
+    # Ausgabe des Dispatchers nur mit --explain (sonst eine Zeile pro verworfenem/fehlgeschlagenem Reminder)
+    out = contextlib.nullcontext() if args.explain else contextlib.redirect_stdout(open(os.devnull, "w"))
+    t0 = time.perf_counter()
+    try:
+        with out:
+            if args.outage_at is not None:
+                down = sim_start + dt.timedelta(hours=args.outage_at)
+                run_daemon(args, projects, until=down)
+                clock.advance_to(down + dt.timedelta(minutes=args.outage_minutes))
+            run_daemon(args, projects)
+        real_seconds = time.perf_counter() - t0
+        sim_end = clock.now()
+    finally:
+        stub.stop()
+        dispatch_due.CLOCK = dispatch_due.Clock()
+    return build_report(expected, stub.arrivals or [], stub, real_seconds, sim_start, sim_end)
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.backend != "json" or args.dry_run:
+        raise SystemExit("simulate: nur mit --backend json und ohne --dry-run.")
+
+    with contextlib.ExitStack() as stack:
+        if args.workdir:
+            work = Path(args.workdir)
+        else:
+            work = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="ntfy-sim-")))
+        report = simulate(args, work)
+    print_report(report)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 1 if report["missed"] or report["duplicates"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())